@@ -13,6 +13,8 @@ from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
 from config import Config
 from flask_cors import CORS
+from .instrumentation import init_sql_instrumentation, init_metrics, init_tracing
+from .cache import cache, init_idempotency_store
 
 db = SQLAlchemy()
 
@@ -23,12 +25,63 @@ CORS(app)
 
 db.init_app(app)
 migrate = Migrate(app, db)
+init_tracing(app)
+init_sql_instrumentation(app)
+init_metrics(app)
+cache.init_app(app)
+init_idempotency_store(app)
 
-from .models import User, Account, MotionPictures, WatchList
+from .models import (
+    User,
+    Account,
+    MotionPictures,
+    WatchList,
+    Recommendation,
+    TitleStats,
+    TitleActivity,
+    AccountStats,
+    SyncState,
+    WatchListTombstone,
+    JobState,
+)
 
 from .routes import main as main_blueprint
 
 app.register_blueprint(main_blueprint)
 
+from .services import (
+    init_account_stats,
+    init_leaderboard,
+    init_prewarm,
+    init_search_index,
+    init_sync,
+    init_write_behind,
+    poster_cache,
+    tmdb_client,
+    watchlist_cache,
+)
+from .commands import register_commands
+
+tmdb_client.init_app(app)
+poster_cache.init_app(app)
+watchlist_cache.init_app(app)
+init_prewarm(app)
+init_search_index(app)
+init_leaderboard(app)
+init_account_stats(app)
+init_sync(app)
+init_write_behind(app)
+register_commands(app)
+
 with app.app_context():
     db.create_all()
+
+
+def create_app():
+    """
+    Return the configured Flask application.
+
+    Returns:
+        Flask: The Flask application instance.
+    """
+    return app
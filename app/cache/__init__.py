@@ -0,0 +1,159 @@
+"""
+Module for the application cache.
+
+This module provides the ``cache`` extension used to store upstream responses. Like
+``db``, it is created once and bound to the app with ``init_app``, which picks the
+backend from the ``CACHE_BACKEND`` config option:
+
+- ``memory``: an in-process LRU cache, private to each worker.
+- ``sqlite``: a SQLite database at ``CACHE_PATH`` shared by every worker on the machine.
+
+Idempotency keys must not be evicted to make room for cached responses, nor be private
+to one worker, so they are kept in a separate SQLite store at ``IDEMPOTENCY_STORE_PATH``
+whatever the backend.
+
+Classes:
+    Cache: The cache extension.
+
+Functions:
+    init_idempotency_store: Opens the store of idempotency keys.
+"""
+
+import os
+import tempfile
+
+from app.instrumentation.metrics import CACHE_REQUESTS
+from .backends import CacheBackend, InProcessCache, SQLiteCache
+
+
+class Cache:
+    """
+    The cache extension.
+
+    Attributes:
+        backend (CacheBackend): The backend that stores the values.
+        default_ttl (float): The expiry used when ``set`` is called without a TTL.
+    """
+
+    def __init__(self, backend=None, default_ttl=300):
+        """
+        Initialize a new Cache instance.
+
+        Args:
+            backend (CacheBackend): The backend to use until ``init_app`` is called.
+            default_ttl (float): The default number of seconds a value stays valid.
+        """
+        self.backend = backend or InProcessCache()
+        self.default_ttl = default_ttl
+
+    def init_app(self, app):
+        """
+        Configure the cache backend from the application config.
+
+        Args:
+            app (Flask): The Flask application.
+        """
+        self.default_ttl = app.config.get("CACHE_DEFAULT_TTL", self.default_ttl)
+        backend = app.config.get("CACHE_BACKEND", "memory")
+        if backend == "sqlite":
+            path = app.config.get("CACHE_PATH") or os.path.join(
+                tempfile.gettempdir(), "watchwave-cache.sqlite3"
+            )
+            self.backend = SQLiteCache(path)
+        elif backend == "memory":
+            self.backend = InProcessCache(app.config.get("CACHE_MAX_ENTRIES", 1024))
+        else:
+            raise ValueError(f"Unknown cache backend: {backend}")
+        app.extensions["cache"] = self
+
+    def get(self, key, name="default"):
+        """
+        Return the value stored under ``key`` and record a hit or a miss.
+
+        Args:
+            key (str): The cache key.
+            name (str): The cache name reported in the metrics.
+
+        Returns:
+            object: The cached value, or None.
+        """
+        value = self.backend.get(key)
+        CACHE_REQUESTS.inc(cache=name, result="miss" if value is None else "hit")
+        return value
+
+    def set(self, key, value, ttl=None):
+        """
+        Store ``value`` under ``key``.
+
+        Args:
+            key (str): The cache key.
+            value (object): The JSON-serializable value to store.
+            ttl (float): The number of seconds the value stays valid.
+        """
+        self.backend.set(key, value, self.default_ttl if ttl is None else ttl)
+
+    def delete(self, key):
+        """
+        Remove ``key`` from the cache.
+
+        Args:
+            key (str): The cache key.
+        """
+        self.backend.delete(key)
+
+    def clear(self):
+        """
+        Remove every key from the cache.
+        """
+        self.backend.clear()
+
+    def get_or_set(self, key, creator, ttl=None, name="default"):
+        """
+        Return the cached value of ``key``, computing and storing it on a miss.
+
+        Concurrent misses for the same key, including from other workers when the
+        backend is shared, wait for a single caller to run ``creator``.
+
+        Args:
+            key (str): The cache key.
+            creator (callable): Computes the value on a miss. Exceptions propagate and
+                nothing is cached.
+            ttl (float): The number of seconds the value stays valid.
+            name (str): The cache name reported in the metrics.
+
+        Returns:
+            object: The cached or newly computed value.
+        """
+        value = self.get(key, name)
+        if value is not None:
+            return value
+
+        with self.backend.lock(key) as acquired:
+            if acquired:
+                value = self.backend.get(key)
+                if value is not None:
+                    return value
+            value = creator()
+            self.set(key, value, ttl)
+            return value
+
+
+cache = Cache()
+
+
+def init_idempotency_store(app):
+    """
+    Open the SQLite store of idempotency keys shared by every worker on the machine.
+
+    Args:
+        app (Flask): The Flask application.
+
+    Returns:
+        Cache: The store of idempotency keys.
+    """
+    path = app.config.get("IDEMPOTENCY_STORE_PATH") or os.path.join(
+        tempfile.gettempdir(), "watchwave-idempotency.sqlite3"
+    )
+    store = Cache(SQLiteCache(path))
+    app.extensions["idempotency_store"] = store
+    return store
@@ -0,0 +1,272 @@
+"""
+Module for cache backends.
+
+This module defines the cache backends used to store upstream responses. The in-process
+backend keeps values in the memory of the current worker. The SQLite backend keeps them
+in a database file on local disk, so every gunicorn worker on the machine shares one warm
+copy.
+
+Classes:
+    CacheBackend: The interface shared by every cache backend.
+    InProcessCache: A bounded in-memory LRU cache with per-key expiry.
+    SQLiteCache: A cache stored in a local SQLite database shared across processes.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+
+class CacheBackend:
+    """
+    The interface shared by every cache backend.
+
+    Values must be JSON-serializable so that every backend can store them.
+    """
+
+    def get(self, key):
+        """
+        Return the value stored under ``key``.
+
+        Args:
+            key (str): The cache key.
+
+        Returns:
+            object: The cached value, or None if the key is missing or expired.
+        """
+        raise NotImplementedError
+
+    def set(self, key, value, ttl=None):
+        """
+        Store ``value`` under ``key``.
+
+        Args:
+            key (str): The cache key.
+            value (object): The value to store.
+            ttl (float): The number of seconds the value stays valid; None never expires.
+        """
+        raise NotImplementedError
+
+    def add(self, key, value, ttl=None):
+        """
+        Store ``value`` under ``key`` only if the key is missing or expired.
+
+        Args:
+            key (str): The cache key.
+            value (object): The value to store.
+            ttl (float): The number of seconds the value stays valid.
+
+        Returns:
+            bool: True if the value was stored.
+        """
+        raise NotImplementedError
+
+    def delete(self, key):
+        """
+        Remove ``key`` from the cache.
+
+        Args:
+            key (str): The cache key.
+        """
+        raise NotImplementedError
+
+    def clear(self):
+        """
+        Remove every key from the cache.
+        """
+        raise NotImplementedError
+
+    @contextmanager
+    def lock(self, key, timeout=10.0):
+        """
+        Hold a lock on ``key`` so that only one caller computes its value.
+
+        The lock is a lease stored in the cache itself, so it works across processes
+        for shared backends. It expires after ``timeout`` seconds in case its holder
+        dies, and waiting callers give up after the same timeout.
+
+        Args:
+            key (str): The cache key to lock.
+            timeout (float): The lease duration and the maximum wait in seconds.
+
+        Yields:
+            bool: True if the lock was acquired, False if the wait timed out.
+        """
+        lock_key = f"lock:{key}"
+        deadline = time.monotonic() + timeout
+        delay = 0.005
+        acquired = self.add(lock_key, os.getpid(), ttl=timeout)
+        while not acquired and time.monotonic() < deadline:
+            time.sleep(delay)
+            delay = min(delay * 2, 0.1)
+            acquired = self.add(lock_key, os.getpid(), ttl=timeout)
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                self.delete(lock_key)
+
+
+class InProcessCache(CacheBackend):
+    """
+    A bounded in-memory LRU cache with per-key expiry.
+
+    Values are stored as-is; callers must not mutate values they get from the cache.
+
+    Attributes:
+        max_entries (int): The maximum number of keys kept before evicting the least
+            recently used one.
+    """
+
+    def __init__(self, max_entries=1024):
+        """
+        Initialize a new InProcessCache instance.
+
+        Args:
+            max_entries (int): The maximum number of keys to keep.
+        """
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _live_entry(self, key, now):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[1] is not None and entry[1] <= now:
+            del self._entries[key]
+            return None
+        return entry
+
+    def _store(self, key, value, ttl, now):
+        self._entries[key] = (value, now + ttl if ttl is not None else None)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._live_entry(key, time.monotonic())
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def set(self, key, value, ttl=None):
+        with self._lock:
+            self._store(key, value, ttl, time.monotonic())
+
+    def add(self, key, value, ttl=None):
+        with self._lock:
+            now = time.monotonic()
+            if self._live_entry(key, now) is not None:
+                return False
+            self._store(key, value, ttl, now)
+            return True
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class SQLiteCache(CacheBackend):
+    """
+    A cache stored in a local SQLite database shared across processes.
+
+    Every gunicorn worker opens the same database file, so a value fetched by one worker
+    is a cache hit for all of them. The database runs in WAL mode so readers never block
+    the writer. Expired rows are removed lazily and pruned periodically.
+
+    Attributes:
+        path (str): The path of the SQLite database file.
+        prune_interval (int): The number of writes between pruning expired rows.
+    """
+
+    def __init__(self, path, prune_interval=256):
+        """
+        Initialize a new SQLiteCache instance.
+
+        Args:
+            path (str): The path of the SQLite database file.
+            prune_interval (int): The number of writes between pruning expired rows.
+        """
+        self.path = path
+        self.prune_interval = prune_interval
+        self._local = threading.local()
+        self._writes = 0
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with self._connect() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL)"
+            )
+
+    def _connect(self):
+        # Connections are per thread and per process, since gunicorn may fork after
+        # the cache was created.
+        connection = getattr(self._local, "connection", None)
+        if connection is None or self._local.pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+
+    def _after_write(self, connection):
+        self._writes += 1
+        if self._writes % self.prune_interval == 0:
+            connection.execute(
+                "DELETE FROM cache WHERE expires_at IS NOT NULL AND expires_at <= ?",
+                (time.time(),),
+            )
+
+    def get(self, key):
+        row = (
+            self._connect()
+            .execute(
+                "SELECT value FROM cache WHERE key = ? "
+                "AND (expires_at IS NULL OR expires_at > ?)",
+                (key, time.time()),
+            )
+            .fetchone()
+        )
+        return json.loads(row[0]) if row else None
+
+    def set(self, key, value, ttl=None):
+        connection = self._connect()
+        expires_at = time.time() + ttl if ttl is not None else None
+        connection.execute(
+            "INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)",
+            (key, json.dumps(value), expires_at),
+        )
+        self._after_write(connection)
+
+    def add(self, key, value, ttl=None):
+        connection = self._connect()
+        now = time.time()
+        expires_at = now + ttl if ttl is not None else None
+        # Replace the row only if it has expired, atomically in one statement.
+        cursor = connection.execute(
+            "INSERT INTO cache (key, value, expires_at) VALUES (?, ?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = excluded.value, "
+            "expires_at = excluded.expires_at "
+            "WHERE cache.expires_at IS NOT NULL AND cache.expires_at <= ?",
+            (key, json.dumps(value), expires_at, now),
+        )
+        return cursor.rowcount == 1
+
+    def delete(self, key):
+        self._connect().execute("DELETE FROM cache WHERE key = ?", (key,))
+
+    def clear(self):
+        self._connect().execute("DELETE FROM cache")
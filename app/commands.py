@@ -0,0 +1,102 @@
+"""
+Module for application CLI commands.
+
+This module registers the ``flask`` commands used to run maintenance jobs outside the
+request cycle.
+
+Functions:
+    register_commands: Registers the CLI commands on the app.
+"""
+
+import time
+
+import click
+
+
+def register_commands(app):
+    """
+    Register the CLI commands on the app.
+
+    Args:
+        app (Flask): The Flask application.
+    """
+
+    @app.cli.command("prewarm")
+    @click.option("--loop", is_flag=True, help="Keep refreshing every interval.")
+    def prewarm(loop):
+        """Refresh the cached TMDB popular lists and top searches."""
+        prewarmer = app.extensions["prewarmer"]
+        while True:
+            if prewarmer.run_once():
+                click.echo("Cache pre-warmed.")
+            else:
+                click.echo("Another worker holds the pre-warm lease.")
+            if not loop:
+                break
+            time.sleep(prewarmer.next_delay())
+
+    @app.cli.command("build-recommendations")
+    @click.option("--top-k", type=int, help="Neighbours to keep per title.")
+    @click.option(
+        "--metric",
+        type=click.Choice(["cosine", "cooccurrence"]),
+        help="Similarity between titles.",
+    )
+    def build_recommendations_command(top_k, metric):
+        """Rebuild the recommendations from watchlist co-occurrence."""
+        from app.services.recommendations import build_recommendations
+
+        count = build_recommendations(
+            top_k=top_k or app.config["RECOMMENDATIONS_TOP_K"],
+            metric=metric or app.config["RECOMMENDATIONS_METRIC"],
+            min_accounts=app.config["RECOMMENDATIONS_MIN_ACCOUNTS"],
+        )
+        click.echo(f"Stored {count} recommendations.")
+
+    @app.cli.command("rebuild-leaderboard")
+    def rebuild_leaderboard_command():
+        """Recompute the leaderboard counters and prune old hourly activity."""
+        from app.services.leaderboard import prune_activity, rebuild_title_stats
+
+        titles = rebuild_title_stats()
+        pruned = prune_activity()
+        click.echo(f"Rebuilt counters of {titles} titles, pruned {pruned} buckets.")
+
+    @app.cli.command("rebuild-account-stats")
+    @click.option("--account-id", type=int, help="Only repair this account.")
+    def rebuild_account_stats_command(account_id):
+        """Recompute the watchlist statistics counters of the accounts."""
+        from app.services.account_stats import rebuild_account_stats
+
+        count = rebuild_account_stats(account_id)
+        click.echo(f"Rebuilt watchlist statistics of {count} accounts.")
+
+    @app.cli.command("prune-tombstones")
+    def prune_tombstones_command():
+        """Delete the watchlist tombstones older than the sync retention."""
+        from app.services.sync import prune_tombstones
+
+        count = prune_tombstones(app.config["SYNC_TOMBSTONE_RETENTION"])
+        click.echo(f"Pruned {count} tombstones.")
+
+    @app.cli.command("refresh-metadata")
+    @click.option(
+        "--incremental",
+        is_flag=True,
+        help="Only refresh titles TMDB lists as changed since the last run.",
+    )
+    def refresh_metadata_command(incremental):
+        """Refresh stored motion picture metadata from TMDB."""
+        from app.services import MetadataRefresher
+
+        totals = MetadataRefresher(app).run(incremental=incremental)
+        click.echo(
+            "Selected {selected}, updated {updated}, unchanged {unchanged}, "
+            "failed {failed}.".format(**totals)
+        )
+
+    @app.cli.command("flush-write-behind")
+    def flush_write_behind_command():
+        """Apply the queued watched toggles now."""
+        count = app.extensions["write_behind"].flush_all()
+        click.echo(f"Applied {count} queued watched toggles.")
@@ -0,0 +1,9 @@
+from .sql import (
+    QueryStats,
+    QueryBudgetExceeded,
+    init_sql_instrumentation,
+    query_budget,
+    track_queries,
+)
+from .metrics import init_metrics, mark_process_dead, render_metrics, registry
+from .tracing import current_request_id, in_current_trace, init_tracing, span
@@ -0,0 +1,603 @@
+"""
+Module for application metrics.
+
+This module provides a small, dependency-free metrics registry with counters, gauges and
+histograms, rendered in the Prometheus text exposition format. Request hooks record the
+latency and status of every route, the time it spent in the database and, through the
+TMDB client, the latency and errors of upstream calls.
+
+gunicorn runs several worker processes, each with its own registry. When
+``METRICS_MULTIPROC_DIR`` is set, every worker periodically writes a snapshot of its
+metrics to that directory and the metrics endpoint merges the snapshots of all workers,
+so a single scrape reports the whole server. The snapshot of a worker that exited is
+removed, either by ``mark_process_dead`` from the gunicorn ``child_exit`` hook or when a
+scrape finds its process gone, so its counters stop being merged.
+
+Classes:
+    Counter: A monotonically increasing value.
+    Gauge: A value that can go up and down.
+    Histogram: Observations counted into cumulative buckets.
+    MetricsRegistry: Holds the metrics of the process and renders them.
+
+Functions:
+    init_metrics: Registers the request hooks that record route metrics.
+    render_metrics: Renders the metrics of this process or of all workers.
+    mark_process_dead: Removes the snapshot of a worker that exited.
+"""
+
+import bisect
+import glob
+import json
+import math
+import os
+import threading
+import time
+
+from flask import current_app, g, request
+
+from .sql import start_collecting, stop_collecting
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class _Metric:
+    """
+    Base class for metrics with a fixed set of label names.
+    """
+
+    type = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def _key(self, labels):
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def snapshot(self):
+        """
+        Return a JSON-serializable snapshot of the metric.
+
+        Returns:
+            dict: The metric type, help text, label names and samples.
+        """
+        with self._lock:
+            samples = [[list(key), value] for key, value in self._values.items()]
+        return {
+            "type": self.type,
+            "help": self.documentation,
+            "labelnames": list(self.labelnames),
+            "samples": samples,
+        }
+
+
+class Counter(_Metric):
+    """
+    A monotonically increasing value, such as a number of requests.
+    """
+
+    type = "counter"
+
+    def inc(self, amount=1, **labels):
+        """
+        Increment the counter.
+
+        Args:
+            amount (float): The amount to add.
+            **labels: The label values of the sample.
+        """
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        """
+        Return the current value of a sample.
+
+        Args:
+            **labels: The label values of the sample.
+
+        Returns:
+            float: The counter value.
+        """
+        return self._values.get(self._key(labels), 0)
+
+
+class Gauge(_Metric):
+    """
+    A value that can go up and down, such as the number of connections in use.
+    """
+
+    type = "gauge"
+
+    def set(self, value, **labels):
+        """
+        Set the gauge to ``value``.
+
+        Args:
+            value (float): The new value.
+            **labels: The label values of the sample.
+        """
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount=1, **labels):
+        """
+        Increment the gauge.
+
+        Args:
+            amount (float): The amount to add; may be negative.
+            **labels: The label values of the sample.
+        """
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        """
+        Decrement the gauge.
+
+        Args:
+            amount (float): The amount to subtract.
+            **labels: The label values of the sample.
+        """
+        self.inc(-amount, **labels)
+
+    def value(self, **labels):
+        """
+        Return the current value of a sample.
+
+        Args:
+            **labels: The label values of the sample.
+
+        Returns:
+            float: The gauge value.
+        """
+        return self._values.get(self._key(labels), 0)
+
+
+class Histogram(_Metric):
+    """
+    Observations, such as latencies, counted into buckets.
+
+    Each sample stores per-bucket counts, the sum and the count of observations. Buckets
+    are made cumulative only when rendered, so an observation costs one bisect.
+    """
+
+    type = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        """
+        Record an observation.
+
+        Args:
+            value (float): The observed value.
+            **labels: The label values of the sample.
+        """
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            sample = self._values.get(key)
+            if sample is None:
+                sample = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            sample[0][index] += 1
+            sample[1] += value
+            sample[2] += 1
+
+    def count(self, **labels):
+        """
+        Return the number of observations of a sample.
+
+        Args:
+            **labels: The label values of the sample.
+
+        Returns:
+            int: The number of observations.
+        """
+        sample = self._values.get(self._key(labels))
+        return sample[2] if sample else 0
+
+    def snapshot(self):
+        with self._lock:
+            samples = [
+                [list(key), [list(counts), total, count]]
+                for key, (counts, total, count) in self._values.items()
+            ]
+        return {
+            "type": self.type,
+            "help": self.documentation,
+            "labelnames": list(self.labelnames),
+            "buckets": list(self.buckets),
+            "samples": samples,
+        }
+
+
+class MetricsRegistry:
+    """
+    Holds the metrics of the process and renders them in the Prometheus text format.
+
+    Attributes:
+        metrics (dict): The registered metrics by name.
+        collectors (list): Callables run before every snapshot to refresh gauges.
+    """
+
+    def __init__(self):
+        """
+        Initialize an empty MetricsRegistry instance.
+        """
+        self.metrics = {}
+        self.collectors = []
+        self._last_flush = 0.0
+        self._flush_lock = threading.Lock()
+
+    def register(self, metric):
+        """
+        Register a metric.
+
+        Args:
+            metric (Counter | Gauge | Histogram): The metric to register.
+
+        Returns:
+            Counter | Gauge | Histogram: The registered metric.
+        """
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        """
+        Create and register a Counter.
+
+        Returns:
+            Counter: The registered counter.
+        """
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=()):
+        """
+        Create and register a Gauge.
+
+        Returns:
+            Gauge: The registered gauge.
+        """
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        """
+        Create and register a Histogram.
+
+        Returns:
+            Histogram: The registered histogram.
+        """
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def snapshot(self):
+        """
+        Refresh the collected gauges and return a snapshot of every metric.
+
+        Returns:
+            dict: The metric snapshots by name.
+        """
+        for collector in self.collectors:
+            collector()
+        return {name: metric.snapshot() for name, metric in self.metrics.items()}
+
+    def flush(self, directory):
+        """
+        Write the snapshot of this process to ``directory``.
+
+        The file is replaced atomically so readers never see a partial snapshot.
+
+        Args:
+            directory (str): The shared metrics directory.
+        """
+        path = os.path.join(directory, f"metrics_{os.getpid()}.json")
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.snapshot(), f)
+        os.replace(tmp_path, path)
+        self._last_flush = time.monotonic()
+
+    def maybe_flush(self, directory, interval):
+        """
+        Flush the snapshot of this process if the last flush is older than ``interval``.
+
+        Args:
+            directory (str): The shared metrics directory.
+            interval (float): The minimum number of seconds between flushes.
+        """
+        if time.monotonic() - self._last_flush < interval:
+            return
+        if not self._flush_lock.acquire(blocking=False):
+            return
+        try:
+            self.flush(directory)
+        finally:
+            self._flush_lock.release()
+
+
+def merge_snapshots(snapshots):
+    """
+    Merge the snapshots of several processes by summing their samples.
+
+    Args:
+        snapshots (list): Snapshots returned by ``MetricsRegistry.snapshot``.
+
+    Returns:
+        dict: The merged snapshot.
+    """
+    merged = {}
+    for snapshot in snapshots:
+        for name, metric in snapshot.items():
+            target = merged.setdefault(name, {**metric, "samples": {}})
+            for labels, value in metric["samples"]:
+                key = tuple(labels)
+                if metric["type"] == "histogram":
+                    counts, total, count = value
+                    current = target["samples"].get(key)
+                    if current is None:
+                        target["samples"][key] = [list(counts), total, count]
+                    else:
+                        current[0] = [a + b for a, b in zip(current[0], counts)]
+                        current[1] += total
+                        current[2] += count
+                else:
+                    target["samples"][key] = target["samples"].get(key, 0) + value
+
+    for metric in merged.values():
+        metric["samples"] = [[list(k), v] for k, v in metric["samples"].items()]
+    return merged
+
+
+def _format_value(value):
+    if value == math.inf:
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names, values, extra=None):
+    pairs = list(zip(names, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def render_text(snapshot):
+    """
+    Render a snapshot in the Prometheus text exposition format.
+
+    Args:
+        snapshot (dict): A snapshot returned by ``MetricsRegistry.snapshot``.
+
+    Returns:
+        str: The rendered metrics.
+    """
+    lines = []
+    for name in sorted(snapshot):
+        metric = snapshot[name]
+        names = metric["labelnames"]
+        lines.append(f"# HELP {name} {metric['help']}")
+        lines.append(f"# TYPE {name} {metric['type']}")
+        for labels, value in sorted(metric["samples"]):
+            if metric["type"] == "histogram":
+                counts, total, count = value
+                cumulative = 0
+                bounds = list(metric["buckets"]) + [math.inf]
+                for bound, bucket_count in zip(bounds, counts):
+                    cumulative += bucket_count
+                    label_text = _format_labels(
+                        names, labels, ("le", _format_value(float(bound)))
+                    )
+                    lines.append(f"{name}_bucket{label_text} {cumulative}")
+                label_text = _format_labels(names, labels)
+                lines.append(f"{name}_sum{label_text} {_format_value(total)}")
+                lines.append(f"{name}_count{label_text} {count}")
+            else:
+                label_text = _format_labels(names, labels)
+                lines.append(f"{name}{label_text} {_format_value(value)}")
+    return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+REQUEST_LATENCY = registry.histogram(
+    "watchwave_http_request_duration_seconds",
+    "Route latency in seconds.",
+    ("blueprint", "endpoint", "method"),
+)
+RESPONSES = registry.counter(
+    "watchwave_http_responses_total",
+    "Responses by blueprint and status code.",
+    ("blueprint", "status"),
+)
+DB_TIME = registry.histogram(
+    "watchwave_db_time_seconds",
+    "Time spent executing SQL statements per request, in seconds.",
+    ("blueprint",),
+)
+DB_STATEMENTS = registry.histogram(
+    "watchwave_db_statements_per_request",
+    "SQL statements executed per request.",
+    ("blueprint",),
+    buckets=(1, 2, 3, 5, 8, 13, 21, 34, 55),
+)
+UPSTREAM_LATENCY = registry.histogram(
+    "watchwave_upstream_request_duration_seconds",
+    "Upstream HTTP call latency in seconds.",
+    ("upstream", "endpoint"),
+)
+UPSTREAM_ERRORS = registry.counter(
+    "watchwave_upstream_errors_total",
+    "Failed upstream HTTP calls by reason.",
+    ("upstream", "endpoint", "reason"),
+)
+CACHE_REQUESTS = registry.counter(
+    "watchwave_cache_requests_total",
+    "Cache lookups by cache and result (hit or miss).",
+    ("cache", "result"),
+)
+DB_POOL = registry.gauge(
+    "watchwave_db_pool_connections",
+    "Database connection pool usage by state.",
+    ("state",),
+)
+
+
+def _collect_pool_usage():
+    try:
+        from app import db
+
+        pool = db.engine.pool
+    except Exception:
+        return
+    for state, attribute in (
+        ("size", "size"),
+        ("checked_out", "checkedout"),
+        ("checked_in", "checkedin"),
+        ("overflow", "overflow"),
+    ):
+        method = getattr(pool, attribute, None)
+        if method is not None:
+            DB_POOL.set(method(), state=state)
+
+
+def _blueprint_label():
+    return request.blueprint or "app"
+
+
+def _start_request():
+    if not current_app.config.get("METRICS_ENABLED"):
+        return
+    g.metrics_start = time.perf_counter()
+    g.metrics_sql = start_collecting()
+    g.metrics_request = request._get_current_object()
+
+
+def _finish_request(response):
+    start = g.pop("metrics_start", None)
+    stats = g.pop("metrics_sql", None)
+    if start is None:
+        return response
+    if stats is not None:
+        stop_collecting(stats)
+
+    blueprint = _blueprint_label()
+    REQUEST_LATENCY.observe(
+        time.perf_counter() - start,
+        blueprint=blueprint,
+        endpoint=request.endpoint or "unmatched",
+        method=request.method,
+    )
+    RESPONSES.inc(blueprint=blueprint, status=response.status_code)
+    if stats is not None:
+        DB_TIME.observe(stats.total_time, blueprint=blueprint)
+        DB_STATEMENTS.observe(stats.count, blueprint=blueprint)
+
+    directory = current_app.config.get("METRICS_MULTIPROC_DIR")
+    if directory:
+        registry.maybe_flush(
+            directory, current_app.config.get("METRICS_FLUSH_INTERVAL", 5.0)
+        )
+    return response
+
+
+def _discard_request_metrics(exception=None):
+    # A batch sub-request shares ``g`` with the batch and must leave its metrics alone.
+    if g.get("metrics_request") is not request._get_current_object():
+        return
+    del g.metrics_request
+    g.pop("metrics_start", None)
+    stats = g.pop("metrics_sql", None)
+    if stats is not None:
+        stop_collecting(stats)
+
+
+def render_metrics():
+    """
+    Render the metrics of this process, or of every worker in multiprocess mode.
+
+    Returns:
+        str: The metrics in the Prometheus text exposition format.
+    """
+    directory = current_app.config.get("METRICS_MULTIPROC_DIR")
+    if not directory:
+        return render_text(registry.snapshot())
+
+    registry.flush(directory)
+    snapshots = []
+    for path in glob.glob(os.path.join(directory, "metrics_*.json")):
+        pid = os.path.basename(path)[len("metrics_") : -len(".json")]
+        if pid.isdigit() and not _process_alive(int(pid)):
+            mark_process_dead(int(pid), directory)
+            continue
+        try:
+            with open(path) as f:
+                snapshots.append(json.load(f))
+        except (OSError, ValueError):
+            continue
+    return render_text(merge_snapshots(snapshots))
+
+
+def _process_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def mark_process_dead(pid, directory):
+    """
+    Remove the snapshot of a worker that exited, so it is no longer merged.
+
+    Call it from the gunicorn ``child_exit`` server hook. The merged counters drop by
+    the dead worker's values, which Prometheus treats as a counter reset.
+
+    Args:
+        pid (int): The process ID of the worker.
+        directory (str): The shared metrics directory.
+    """
+    for path in (
+        os.path.join(directory, f"metrics_{pid}.json"),
+        os.path.join(directory, f"metrics_{pid}.json.tmp"),
+    ):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+def init_metrics(app):
+    """
+    Register the request hooks that record route metrics.
+
+    The hooks are always registered but only record when the ``METRICS_ENABLED``
+    config option is set.
+
+    Args:
+        app (Flask): The Flask application.
+    """
+    registry.collectors.append(_collect_pool_usage)
+    directory = app.config.get("METRICS_MULTIPROC_DIR")
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
+    app.teardown_request(_discard_request_metrics)
@@ -0,0 +1,330 @@
+"""
+Module for per-request SQL instrumentation.
+
+This module hooks into SQLAlchemy engine events to record how many statements each
+request runs, how long they take in total and which statements repeat. It can warn or
+fail when a route goes over its query budget, flags likely N+1 patterns and logs slow
+statements together with their parameters.
+
+Instrumentation is opt-in through the ``SQL_INSTRUMENTATION`` config option. Tests can
+use ``track_queries`` regardless of that option to assert a per-endpoint query budget.
+
+Classes:
+    QueryStats: Collects statement counts, timings and fingerprints.
+    QueryBudgetExceeded: Raised when a route exceeds its query budget.
+
+Functions:
+    fingerprint: Normalize a SQL statement so repeated shapes compare equal.
+    query_budget: A decorator to set the query budget of a route.
+    start_collecting: Start collecting the statements of the current thread.
+    stop_collecting: Stop a collector started with ``start_collecting``.
+    track_queries: A context manager that collects statements run inside it.
+    init_sql_instrumentation: Registers the engine listeners and request hooks.
+"""
+
+import logging
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+from flask import current_app, g, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+_local = threading.local()
+_listeners_installed = False
+_install_lock = threading.Lock()
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\bIN\s*\((?:\s*\?\s*,?)+\)", re.IGNORECASE)
+_POSITIONAL_PARAM = re.compile(r"%\(\w+\)s|%s|:\w+|\$\d+")
+_WHITESPACE = re.compile(r"\s+")
+
+
+class QueryBudgetExceeded(Exception):
+    """
+    Raised when a request runs more statements than its query budget allows.
+    """
+
+
+class QueryStats:
+    """
+    Collects the statements executed during a request or a tracked block.
+
+    Attributes:
+        count (int): The number of statements executed.
+        total_time (float): The total time spent in the database, in seconds.
+        fingerprints (Counter): The number of executions per statement fingerprint.
+        statements (list): The executed ``(statement, parameters, duration)`` tuples.
+    """
+
+    def __init__(self):
+        """
+        Initialize an empty QueryStats instance.
+        """
+        self.count = 0
+        self.total_time = 0.0
+        self.fingerprints = Counter()
+        self.statements = []
+
+    def record(self, statement, parameters, duration):
+        """
+        Record a single executed statement.
+
+        Args:
+            statement (str): The SQL statement.
+            parameters (tuple | dict): The bound parameters.
+            duration (float): The execution time in seconds.
+        """
+        self.count += 1
+        self.total_time += duration
+        self.fingerprints[fingerprint(statement)] += 1
+        self.statements.append((statement, parameters, duration))
+
+    def repeated(self, threshold):
+        """
+        Return the fingerprints that were executed at least ``threshold`` times.
+
+        Args:
+            threshold (int): The minimum number of executions.
+
+        Returns:
+            dict: The repeated fingerprints mapped to their execution counts.
+        """
+        return {
+            statement: count
+            for statement, count in self.fingerprints.items()
+            if count >= threshold
+        }
+
+    def to_dict(self):
+        """
+        Convert the QueryStats instance to a dictionary.
+
+        Returns:
+            dict: A dictionary summary of the collected statements.
+        """
+        return {
+            "count": self.count,
+            "total_time_ms": round(self.total_time * 1000, 3),
+            "fingerprints": dict(self.fingerprints),
+        }
+
+
+def fingerprint(statement):
+    """
+    Normalize a SQL statement so that statements of the same shape compare equal.
+
+    Literals and bind parameters are replaced with ``?``, ``IN`` lists are collapsed
+    and whitespace is squeezed.
+
+    Args:
+        statement (str): The SQL statement.
+
+    Returns:
+        str: The normalized statement.
+    """
+    normalized = _STRING_LITERAL.sub("?", statement)
+    normalized = _POSITIONAL_PARAM.sub("?", normalized)
+    normalized = _NUMBER_LITERAL.sub("?", normalized)
+    normalized = _IN_LIST.sub("IN (...)", normalized)
+    return _WHITESPACE.sub(" ", normalized).strip()
+
+
+def _active_collectors():
+    if not hasattr(_local, "collectors"):
+        _local.collectors = []
+    return _local.collectors
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _active_collectors():
+        conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    collectors = _active_collectors()
+    if not collectors:
+        return
+
+    start_times = conn.info.get("query_start_time")
+    if not start_times:
+        return
+    duration = time.perf_counter() - start_times.pop()
+
+    for stats in collectors:
+        stats.record(statement, parameters, duration)
+
+    slow_query_ms = _config("SQL_SLOW_QUERY_MS", None)
+    if slow_query_ms is not None and duration * 1000 >= slow_query_ms:
+        logger.warning(
+            "Slow query (%.1f ms): %s; parameters=%r",
+            duration * 1000,
+            statement,
+            parameters,
+        )
+
+
+def _install_listeners():
+    global _listeners_installed
+    with _install_lock:
+        if _listeners_installed:
+            return
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+        _listeners_installed = True
+
+
+def _config(key, default):
+    try:
+        return current_app.config.get(key, default)
+    except RuntimeError:
+        return default
+
+
+def start_collecting():
+    """
+    Start collecting the statements executed by the current thread.
+
+    Returns:
+        QueryStats: The collector, to be passed to ``stop_collecting``.
+    """
+    _install_listeners()
+    stats = QueryStats()
+    _active_collectors().append(stats)
+    return stats
+
+
+def stop_collecting(stats):
+    """
+    Stop collecting statements into ``stats``.
+
+    Args:
+        stats (QueryStats): A collector returned by ``start_collecting``.
+    """
+    collectors = _active_collectors()
+    if stats in collectors:
+        collectors.remove(stats)
+
+
+@contextmanager
+def track_queries():
+    """
+    Collect every statement executed inside the ``with`` block.
+
+    This works whether or not request instrumentation is enabled, so tests can assert
+    the query budget of an endpoint::
+
+        with track_queries() as stats:
+            client.get("/api/watchlist", headers=headers)
+        assert stats.count <= 3
+
+    Yields:
+        QueryStats: The collected statements.
+    """
+    stats = start_collecting()
+    try:
+        yield stats
+    finally:
+        stop_collecting(stats)
+
+
+def query_budget(max_queries):
+    """
+    Decorator to set the maximum number of statements a route may run.
+
+    The budget overrides the ``SQL_QUERY_BUDGET`` default for the decorated route. A
+    route whose number of statements depends on the request can instead set
+    ``g.query_budget`` while it runs.
+
+    Args:
+        max_queries (int): The maximum number of statements per request.
+
+    Returns:
+        function: A decorator that records the budget on the route function.
+    """
+
+    def decorator(f):
+        f.query_budget = max_queries
+        return f
+
+    return decorator
+
+
+def _route_budget():
+    if g.get("query_budget") is not None:
+        return g.query_budget
+    view = current_app.view_functions.get(request.endpoint)
+    budget = getattr(view, "query_budget", None)
+    if budget is None:
+        budget = current_app.config.get("SQL_QUERY_BUDGET")
+    return budget
+
+
+def _start_request():
+    if not current_app.config.get("SQL_INSTRUMENTATION"):
+        return
+    g.sql_stats = start_collecting()
+    g.sql_request = request._get_current_object()
+
+
+def _finish_request(response):
+    stats = g.pop("sql_stats", None)
+    if stats is None:
+        return response
+    stop_collecting(stats)
+
+    config = current_app.config
+    response.headers["X-DB-Query-Count"] = str(stats.count)
+    response.headers["X-DB-Time-Ms"] = f"{stats.total_time * 1000:.3f}"
+
+    repeated = stats.repeated(config.get("SQL_N_PLUS_ONE_THRESHOLD", 3))
+    for statement, count in repeated.items():
+        logger.warning(
+            "Possible N+1 in %s: statement executed %d times: %s",
+            request.endpoint,
+            count,
+            statement,
+        )
+
+    budget = _route_budget()
+    if budget is not None and stats.count > budget:
+        message = (
+            f"{request.endpoint} ran {stats.count} statements, "
+            f"over its query budget of {budget}"
+        )
+        if config.get("SQL_BUDGET_ACTION", "warn") == "raise":
+            raise QueryBudgetExceeded(message)
+        logger.warning(message)
+
+    return response
+
+
+def _discard_request_stats(exception=None):
+    # A batch sub-request shares ``g`` with the batch and must leave its stats alone.
+    if g.get("sql_request") is not request._get_current_object():
+        return
+    del g.sql_request
+    stats = g.pop("sql_stats", None)
+    if stats is not None:
+        stop_collecting(stats)
+
+
+def init_sql_instrumentation(app):
+    """
+    Register the request hooks that collect per-request SQL statistics.
+
+    The hooks are always registered but only collect statements when the
+    ``SQL_INSTRUMENTATION`` config option is enabled.
+
+    Args:
+        app (Flask): The Flask application.
+    """
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
+    app.teardown_request(_discard_request_stats)
@@ -0,0 +1,489 @@
+"""
+Module for request tracing.
+
+This module records where the time of a request goes as a tree of spans: one root span
+per request, with child spans for authentication, every SQL statement and every upstream
+HTTP call. Spans are plain tuples collected in memory and exported when the request
+ends, in the OTLP/JSON encoding, either appended to a local file or posted to an
+OTLP-compatible collector by a background thread, so a request never waits on the
+export.
+
+Every request gets an ID, taken from its ``X-Request-ID`` header or generated, which is
+returned in the response and added to every log record as ``request_id``. Only a
+``TRACE_SAMPLE_RATE`` share of requests is traced; a W3C ``traceparent`` header keeps
+the caller's trace ID and sampling decision. For an unsampled request, ``span`` costs a
+single context variable lookup.
+
+Classes:
+    Span: A finished span.
+    SpanExporter: Exports finished traces in the background.
+
+Functions:
+    span: A context manager that records a span in the current trace.
+    in_current_trace: Bind a function to the current trace, for another thread.
+    current_request_id: Return the ID of the current request.
+    encode_otlp: Encode spans in the OTLP/JSON trace format.
+    init_tracing: Registers the request hooks, SQL listeners and log record factory.
+"""
+
+import contextvars
+import json
+import logging
+import os
+import queue
+import random
+import re
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from typing import NamedTuple
+
+import requests
+from flask import current_app, g, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from .sql import fingerprint
+
+logger = logging.getLogger(__name__)
+
+_TRACEPARENT = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+
+# The trace and span of the running code, or None when the request is not sampled.
+_current = contextvars.ContextVar("trace", default=None)
+_request_id = contextvars.ContextVar("request_id", default="-")
+_listeners_installed = False
+_install_lock = threading.Lock()
+
+
+class Span(NamedTuple):
+    """
+    A finished span.
+
+    Attributes:
+        trace_id (str): The 32 hex digit ID of the trace.
+        span_id (str): The 16 hex digit ID of the span.
+        parent_id (str): The ID of the parent span, or None for the root.
+        name (str): The name of the span.
+        start_ns (int): The start time, in nanoseconds since the epoch.
+        end_ns (int): The end time, in nanoseconds since the epoch.
+        attributes (dict): The attributes of the span.
+        error (bool): Whether the span ended with an exception.
+    """
+
+    trace_id: str
+    span_id: str
+    parent_id: str
+    name: str
+    start_ns: int
+    end_ns: int
+    attributes: dict
+    error: bool
+
+
+class _Trace:
+    def __init__(self, trace_id):
+        self.trace_id = trace_id
+        self.spans = []
+
+
+def _new_id(digits):
+    return f"{random.getrandbits(digits * 4):0{digits}x}"
+
+
+@contextmanager
+def span(name, **attributes):
+    """
+    Record a span in the current trace around the ``with`` block.
+
+    Does nothing when the current request is not sampled. The attributes can be
+    updated through the yielded dictionary.
+
+    Args:
+        name (str): The name of the span.
+        **attributes: The attributes of the span.
+
+    Yields:
+        dict: The attributes of the span, or None when not sampled.
+    """
+    current = _current.get()
+    if current is None:
+        yield None
+        return
+    trace, parent_id = current
+    span_id = _new_id(16)
+    token = _current.set((trace, span_id))
+    start_ns = time.time_ns()
+    error = False
+    try:
+        yield attributes
+    except BaseException:
+        error = True
+        raise
+    finally:
+        _current.reset(token)
+        trace.spans.append(
+            Span(
+                trace.trace_id,
+                span_id,
+                parent_id,
+                name,
+                start_ns,
+                time.time_ns(),
+                attributes,
+                error,
+            )
+        )
+
+
+def in_current_trace(function):
+    """
+    Bind a function to the current trace, to record its spans in another thread.
+
+    Only the trace is carried over, not the Flask contexts of the calling thread.
+
+    Args:
+        function (callable): The function to run in another thread.
+
+    Returns:
+        callable: The function, recording its spans under the current span.
+    """
+    current = _current.get()
+    request_id = _request_id.get()
+    if current is None and request_id == "-":
+        return function
+
+    @wraps(function)
+    def bound(*args, **kwargs):
+        trace_token = _current.set(current)
+        request_id_token = _request_id.set(request_id)
+        try:
+            return function(*args, **kwargs)
+        finally:
+            _request_id.reset(request_id_token)
+            _current.reset(trace_token)
+
+    return bound
+
+
+def current_request_id():
+    """
+    Return the ID of the current request.
+
+    Returns:
+        str: The request ID, or ``-`` outside a request.
+    """
+    return _request_id.get()
+
+
+def _otlp_value(value):
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def encode_otlp(spans, service_name):
+    """
+    Encode spans in the OTLP/JSON trace format.
+
+    Args:
+        spans (list): The ``Span`` tuples to encode.
+        service_name (str): The ``service.name`` resource attribute.
+
+    Returns:
+        dict: The ``ExportTraceServiceRequest`` document.
+    """
+    # The root span of a request is the server span, even with a remote parent.
+    local = {span.span_id for span in spans}
+    return {
+        "resourceSpans": [
+            {
+                "resource": {
+                    "attributes": [
+                        {"key": "service.name", "value": {"stringValue": service_name}}
+                    ]
+                },
+                "scopeSpans": [
+                    {
+                        "scope": {"name": "watchwave"},
+                        "spans": [
+                            {
+                                "traceId": span.trace_id,
+                                "spanId": span.span_id,
+                                "parentSpanId": span.parent_id or "",
+                                "name": span.name,
+                                "kind": 1 if span.parent_id in local else 2,
+                                "startTimeUnixNano": str(span.start_ns),
+                                "endTimeUnixNano": str(span.end_ns),
+                                "attributes": [
+                                    {"key": key, "value": _otlp_value(value)}
+                                    for key, value in span.attributes.items()
+                                ],
+                                "status": {"code": 2 if span.error else 0},
+                            }
+                            for span in spans
+                        ],
+                    }
+                ],
+            }
+        ]
+    }
+
+
+class SpanExporter:
+    """
+    Exports finished traces in the background.
+
+    Traces are queued by the request threads and written by one thread, in batches.
+    When the queue is full, new traces are dropped rather than slowing requests down.
+
+    Attributes:
+        settings (tuple): The arguments the exporter was created with.
+        exporter (str): ``file`` or ``otlp``.
+        path (str): The JSON lines file the ``file`` exporter appends to.
+        endpoint (str): The URL the ``otlp`` exporter posts to.
+        service_name (str): The ``service.name`` of the exported spans.
+    """
+
+    # Seconds the export thread waits for more traces to send in the same batch.
+    BATCH_DELAY = 0.5
+
+    def __init__(self, exporter, path, endpoint, service_name, max_queue=1024):
+        """
+        Initialize a new SpanExporter instance.
+
+        Args:
+            exporter (str): ``file`` or ``otlp``.
+            path (str): The JSON lines file the ``file`` exporter appends to.
+            endpoint (str): The URL the ``otlp`` exporter posts to.
+            service_name (str): The ``service.name`` of the exported spans.
+            max_queue (int): The number of traces queued before dropping.
+        """
+        if exporter not in ("file", "otlp"):
+            raise ValueError(f"Unknown trace exporter: {exporter}")
+        self.settings = (exporter, path, endpoint, service_name)
+        self.exporter = exporter
+        self.path = path
+        self.endpoint = endpoint
+        self.service_name = service_name
+        self.session = requests.Session()
+        self._queue = queue.Queue(max_queue)
+        self._thread = None
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+
+    def submit(self, spans):
+        """
+        Queue the spans of a finished trace for export.
+
+        Args:
+            spans (list): The ``Span`` tuples of the trace.
+        """
+        try:
+            self._queue.put_nowait(spans)
+        except queue.Full:
+            return
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(
+                        target=self._run, name="trace-export", daemon=True
+                    )
+                    self._thread.start()
+
+    def export(self, spans):
+        """
+        Write a batch of spans to the file or the collector.
+
+        Args:
+            spans (list): The ``Span`` tuples to export.
+        """
+        document = encode_otlp(spans, self.service_name)
+        if self.exporter == "file":
+            with open(self.path, "a") as file:
+                file.write(json.dumps(document) + "\n")
+        else:
+            self.session.post(self.endpoint, json=document, timeout=(1, 5))
+
+    def flush(self):
+        """
+        Wait until every queued trace is exported.
+        """
+        self._wake.set()
+        self._queue.join()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            # Gather what else is queued into the same batch.
+            self._wake.wait(self.BATCH_DELAY)
+            self._wake.clear()
+            try:
+                while True:
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                pass
+            spans = [span for trace in batch for span in trace]
+            try:
+                self.export(spans)
+            except Exception:
+                logger.warning("Failed to export %d spans", len(spans), exc_info=True)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+
+def _start_request():
+    request_id = request.headers.get("X-Request-ID") or _new_id(32)
+    g.request_id = request_id
+    g.request_id_token = _request_id.set(request_id)
+    g.traced_request = request._get_current_object()
+
+    config = current_app.config
+    match = _TRACEPARENT.match(request.headers.get("traceparent", ""))
+    if match:
+        trace_id, parent_id = match.group(1), match.group(2)
+        sampled = int(match.group(3), 16) & 1
+    else:
+        trace_id, parent_id = _new_id(32), None
+        sampled = random.random() < config.get("TRACE_SAMPLE_RATE", 0.0)
+    if not sampled or _exporter(current_app) is None:
+        return
+
+    trace = _Trace(trace_id)
+    g.trace = trace
+    g.trace_token = _current.set((trace, parent_id))
+    g.trace_span = span(
+        f"{request.method} {request.url_rule or request.path}",
+        **{
+            "http.method": request.method,
+            "http.target": request.path,
+            "request.id": request_id,
+        },
+    )
+    g.trace_attributes = g.trace_span.__enter__()
+
+
+def _finish_request(response):
+    if "request_id" in g:
+        response.headers["X-Request-ID"] = g.request_id
+    attributes = g.get("trace_attributes")
+    if attributes is not None:
+        attributes["http.status_code"] = response.status_code
+    return response
+
+
+def _end_request(exception=None):
+    # A batch sub-request shares ``g`` with the batch and must leave its trace alone.
+    if g.get("traced_request") is not request._get_current_object():
+        return
+    del g.traced_request
+    trace_span = g.pop("trace_span", None)
+    if trace_span is not None:
+        if exception is not None:
+            trace_span.__exit__(type(exception), exception, None)
+        else:
+            trace_span.__exit__(None, None, None)
+        _current.reset(g.pop("trace_token"))
+        _exporter(current_app).submit(g.pop("trace").spans)
+    token = g.pop("request_id_token", None)
+    if token is not None:
+        _request_id.reset(token)
+
+
+def _exporter(app):
+    # Built on first use, and again when the configuration changes.
+    config = app.config
+    if not config.get("TRACE_EXPORTER"):
+        return None
+    settings = (
+        config["TRACE_EXPORTER"],
+        config.get("TRACE_FILE_PATH")
+        or os.path.join(tempfile.gettempdir(), "watchwave-traces.jsonl"),
+        config.get("TRACE_OTLP_ENDPOINT", "http://localhost:4318/v1/traces"),
+        config.get("TRACE_SERVICE_NAME", "watchwave"),
+    )
+    exporter = app.extensions.get("span_exporter")
+    if exporter is None or exporter.settings != settings:
+        with _install_lock:
+            exporter = app.extensions.get("span_exporter")
+            if exporter is None or exporter.settings != settings:
+                if exporter is not None:
+                    exporter.flush()
+                exporter = SpanExporter(*settings)
+                app.extensions["span_exporter"] = exporter
+    return exporter
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        conn.info.setdefault("trace_start_ns", []).append(time.time_ns())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    current = _current.get()
+    if current is None:
+        return
+    starts = conn.info.get("trace_start_ns")
+    if not starts:
+        return
+    trace, parent_id = current
+    trace.spans.append(
+        Span(
+            trace.trace_id,
+            _new_id(16),
+            parent_id,
+            "db.query",
+            starts.pop(),
+            time.time_ns(),
+            {"db.system": conn.dialect.name, "db.statement": fingerprint(statement)},
+            False,
+        )
+    )
+
+
+def _install_listeners():
+    global _listeners_installed
+    with _install_lock:
+        if _listeners_installed:
+            return
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+        _listeners_installed = True
+
+
+def _install_log_record_factory():
+    factory = logging.getLogRecordFactory()
+    if getattr(factory, "adds_request_id", False):
+        return
+
+    def record_factory(*args, **kwargs):
+        record = factory(*args, **kwargs)
+        record.request_id = _request_id.get()
+        return record
+
+    record_factory.adds_request_id = True
+    logging.setLogRecordFactory(record_factory)
+
+
+def init_tracing(app):
+    """
+    Register the request hooks, SQL listeners and log record factory of tracing.
+
+    Request IDs are always assigned. Spans are recorded only when ``TRACE_EXPORTER``
+    is set, for a ``TRACE_SAMPLE_RATE`` share of the requests.
+
+    Args:
+        app (Flask): The Flask application.
+    """
+    _install_listeners()
+    _install_log_record_factory()
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
+    app.teardown_request(_end_request)
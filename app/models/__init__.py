@@ -1,3 +1,8 @@
 from .user import User
 from .account import Account
-from .motion_pictures import MotionPictures, WatchList
+from .motion_pictures import MotionPictureRow, MotionPictures, WatchList
+from .recommendation import Recommendation
+from .title_stats import TitleStats, TitleActivity
+from .account_stats import AccountStats
+from .sync import SyncState, WatchListTombstone
+from .job_state import JobState
@@ -0,0 +1,60 @@
+"""
+Module for AccountStats model definition.
+
+This module defines the AccountStats model used in the Watch Wave project.
+It holds denormalized counters of an account's watchlist, maintained incrementally with
+the watchlist writes, see app.services.account_stats.
+
+Classes:
+    AccountStats: Represents the watchlist counters of an account.
+"""
+
+from sqlalchemy import Column, Integer, ForeignKey
+from app import db
+
+
+class AccountStats(db.Model):
+    """
+    Represents the watchlist counters of an account.
+
+    Attributes:
+        account_id (int): The account the counters are for.
+        total (int): The number of motion pictures in the watchlist.
+        watched (int): The number of them marked as watched.
+        movies (int): The number of movies in the watchlist.
+        series (int): The number of series in the watchlist.
+    """
+
+    __tablename__ = "account_stats"
+
+    account_id = Column(
+        Integer, ForeignKey("accounts.id", ondelete="CASCADE"), primary_key=True
+    )
+    total = Column(Integer, nullable=False, default=0)
+    watched = Column(Integer, nullable=False, default=0)
+    movies = Column(Integer, nullable=False, default=0)
+    series = Column(Integer, nullable=False, default=0)
+
+    def to_dict(self):
+        """
+        Convert the AccountStats instance to a dictionary.
+
+        Returns:
+            dict: A dictionary representation of the counters.
+        """
+        return {
+            "total": self.total,
+            "watched": self.watched,
+            "unwatched": self.total - self.watched,
+            "movies": self.movies,
+            "series": self.series,
+        }
+
+    def __repr__(self):
+        """
+        Return a string representation of the AccountStats instance.
+
+        Returns:
+            str: A string representation of the counters.
+        """
+        return f"<AccountStats {self.account_id}>"
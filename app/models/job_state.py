@@ -0,0 +1,37 @@
+"""
+Module for JobState model definition.
+
+This module defines the JobState model used in the Watch Wave project. It keeps the
+cursors of the background jobs in the database, so they survive restarts and are shared
+by every process, see app.services.metadata_refresh.
+
+Classes:
+    JobState: Represents the cursor of a background job.
+"""
+
+from sqlalchemy import Column, DateTime, String
+from app import db
+
+
+class JobState(db.Model):
+    """
+    Represents the cursor of a background job.
+
+    Attributes:
+        name (str): The name of the job.
+        cursor (datetime): The point the next run of the job continues from.
+    """
+
+    __tablename__ = "job_state"
+
+    name = Column(String(64), primary_key=True)
+    cursor = Column(DateTime, nullable=True)
+
+    def __repr__(self):
+        """
+        Return a string representation of the JobState instance.
+
+        Returns:
+            str: A string representation of the job state.
+        """
+        return f"<JobState {self.name} {self.cursor}>"
@@ -4,12 +4,23 @@ Module for MotionPictures and WatchList model definitions.
 This module defines the MotionPictures and WatchList models used in the Watch Wave project.
 It includes relationships and constraints relevant to the application's functionality.
 
+The full-text index over motion picture titles and overviews is created together with
+the table: a generated ``tsvector`` column with a GIN index on PostgreSQL, and an FTS5
+table kept in sync by triggers on SQLite.
+
 Classes:
     MotionPictures: Represents a motion picture (movie or series) in the Watch Wave application.
+    MotionPictureRow: A read-only row of the serialized motion picture columns.
     WatchList: Represents a user's watchlist in the Watch Wave application.
 """
 
+from typing import NamedTuple
+
 from sqlalchemy import (
+    DDL,
+    BigInteger,
+    Index,
+    event,
     Column,
     Integer,
     String,
@@ -18,6 +29,7 @@ from sqlalchemy import (
     ForeignKey,
     UniqueConstraint,
     Boolean,
+    select,
 )
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
@@ -38,6 +50,8 @@ class MotionPictures(db.Model):
         type (str): The type of the motion picture (e.g., movie, series).
         created_at (datetime): The timestamp when the motion picture was created.
         updated_at (datetime): The timestamp when the motion picture was last updated.
+        refreshed_at (datetime): The timestamp when the metadata was last fetched from
+            TMDB, or None if it never was.
         watch_list (relationship): The relationship to the WatchList model.
     """
 
@@ -54,10 +68,13 @@ class MotionPictures(db.Model):
     updated_at = Column(
         DateTime, server_default=func.now(), onupdate=func.now(), nullable=False
     )
+    refreshed_at = Column(DateTime, nullable=True, index=True)
 
     watch_list = relationship("WatchList", back_populates="motion_picture")
 
-    __table_args__ = (UniqueConstraint("external_id", name="unique_external_id"),)
+    __table_args__ = (
+        UniqueConstraint("external_id", "type", name="unique_external_id_type"),
+    )
 
     def __init__(
         self, title, external_id, poster_path, type, overview, created_at, updated_at
@@ -124,6 +141,55 @@ class MotionPictures(db.Model):
         return self.title
 
 
+class MotionPictureRow(NamedTuple):
+    """
+    A read-only row of the motion picture columns that ``to_dict`` serializes.
+
+    List routes select these columns directly instead of loading ``MotionPictures``
+    instances, which skips the identity map and change tracking of every row. Being a
+    tuple, a row has no per-instance ``__dict__``.
+    """
+
+    id: int
+    uuid: uuid.UUID
+    title: str
+    external_id: int
+    poster_path: str
+    type: str
+    overview: str
+    created_at: object
+    updated_at: object
+
+    @classmethod
+    def select(cls):
+        """
+        Return a SELECT of the row's columns from ``motion_pictures``.
+
+        Returns:
+            Select: The statement, to be filtered and ordered by the caller.
+        """
+        return select(*(getattr(MotionPictures, field) for field in cls._fields))
+
+    def to_dict(self):
+        """
+        Convert the row to the dictionary ``MotionPictures.to_dict`` returns.
+
+        Returns:
+            dict: A dictionary representation of the motion picture.
+        """
+        return {
+            "id": self.id,
+            "uuid": str(self.uuid),
+            "title": self.title,
+            "external_id": self.external_id,
+            "poster_path": self.poster_path,
+            "type": self.type,
+            "overview": self.overview,
+            "created_at": self.created_at.isoformat(),
+            "updated_at": self.updated_at.isoformat(),
+        }
+
+
 class WatchList(db.Model):
     """
     Represents a user's watchlist in the Watch Wave application.
@@ -133,6 +199,7 @@ class WatchList(db.Model):
         account_id (int): The foreign key linking to the account.
         motion_picture_id (int): The foreign key linking to the motion picture.
         watched (bool): Indicates if the motion picture has been watched.
+        change_seq (int): The number of the last change, in the account's sequence.
         created_at (datetime): The timestamp when the watchlist item was created.
         updated_at (datetime): The timestamp when the watchlist item was last updated.
         account (relationship): The relationship to the Account model.
@@ -147,6 +214,7 @@ class WatchList(db.Model):
         Integer, ForeignKey("motion_pictures.id"), nullable=False
     )
     watched = Column(Boolean, nullable=False)
+    change_seq = Column(BigInteger, nullable=False, default=0, server_default="0")
     created_at = Column(DateTime, server_default=func.now(), nullable=False)
     updated_at = Column(
         DateTime, server_default=func.now(), onupdate=func.now(), nullable=False
@@ -155,6 +223,10 @@ class WatchList(db.Model):
     account = relationship("Account", back_populates="watch_list")
     motion_picture = relationship("MotionPictures", back_populates="watch_list")
 
+    __table_args__ = (
+        Index("ix_watch_list_account_id_change_seq", "account_id", "change_seq"),
+    )
+
     def __init__(self, account_id, motion_picture_id, watched, created_at, updated_at):
         """
         Initialize a new WatchList instance.
@@ -207,3 +279,50 @@ class WatchList(db.Model):
             str: The ID of the watchlist item.
         """
         return str(self.id)
+
+
+# Full-text search over title and overview, see app.services.watchlist_search.
+POSTGRES_SEARCH_DDL = [
+    "ALTER TABLE motion_pictures ADD COLUMN IF NOT EXISTS search_vector tsvector "
+    "GENERATED ALWAYS AS (to_tsvector('simple', coalesce(title, '') || ' ' || "
+    "coalesce(overview, ''))) STORED",
+    "CREATE INDEX IF NOT EXISTS ix_motion_pictures_search_vector "
+    "ON motion_pictures USING gin (search_vector)",
+]
+
+SQLITE_SEARCH_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS motion_pictures_fts USING fts5("
+    "title, overview, content='motion_pictures', content_rowid='id')",
+    "CREATE TRIGGER IF NOT EXISTS motion_pictures_fts_ai AFTER INSERT ON motion_pictures "
+    "BEGIN INSERT INTO motion_pictures_fts (rowid, title, overview) "
+    "VALUES (new.id, new.title, new.overview); END",
+    "CREATE TRIGGER IF NOT EXISTS motion_pictures_fts_ad AFTER DELETE ON motion_pictures "
+    "BEGIN INSERT INTO motion_pictures_fts (motion_pictures_fts, rowid, title, overview) "
+    "VALUES ('delete', old.id, old.title, old.overview); END",
+    "CREATE TRIGGER IF NOT EXISTS motion_pictures_fts_au "
+    "AFTER UPDATE OF title, overview ON motion_pictures "
+    "BEGIN INSERT INTO motion_pictures_fts (motion_pictures_fts, rowid, title, overview) "
+    "VALUES ('delete', old.id, old.title, old.overview); "
+    "INSERT INTO motion_pictures_fts (rowid, title, overview) "
+    "VALUES (new.id, new.title, new.overview); END",
+]
+
+for statement in POSTGRES_SEARCH_DDL:
+    event.listen(
+        MotionPictures.__table__,
+        "after_create",
+        DDL(statement).execute_if(dialect="postgresql"),
+    )
+
+for statement in SQLITE_SEARCH_DDL:
+    event.listen(
+        MotionPictures.__table__,
+        "after_create",
+        DDL(statement).execute_if(dialect="sqlite"),
+    )
+
+event.listen(
+    MotionPictures.__table__,
+    "before_drop",
+    DDL("DROP TABLE IF EXISTS motion_pictures_fts").execute_if(dialect="sqlite"),
+)
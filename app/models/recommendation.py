@@ -0,0 +1,80 @@
+"""
+Module for Recommendation model definition.
+
+This module defines the Recommendation model used in the Watch Wave project.
+It stores the precomputed "people who saved this also saved" neighbours of each
+motion picture, built offline from watchlist co-occurrence.
+
+Classes:
+    Recommendation: Represents one ranked neighbour of a motion picture.
+"""
+
+from sqlalchemy import Column, Integer, SmallInteger, Float, ForeignKey
+from sqlalchemy.orm import relationship
+from app import db
+
+
+class Recommendation(db.Model):
+    """
+    Represents one ranked neighbour of a motion picture.
+
+    Attributes:
+        motion_picture_id (int): The motion picture the recommendation is for.
+        rank (int): The 0-based rank of the neighbour, best first.
+        recommended_id (int): The recommended motion picture.
+        score (float): The similarity score of the two motion pictures.
+        recommended (relationship): The relationship to the recommended MotionPictures.
+    """
+
+    __tablename__ = "motion_picture_recommendations"
+
+    motion_picture_id = Column(
+        Integer,
+        ForeignKey("motion_pictures.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    rank = Column(SmallInteger, primary_key=True)
+    recommended_id = Column(
+        Integer, ForeignKey("motion_pictures.id", ondelete="CASCADE"), nullable=False
+    )
+    score = Column(Float, nullable=False)
+
+    recommended = relationship("MotionPictures", foreign_keys=[recommended_id])
+
+    def __init__(self, motion_picture_id, rank, recommended_id, score):
+        """
+        Initialize a new Recommendation instance.
+
+        Args:
+            motion_picture_id (int): The motion picture the recommendation is for.
+            rank (int): The 0-based rank of the neighbour.
+            recommended_id (int): The recommended motion picture.
+            score (float): The similarity score.
+        """
+        self.motion_picture_id = motion_picture_id
+        self.rank = rank
+        self.recommended_id = recommended_id
+        self.score = score
+
+    def to_dict(self):
+        """
+        Convert the Recommendation instance to a dictionary.
+
+        Returns:
+            dict: A dictionary representation of the recommendation.
+        """
+        return {
+            "motion_picture_id": self.motion_picture_id,
+            "rank": self.rank,
+            "recommended_id": self.recommended_id,
+            "score": self.score,
+        }
+
+    def __repr__(self):
+        """
+        Return a string representation of the Recommendation instance.
+
+        Returns:
+            str: A string representation of the recommendation.
+        """
+        return f"<Recommendation {self.motion_picture_id} -> {self.recommended_id}>"
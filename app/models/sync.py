@@ -0,0 +1,88 @@
+"""
+Module for SyncState and WatchListTombstone model definitions.
+
+This module defines the models behind the delta sync of watchlists. Every watchlist
+write takes the next number of its account's change sequence from ``SyncState``; live
+rows carry it in ``watch_list.change_seq`` and deleted rows leave a tombstone with it,
+so a client can ask for everything after the last number it has seen.
+
+Classes:
+    SyncState: Represents the change sequence of an account.
+    WatchListTombstone: Represents a deleted watchlist entry.
+"""
+
+from sqlalchemy import BigInteger, Column, DateTime, ForeignKey, Integer, func
+from app import db
+
+
+class SyncState(db.Model):
+    """
+    Represents the change sequence of an account.
+
+    Attributes:
+        account_id (int): The account the sequence is for.
+        change_seq (int): The last change number issued.
+        pruned_seq (int): The last change number whose tombstone has been pruned;
+            cursors before it can no longer be served.
+    """
+
+    __tablename__ = "sync_state"
+
+    account_id = Column(
+        Integer, ForeignKey("accounts.id", ondelete="CASCADE"), primary_key=True
+    )
+    change_seq = Column(BigInteger, nullable=False, default=0)
+    pruned_seq = Column(BigInteger, nullable=False, default=0)
+
+    def __repr__(self):
+        """
+        Return a string representation of the SyncState instance.
+
+        Returns:
+            str: A string representation of the sync state.
+        """
+        return f"<SyncState {self.account_id} {self.change_seq}>"
+
+
+class WatchListTombstone(db.Model):
+    """
+    Represents a deleted watchlist entry.
+
+    Attributes:
+        account_id (int): The account the entry belonged to.
+        change_seq (int): The change number of the deletion.
+        watch_list_id (int): The ID of the deleted watchlist entry.
+        motion_picture_id (int): The motion picture of the deleted entry.
+        deleted_at (datetime): The timestamp of the deletion.
+    """
+
+    __tablename__ = "watch_list_tombstones"
+
+    account_id = Column(
+        Integer, ForeignKey("accounts.id", ondelete="CASCADE"), primary_key=True
+    )
+    change_seq = Column(BigInteger, primary_key=True)
+    watch_list_id = Column(Integer, nullable=False)
+    motion_picture_id = Column(Integer, nullable=False)
+    deleted_at = Column(DateTime, server_default=func.now(), nullable=False)
+
+    def to_dict(self):
+        """
+        Convert the WatchListTombstone instance to a dictionary.
+
+        Returns:
+            dict: A dictionary representation of the deleted entry.
+        """
+        return {
+            "id": self.watch_list_id,
+            "motion_picture_id": self.motion_picture_id,
+        }
+
+    def __repr__(self):
+        """
+        Return a string representation of the WatchListTombstone instance.
+
+        Returns:
+            str: A string representation of the deleted entry.
+        """
+        return f"<WatchListTombstone {self.watch_list_id}>"
@@ -0,0 +1,85 @@
+"""
+Module for TitleStats and TitleActivity model definitions.
+
+This module defines the per-title counters behind the "most saved on WatchWave"
+leaderboard. ``TitleStats`` holds the all-time save and watched counts of each motion
+picture, and ``TitleActivity`` holds the same counts per hour, so the recent windows of
+the leaderboard only read the buckets inside them. Both are maintained incrementally
+with the watchlist writes, see app.services.leaderboard.
+
+Classes:
+    TitleStats: Represents the all-time counters of a motion picture.
+    TitleActivity: Represents the counters of a motion picture for one hour.
+"""
+
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, Index
+from app import db
+
+
+class TitleStats(db.Model):
+    """
+    Represents the all-time counters of a motion picture.
+
+    Attributes:
+        motion_picture_id (int): The motion picture the counters are for.
+        saves (int): The number of watchlists the motion picture is in.
+        watched (int): The number of watchlists where it is marked as watched.
+    """
+
+    __tablename__ = "title_stats"
+
+    motion_picture_id = Column(
+        Integer,
+        ForeignKey("motion_pictures.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    saves = Column(Integer, nullable=False, default=0)
+    watched = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        Index("ix_title_stats_saves", "saves"),
+        Index("ix_title_stats_watched", "watched"),
+    )
+
+    def __repr__(self):
+        """
+        Return a string representation of the TitleStats instance.
+
+        Returns:
+            str: A string representation of the counters.
+        """
+        return f"<TitleStats {self.motion_picture_id}>"
+
+
+class TitleActivity(db.Model):
+    """
+    Represents the counters of a motion picture for one hour.
+
+    Attributes:
+        motion_picture_id (int): The motion picture the counters are for.
+        bucket (datetime): The start of the hour.
+        saves (int): The net number of saves during the hour.
+        watched (int): The net number of titles marked as watched during the hour.
+    """
+
+    __tablename__ = "title_activity"
+
+    motion_picture_id = Column(
+        Integer,
+        ForeignKey("motion_pictures.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    bucket = Column(DateTime, primary_key=True)
+    saves = Column(Integer, nullable=False, default=0)
+    watched = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (Index("ix_title_activity_bucket", "bucket"),)
+
+    def __repr__(self):
+        """
+        Return a string representation of the TitleActivity instance.
+
+        Returns:
+            str: A string representation of the hourly counters.
+        """
+        return f"<TitleActivity {self.motion_picture_id} {self.bucket}>"
@@ -5,7 +5,17 @@ main = Blueprint("main", __name__)
 from .auth import auth as auth_blueprint
 from .home import home as home_blueprint
 from .motion_pictures import motion_pictures as motion_pictures_blueprint
+from .metrics import metrics as metrics_blueprint
+from .recommendations import recommendations as recommendations_blueprint
+from .leaderboard import leaderboard as leaderboard_blueprint
+from .posters import posters as posters_blueprint
+from .batch import batch as batch_blueprint
 
 main.register_blueprint(auth_blueprint)
 main.register_blueprint(home_blueprint)
 main.register_blueprint(motion_pictures_blueprint)
+main.register_blueprint(metrics_blueprint)
+main.register_blueprint(recommendations_blueprint)
+main.register_blueprint(leaderboard_blueprint)
+main.register_blueprint(posters_blueprint)
+main.register_blueprint(batch_blueprint)
@@ -14,11 +14,13 @@ from app import db
 import jwt
 from datetime import datetime, timedelta
 from config import Config
+from app.instrumentation import query_budget
 
 auth = Blueprint("auth", __name__)
 
 
 @auth.route("/api/signup", methods=["POST"])
+@query_budget(4)
 def signup():
     """
     Sign up a new user.
@@ -66,6 +68,7 @@ def signup():
 
 
 @auth.route("/api/login", methods=["POST"])
+@query_budget(2)
 def login():
     """
     Log in a user.
@@ -0,0 +1,182 @@
+"""
+Module for the batch route.
+
+This module defines a route that runs several API requests in one HTTP round trip. The
+token is checked and the user loaded once for the whole batch; every sub-request is
+dispatched internally to its route with that user. Sub-requests that touch the database
+run one after the other in the batch's database session, while those that only call
+TMDB run concurrently in their own threads.
+
+Blueprints:
+    batch: The blueprint for the batch route.
+"""
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from flask import Blueprint, current_app, g, has_app_context, jsonify, request
+from werkzeug.exceptions import HTTPException
+from werkzeug.test import EnvironBuilder
+
+from app import db
+from app.instrumentation import in_current_trace, span
+from .utils import token_required
+
+logger = logging.getLogger(__name__)
+
+batch = Blueprint("batch", __name__)
+
+# Routes that only call TMDB and can run outside the batch's database session.
+UPSTREAM_ENDPOINTS = frozenset(
+    {
+        "main.home.latest_movies",
+        "main.home.latest_series",
+        "main.home.details",
+    }
+)
+# Routes whose responses are not JSON or text and cannot be embedded in a batch.
+BINARY_ENDPOINTS = frozenset({"main.posters.get_poster", "main.metrics.get_metrics"})
+
+
+def _dispatch(app, user, environ):
+    """
+    Run one sub-request through its route.
+
+    Only the route's own blueprint hooks run, so the sub-request is not counted as a
+    separate request by the instrumentation.
+
+    Args:
+        app (Flask): The Flask application.
+        user (User): The authenticated user of the batch.
+        environ (dict): The WSGI environment of the sub-request.
+
+    Returns:
+        dict: The ``status``, ``headers`` and ``body`` of the sub-response.
+    """
+    # In the batch's own thread the sub-request shares its application context, and
+    # with it ``g`` and the database session. The sub-request's teardown hooks would
+    # clear the batch's request state from ``g``, so it is put back afterwards.
+    shared = vars(g._get_current_object()) if has_app_context() else None
+    state = dict(shared) if shared is not None else None
+    try:
+        target = {"http.target": environ.get("PATH_INFO", "")}
+        with span("batch.request", **target), app.request_context(environ):
+            g.batch_user = user
+            try:
+                try:
+                    rv = app.dispatch_request()
+                except Exception as e:
+                    rv = app.handle_user_exception(e)
+                response = app.make_response(rv)
+                for name in request.blueprints:
+                    for function in reversed(app.after_request_funcs.get(name, ())):
+                        response = function(response)
+            except Exception:
+                logger.exception("Batch sub-request %s failed", request.path)
+                db.session.rollback()
+                error = {"error": "Internal error"}
+                return {"status": 500, "headers": {}, "body": error}
+    finally:
+        if shared is not None:
+            shared.clear()
+            shared.update(state)
+
+    try:
+        headers = {
+            key: value
+            for key, value in response.headers.items()
+            if key not in ("Content-Length", "Content-Type")
+        }
+        body = response.get_json() if response.is_json else response.get_data(True)
+        return {"status": response.status_code, "headers": headers, "body": body}
+    except Exception:
+        # Streamed and binary bodies cannot be embedded in the batch response.
+        logger.exception("Batch sub-request %s returned no JSON", environ["PATH_INFO"])
+        return {"status": 500, "headers": {}, "body": {"error": "Internal error"}}
+    finally:
+        response.close()
+
+
+@batch.route("/api/batch", methods=["POST"])
+@token_required
+def run_batch(current_user):
+    """
+    Run several API requests in one round trip.
+
+    The body is ``{"requests": [...]}`` where each sub-request has an optional ``id``,
+    a ``method`` (``GET`` by default), a ``path`` with its query string and an
+    optional JSON ``body``. The sub-requests run with the batch's token, and their
+    responses are returned in the same order, each with its own ``status``,
+    ``headers`` and ``body``, so one failing sub-request does not fail the batch.
+
+    Args:
+        current_user (User): The current authenticated user.
+
+    Returns:
+        tuple: A JSON response with one response per sub-request and a status code.
+    """
+    data = request.get_json(silent=True) or {}
+    sub_requests = data.get("requests")
+    max_requests = current_app.config.get("BATCH_MAX_REQUESTS", 20)
+    if not isinstance(sub_requests, list) or not sub_requests:
+        return jsonify({"error": "Expected a list of requests"}), 400
+    if len(sub_requests) > max_requests:
+        return jsonify({"error": f"At most {max_requests} requests per batch"}), 400
+
+    app = current_app._get_current_object()
+    adapter = app.url_map.bind_to_environ(request.environ)
+    plans = []
+    for index, sub_request in enumerate(sub_requests):
+        if not isinstance(sub_request, dict) or not sub_request.get("path"):
+            return jsonify({"error": f"Invalid request at index {index}"}), 400
+        method = str(sub_request.get("method", "GET")).upper()
+        url = urlsplit(sub_request["path"])
+        try:
+            endpoint, _ = adapter.match(url.path, method)
+        except HTTPException as e:
+            return jsonify({"error": f"{method} {url.path}: {e.name}"}), 400
+        if endpoint == request.endpoint:
+            return jsonify({"error": "Batches cannot be nested"}), 400
+        if endpoint in BINARY_ENDPOINTS:
+            return jsonify({"error": f"{url.path} cannot be batched"}), 400
+
+        builder = EnvironBuilder(
+            path=url.path,
+            method=method,
+            query_string=url.query,
+            json=sub_request.get("body"),
+            headers={"Authorization": request.headers.get("Authorization", "")},
+        )
+        plans.append((sub_request.get("id", index), endpoint, builder.get_environ()))
+
+    # The budget of a batch is that of the sub-requests run in this thread.
+    budgets = [
+        getattr(app.view_functions[endpoint], "query_budget", None)
+        for _, endpoint, _ in plans
+        if endpoint not in UPSTREAM_ENDPOINTS
+    ]
+    if None not in budgets:
+        g.query_budget = 1 + sum(budgets)
+
+    upstream = [plan for plan in plans if plan[1] in UPSTREAM_ENDPOINTS]
+    results = {}
+    pool = ThreadPoolExecutor(max_workers=len(upstream)) if upstream else None
+    try:
+        futures = {
+            id(plan): pool.submit(
+                in_current_trace(_dispatch), app, current_user, plan[2]
+            )
+            for plan in upstream
+        }
+        for plan in plans:
+            if plan[1] not in UPSTREAM_ENDPOINTS:
+                results[id(plan)] = _dispatch(app, current_user, plan[2])
+        for key, future in futures.items():
+            results[key] = future.result()
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    responses = [{"id": plan[0], **results[id(plan)]} for plan in plans]
+    return jsonify({"responses": responses}), 200
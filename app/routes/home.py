@@ -7,33 +7,73 @@ Blueprints:
     home: The blueprint for home routes.
 """
 
-from flask import Blueprint, request
-import os
-import requests
-from dotenv import load_dotenv
+import re
+from flask import Blueprint, request, jsonify, g, current_app
 from .utils import token_required
-
-load_dotenv()
+from app.instrumentation import query_budget
+from app.services import tmdb_client, catalog_index, TMDBError, TMDBUnavailable
+from app.services.projection import parse_fields, project
 
 home = Blueprint("home", __name__)
 
-movie_url = "https://api.themoviedb.org/3/movie/popular"
-tv_url = "https://api.themoviedb.org/3/tv/popular"
-search_url = "https://api.themoviedb.org/3/search/multi"
+LANGUAGE = re.compile(r"^[a-z]{2}(-[A-Z]{2})?$")
+REGION = re.compile(r"^[A-Z]{2}$")
+
 
-headers = {
-    "accept": "application/json",
-    "Authorization": f"Bearer {os.getenv('MOVIE_DB_ACCESS_TOKEN')}",
-}
+@home.errorhandler(TMDBError)
+def handle_tmdb_error(error):
+    """
+    Pass TMDB error responses through with their status code.
+
+    Args:
+        error (TMDBError): The upstream error.
+
+    Returns:
+        tuple: A JSON response with the TMDB error and its status code.
+    """
+    return jsonify(error.payload), error.status_code
+
+
+@home.errorhandler(TMDBUnavailable)
+def handle_tmdb_unavailable(error):
+    """
+    Respond quickly when TMDB is down and nothing is cached.
+
+    Args:
+        error (TMDBUnavailable): The upstream error.
+
+    Returns:
+        tuple: A JSON error response and a 503 status code.
+    """
+    return jsonify({"error": "Movie database is temporarily unavailable"}), 503
+
+
+@home.after_request
+def flag_stale_response(response):
+    """
+    Flag responses served from the stale fallback while TMDB is failing.
+
+    Args:
+        response (Response): The response.
+
+    Returns:
+        Response: The response, with a ``Warning`` header if it is stale.
+    """
+    if g.pop("tmdb_stale", False):
+        response.headers["Warning"] = '110 - "Response is Stale"'
+    return response
 
 
 @home.route("/api/home/latest-movies", methods=["GET"])
+@query_budget(1)
 @token_required
 def latest_movies(current_user):
     """
     Fetch the latest popular movies.
 
-    This route fetches the latest popular movies from the external API.
+    This route fetches the latest popular movies from the external API. The
+    ``page``, ``language`` and ``region`` query parameters are passed to TMDB, and
+    ``fields`` trims the results, e.g. ``fields=compact``.
 
     Args:
         current_user (dict): The current authenticated user.
@@ -41,17 +81,24 @@ def latest_movies(current_user):
     Returns:
         dict: A JSON response containing the latest popular movies.
     """
-    response = requests.get(movie_url, headers=headers)
-    return response.json()
+    try:
+        fields = parse_fields(request.args.get("fields"))
+        page_args = _page_args(region=True)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return tmdb_client.popular_movies(fields, **page_args)
 
 
 @home.route("/api/home/latest-series", methods=["GET"])
+@query_budget(1)
 @token_required
 def latest_series(current_user):
     """
     Fetch the latest popular TV series.
 
-    This route fetches the latest popular TV series from the external API.
+    This route fetches the latest popular TV series from the external API. The
+    ``page`` and ``language`` query parameters are passed to TMDB, and ``fields``
+    trims the results, e.g. ``fields=compact``.
 
     Args:
         current_user (dict): The current authenticated user.
@@ -59,17 +106,83 @@ def latest_series(current_user):
     Returns:
         dict: A JSON response containing the latest popular TV series.
     """
-    response = requests.get(tv_url, headers=headers)
-    return response.json()
+    try:
+        fields = parse_fields(request.args.get("fields"))
+        page_args = _page_args()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return tmdb_client.popular_series(fields, **page_args)
+
+
+@home.route("/api/home/details", methods=["POST"])
+@query_budget(1)
+@token_required
+def details(current_user):
+    """
+    Get the TMDB details of many movies and series in one request.
+
+    The body is a JSON list of ``{"external_id": ..., "type": ...}`` objects, where
+    ``type`` is ``movie`` or ``tv``. Cached details are served from the cache and the
+    others are fetched from TMDB concurrently. Each result carries its own ``status``,
+    so one failing item does not fail the batch.
+
+    Args:
+        current_user (dict): The current authenticated user.
+
+    Returns:
+        tuple: A JSON response with one result per requested item and a status code.
+    """
+    items = request.get_json(silent=True)
+    max_batch = current_app.config.get("TMDB_DETAILS_MAX_BATCH", 50)
+    if not isinstance(items, list) or not items:
+        return jsonify({"error": "Expected a list of items"}), 400
+    if len(items) > max_batch:
+        return jsonify({"error": f"At most {max_batch} items per request"}), 400
+
+    pairs = []
+    for item in items:
+        try:
+            kind = {"movie": "movie", "tv": "tv", "series": "tv"}[item["type"]]
+            pairs.append((kind, int(item["external_id"])))
+        except (KeyError, TypeError, ValueError):
+            return jsonify({"error": f"Invalid item: {item}"}), 400
+
+    results = []
+    fetched = tmdb_client.details_many(
+        pairs, ttl=current_app.config.get("TMDB_DETAILS_TTL")
+    )
+    for (kind, external_id), result in zip(pairs, fetched):
+        entry = {"type": kind, "external_id": external_id}
+        if isinstance(result, TMDBError):
+            entry.update(status=result.status_code, error=result.payload)
+        elif isinstance(result, TMDBUnavailable):
+            entry.update(status=503, error="Movie database is temporarily unavailable")
+        else:
+            entry.update(status=200, data=result)
+        results.append(entry)
+    return jsonify(results), 200
 
 
 @home.route("/api/home/search", methods=["GET"])
+@query_budget(2)
 @token_required
 def search(current_user):
     """
     Search for movies and series.
 
-    This route searches for movies and series based on the query parameter.
+    This route searches our own catalog first and, depending on the ``remote`` query
+    parameter, merges in TMDB results after the local hits:
+
+    - ``auto`` (default): only when there are fewer local hits than
+      ``SEARCH_LOCAL_MIN_RESULTS``.
+    - ``always``: always merge TMDB results.
+    - ``never``: only return local hits.
+
+    Local hits only come first on page 1; the ``page`` and ``language`` query
+    parameters page through the TMDB results. Unless ``remote`` is ``never``, page 1
+    carries TMDB's page count, read through the cache, so clients can go on to page 2,
+    which is prefetched. The ``fields`` query parameter trims
+    the results, e.g. ``fields=compact``.
 
     Args:
         current_user (dict): The current authenticated user.
@@ -78,5 +191,76 @@ def search(current_user):
         dict: A JSON response containing the search results.
     """
     query = request.args.get("query")
-    response = requests.get(f"{search_url}?query={query}", headers=headers)
-    return response.json()
+    remote = request.args.get("remote", "auto")
+    config = current_app.config
+    try:
+        fields = parse_fields(request.args.get("fields"))
+        page_args = _page_args()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    results = []
+    if page_args["page"] > 1:
+        if remote == "never":
+            return _search_page([], page_args["page"])
+        remote = "always"
+    elif config.get("SEARCH_LOCAL_ENABLED"):
+        catalog_index.ensure_current()
+        results = project(
+            [_local_result(document) for document in catalog_index.search(query)],
+            fields,
+        )
+
+    if remote == "never":
+        return _search_page(results)
+
+    try:
+        payload = tmdb_client.search(query, fields, **page_args)
+    except TMDBUnavailable:
+        if results:
+            return _search_page(results)
+        raise
+
+    if not results:
+        return payload
+    if remote == "always" or len(results) < config.get("SEARCH_LOCAL_MIN_RESULTS", 5):
+        seen = {result.get("id") for result in results}
+        results += [r for r in payload.get("results", []) if r.get("id") not in seen]
+    # Keep TMDB's page count, so clients can go on to its next pages.
+    return {**payload, "results": results}
+
+
+def _local_result(document):
+    return {
+        "id": document["external_id"],
+        "media_type": document["type"],
+        "title": document["title"],
+        "name": document["title"],
+        "overview": document["overview"],
+        "poster_path": document["poster_path"],
+        "source": "local",
+    }
+
+
+def _search_page(results, page=1):
+    return {
+        "page": page,
+        "results": results,
+        "total_pages": 1,
+        "total_results": len(results),
+    }
+
+
+def _page_args(region=False):
+    args = request.args
+    page = args.get("page", "1")
+    if not page.isdigit() or not 1 <= int(page) <= tmdb_client.max_page:
+        raise ValueError(f"page must be between 1 and {tmdb_client.max_page}")
+    page_args = {"page": int(page), "language": args.get("language")}
+    if page_args["language"] is not None and not LANGUAGE.match(page_args["language"]):
+        raise ValueError("language must look like en or en-US")
+    if region:
+        page_args["region"] = args.get("region")
+        if page_args["region"] is not None and not REGION.match(page_args["region"]):
+            raise ValueError("region must be an ISO 3166-1 code like US")
+    return page_args
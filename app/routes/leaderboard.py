@@ -0,0 +1,50 @@
+"""
+Module for leaderboard routes.
+
+This module defines the route serving the "most saved on WatchWave" leaderboard.
+
+Blueprints:
+    leaderboard: The blueprint for leaderboard routes.
+"""
+
+from flask import Blueprint, request, jsonify, current_app
+from app.instrumentation import query_budget
+from app.services.leaderboard import ALL_TIME, COUNTERS, WINDOWS, top_titles
+from .utils import token_required
+
+leaderboard = Blueprint("leaderboard", __name__)
+
+
+@leaderboard.route("/api/leaderboard", methods=["GET"])
+@query_budget(3)
+@token_required
+def get_leaderboard(current_user):
+    """
+    Get the motion pictures most saved on WatchWave.
+
+    The ``window`` query parameter selects ``all`` time (the default), the last ``24h``
+    or the last ``7d``; ``by`` ranks by ``saves`` (the default) or ``watched``.
+
+    Args:
+        current_user (User): The current authenticated user.
+
+    Returns:
+        tuple: A JSON response with the top motion pictures and a status code.
+    """
+    window = request.args.get("window", ALL_TIME)
+    counter = request.args.get("by", "saves")
+    if window != ALL_TIME and window not in WINDOWS:
+        return jsonify({"error": f"Unknown window: {window}"}), 400
+    if counter not in COUNTERS:
+        return jsonify({"error": f"Unknown ranking: {counter}"}), 400
+
+    size = current_app.config.get("LEADERBOARD_SIZE", 100)
+    limit = min(max(request.args.get("limit", 20, type=int), 1), size)
+    results = top_titles(
+        window,
+        counter,
+        limit,
+        size=size,
+        ttl=current_app.config.get("LEADERBOARD_CACHE_TTL", 60),
+    )
+    return jsonify(results), 200
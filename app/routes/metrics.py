@@ -0,0 +1,46 @@
+"""
+Module for the metrics route.
+
+This module exposes the application metrics in the Prometheus text exposition format.
+With ``METRICS_TOKEN`` set, scrapers have to send it as a bearer token; without it,
+only requests from the local machine are answered.
+
+Blueprints:
+    metrics: The blueprint for the metrics route.
+"""
+
+import hmac
+from flask import Blueprint, Response, current_app, jsonify, request
+from app.instrumentation import render_metrics
+
+LOOPBACK_ADDRESSES = ("127.0.0.1", "::1")
+
+metrics = Blueprint("metrics", __name__)
+
+
+@metrics.route("/metrics", methods=["GET"])
+def get_metrics():
+    """
+    Get the application metrics.
+
+    In multiprocess mode the response merges the metrics of every gunicorn worker.
+
+    Returns:
+        Response: The metrics in the Prometheus text exposition format.
+    """
+    if not current_app.config.get("METRICS_ENABLED"):
+        return jsonify({"error": "Metrics are disabled"}), 404
+
+    token = current_app.config.get("METRICS_TOKEN")
+    if token:
+        expected = f"Bearer {token}"
+        if not hmac.compare_digest(
+            request.headers.get("Authorization", "").encode(), expected.encode()
+        ):
+            return jsonify({"message": "Unauthorized"}), 401
+    elif request.remote_addr not in LOOPBACK_ADDRESSES:
+        return jsonify({"error": "Forbidden"}), 403
+
+    return Response(
+        render_metrics(), mimetype="text/plain; version=0.0.4; charset=utf-8"
+    )
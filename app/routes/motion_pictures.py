@@ -7,22 +7,38 @@ Blueprints:
     motion_pictures: The blueprint for motion pictures routes.
 """
 
-from flask import Blueprint, request, jsonify
-from app.models import MotionPictures, WatchList, Account
+from flask import Blueprint, current_app, request, jsonify
+from app.models import MotionPictureRow, MotionPictures, WatchList, Account
 from app import db
-from .utils import token_required
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from .utils import idempotent, token_required
+from app.services.watchlist_search import search_watchlist
+from app.services.account_stats import get_account_stats
+from app.services.sync import CursorExpired, changes_since, decode_cursor
+from app.services.watchlist_cache import watchlist_cache
+from app.services.projection import parse_fields, project
+from app.instrumentation import query_budget
 from datetime import datetime
+import logging
+
+logger = logging.getLogger(__name__)
 
 motion_pictures = Blueprint("motion_pictures", __name__)
 
 
 @motion_pictures.route("/api/add-to-watchlist", methods=["POST"])
+@query_budget(14)
 @token_required
+@idempotent
 def add_to_watchlist(current_user):
     """
     Add a new motion picture to the watchlist.
 
-    This route allows a user to add a new motion picture to their watchlist.
+    This route allows a user to add a new motion picture to their watchlist. Motion
+    pictures are shared by every account that saves them: the stored one with the
+    same ``external_id`` and ``type`` is reused, and only the first save creates it.
+    TMDB numbers movies and series separately, so both parts identify a title.
 
     Args:
         current_user (Account): The current authenticated user.
@@ -32,44 +48,69 @@ def add_to_watchlist(current_user):
     """
     try:
         data = request.get_json()
+        user_id = current_user.id
+        account_id = current_user.account.id
 
-        new_motion_picture = MotionPictures(
-            title=data["title"],
-            external_id=data["external_id"],
-            poster_path=data["poster_path"],
-            type=data["type"],
-            overview=data["overview"],
-            created_at=datetime.now(),
-            updated_at=datetime.now(),
-        )
-        db.session.add(new_motion_picture)
-        db.session.commit()
+        motion_picture = MotionPictures.query.filter_by(
+            external_id=data["external_id"], type=data["type"]
+        ).first()
+        created = motion_picture is None
+        if created:
+            motion_picture = MotionPictures(
+                title=data["title"],
+                external_id=data["external_id"],
+                poster_path=data["poster_path"],
+                type=data["type"],
+                overview=data["overview"],
+                created_at=datetime.now(),
+                updated_at=datetime.now(),
+            )
+            db.session.add(motion_picture)
+            try:
+                db.session.commit()
+            except IntegrityError:
+                # Another request stored the same title first.
+                db.session.rollback()
+                motion_picture = MotionPictures.query.filter_by(
+                    external_id=data["external_id"], type=data["type"]
+                ).one()
+                created = False
+        if not created and WatchList.query.filter_by(
+            account_id=account_id, motion_picture_id=motion_picture.id
+        ).first():
+            return jsonify({"error": "Motion picture already in watchlist"}), 409
 
         new_watch_list = WatchList(
-            account_id=current_user.account.id,
-            motion_picture_id=new_motion_picture.id,
+            account_id=account_id,
+            motion_picture_id=motion_picture.id,
             watched=False,
             created_at=datetime.now(),
             updated_at=datetime.now(),
         )
         db.session.add(new_watch_list)
         db.session.commit()
+        watchlist_cache.invalidate(user_id)
 
         return jsonify(new_watch_list.to_dict()), 201
 
     except Exception as e:
-        print(f"Error: {e}")
+        logger.exception("Failed to add to watchlist")
         db.session.rollback()
         return jsonify({"error": str(e)}), 500
 
 
 @motion_pictures.route("/api/update-watchlist/<int:watchlist_id>", methods=["PUT"])
+@query_budget(11)
 @token_required
+@idempotent
 def update_watchlist(current_user, watchlist_id):
     """
     Update the watchlist entry.
 
     This route allows a user to update the watched status of a watchlist entry.
+    With ``WRITE_BEHIND_ENABLED`` set, the new status of an entry of the account is
+    queued and applied in the background, and the route returns ``202`` with the
+    queued status only.
 
     Args:
         current_user (Account): The current authenticated user.
@@ -83,6 +124,21 @@ def update_watchlist(current_user, watchlist_id):
         watched = data["watched"]
         updated_at = datetime.now()
 
+        write_behind = current_app.extensions["write_behind"]
+        if write_behind.enabled and isinstance(watched, bool):
+            owned = (
+                db.session.query(WatchList.id)
+                .filter_by(id=watchlist_id, account_id=current_user.account.id)
+                .first()
+            )
+            if owned is None:
+                return jsonify({"error": "Watchlist entry not found"}), 404
+            write_behind.enqueue(current_user.account.id, watchlist_id, watched)
+            return (
+                jsonify({"id": watchlist_id, "watched": watched, "pending": True}),
+                202,
+            )
+
         watchlist_entry = WatchList.query.filter_by(
             id=watchlist_id, account_id=current_user.account.id
         ).first()
@@ -93,6 +149,7 @@ def update_watchlist(current_user, watchlist_id):
             watchlist_entry.watched = watched
         watchlist_entry.updated_at = updated_at
 
+        # The watched status is not part of the cached watchlist, which stays valid.
         db.session.commit()
 
         return jsonify(watchlist_entry.to_dict()), 200
@@ -103,12 +160,21 @@ def update_watchlist(current_user, watchlist_id):
 
 
 @motion_pictures.route("/api/watchlist", methods=["GET"])
+@query_budget(5)
 @token_required
 def get_watchlist(current_user):
     """
     Get the motion pictures in the watchlist for the current user.
 
     This route allows a user to retrieve all motion pictures in their watchlist.
+    With a ``q`` query parameter it instead returns one page of the motion pictures
+    whose title or overview match the search, best match first. The ``page`` and
+    ``per_page`` parameters select the page, and the total number of matches is
+    returned in the ``X-Total-Count`` header.
+
+    The ``fields`` query parameter trims every motion picture to the listed fields
+    and presets, e.g. ``fields=compact``. The serialized watchlist is cached per user
+    and projection until a title is added or removed.
 
     Args:
         current_user (Account): The current authenticated user.
@@ -117,25 +183,117 @@ def get_watchlist(current_user):
         tuple: A JSON response with the motion pictures data and a status code.
     """
     try:
-        # Query the WatchList table to get motion picture IDs for the current user
-        watchlist_entries = WatchList.query.filter_by(
-            account_id=current_user.account.id
-        ).all()
+        fields = parse_fields(request.args.get("fields"))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    try:
+        search_query = request.args.get("q")
+        if search_query is not None:
+            page = max(request.args.get("page", 1, type=int), 1)
+            per_page = min(max(request.args.get("per_page", 20, type=int), 1), 100)
+            results, total = search_watchlist(
+                current_user.account.id, search_query, page, per_page
+            )
+            headers = {
+                "X-Total-Count": str(total),
+                "X-Page": str(page),
+                "X-Per-Page": str(per_page),
+            }
+            results = project([result.to_dict() for result in results], fields)
+            return jsonify(results), 200, headers
+
+        version = watchlist_cache.version(current_user.id)
+        body = watchlist_cache.get(current_user.id, version, fields)
+        if body is not None:
+            return current_app.response_class(body, mimetype="application/json"), 200
+
+        # Select the serialized columns of the motion pictures in the watchlist,
+        # without loading ORM instances
+        rows = db.session.execute(
+            MotionPictureRow.select()
+            .where(
+                MotionPictures.id.in_(
+                    select(WatchList.motion_picture_id).where(
+                        WatchList.account_id == current_user.account.id
+                    )
+                )
+            )
+            .order_by(MotionPictures.id)
+        )
+        motion_picture_data = project(
+            [MotionPictureRow(*row).to_dict() for row in rows], fields
+        )
+
+        response = jsonify(motion_picture_data)
+        watchlist_cache.set(current_user.id, version, response.get_data(), fields)
+        return response, 200
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@motion_pictures.route("/api/watchlist/stats", methods=["GET"])
+@query_budget(3)
+@token_required
+def get_watchlist_stats(current_user):
+    """
+    Get the statistics of the watchlist for the current user.
+
+    This route returns the total, watched, unwatched, movie and series counts of the
+    watchlist from the account's counters, without reading the watchlist itself.
+
+    Args:
+        current_user (Account): The current authenticated user.
+
+    Returns:
+        tuple: A JSON response with the watchlist statistics and a status code.
+    """
+    try:
+        account_id = current_user.account.id
+        write_behind = current_app.extensions["write_behind"]
+        if write_behind.enabled:
+            write_behind.ensure_applied(account_id)
+        return jsonify(get_account_stats(account_id)), 200
 
-        # Extract motion picture IDs from watchlist entries
-        motion_picture_ids = [entry.motion_picture_id for entry in watchlist_entries]
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
 
-        # Query the MotionPictures table to get details for the motion picture IDs
-        motion_pictures = MotionPictures.query.filter(
-            MotionPictures.id.in_(motion_picture_ids)
-        ).all()
 
-        # Convert motion pictures to a list of dictionaries
-        motion_picture_data = [
-            motion_picture.to_dict() for motion_picture in motion_pictures
-        ]
+@motion_pictures.route("/api/watchlist/sync", methods=["GET"])
+@query_budget(5)
+@token_required
+def sync_watchlist(current_user):
+    """
+    Get the changes to the watchlist for the current user since the last sync.
+
+    This route returns the entries added or updated and the entries deleted since the
+    ``cursor`` returned by the previous sync, in change order; without a cursor it
+    returns the whole watchlist. At most ``limit`` changes are returned at once; when
+    ``has_more`` is true the client calls again with the new cursor. A ``410`` response
+    means the cursor is too old and the client has to sync from scratch.
+
+    Args:
+        current_user (Account): The current authenticated user.
+
+    Returns:
+        tuple: A JSON response with the changes and the next cursor, and a status code.
+    """
+    try:
+        since = decode_cursor(request.args.get("cursor"))
+    except ValueError:
+        return jsonify({"error": "Invalid cursor"}), 400
+    limit = min(max(request.args.get("limit", 100, type=int), 1), 500)
+
+    try:
+        account_id = current_user.account.id
+        write_behind = current_app.extensions["write_behind"]
+        if write_behind.enabled:
+            write_behind.ensure_applied(account_id)
+        return jsonify(changes_since(account_id, since, limit)), 200
 
-        return jsonify(motion_picture_data), 200
+    except CursorExpired:
+        return jsonify({"error": "Cursor expired, sync from scratch"}), 410
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -144,7 +302,9 @@ def get_watchlist(current_user):
 @motion_pictures.route(
     "/api/remove-from-watchlist/<int:motion_picture_id>", methods=["DELETE"]
 )
+@query_budget(9)
 @token_required
+@idempotent
 def remove_from_watchlist(current_user, motion_picture_id):
     """
     Remove a motion picture from the watchlist.
@@ -168,8 +328,10 @@ def remove_from_watchlist(current_user, motion_picture_id):
             return jsonify({"error": "Watchlist entry not found"}), 404
 
         # Remove the entry from the watchlist
+        user_id = current_user.id
         db.session.delete(watchlist_entry)
         db.session.commit()
+        watchlist_cache.invalidate(user_id)
 
         return jsonify({"message": "Motion picture removed from watchlist"}), 200
 
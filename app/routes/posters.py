@@ -0,0 +1,67 @@
+"""
+Module for poster routes.
+
+This module defines the route serving the poster of a stored motion picture from the
+local poster cache, optionally resized.
+
+Blueprints:
+    posters: The blueprint for poster routes.
+"""
+
+import mimetypes
+
+from flask import Blueprint, request, jsonify, send_file, current_app
+from app import db
+from app.instrumentation import query_budget
+from app.models import MotionPictures
+from app.services.posters import PosterNotFound, PosterUnavailable, poster_cache
+
+posters = Blueprint("posters", __name__)
+
+
+@posters.route("/api/posters/<int:motion_picture_id>", methods=["GET"])
+@query_budget(1)
+def get_poster(motion_picture_id):
+    """
+    Get the poster of a motion picture.
+
+    The ``w`` query parameter selects one of the ``POSTER_WIDTHS``; without it the
+    original is served. This route is not authenticated so it can be used directly in
+    ``<img>`` tags. Files are sent with ``sendfile`` where the server supports it, or
+    with ``X-Sendfile`` when ``USE_X_SENDFILE`` is set, and support conditional and
+    range requests.
+
+    Args:
+        motion_picture_id (int): The ID of the motion picture.
+
+    Returns:
+        Response: The image, or a JSON error response and a status code.
+    """
+    width = request.args.get("w")
+    try:
+        width = None if width in (None, "original") else int(width)
+    except ValueError:
+        return jsonify({"error": "Invalid width"}), 400
+    if width is not None and width not in poster_cache.widths:
+        return jsonify({"error": "Unsupported width"}), 400
+
+    motion_picture = db.session.get(MotionPictures, motion_picture_id)
+    if motion_picture is None or not motion_picture.poster_path:
+        return jsonify({"error": "Poster not found"}), 404
+
+    try:
+        path, digest = poster_cache.get(motion_picture.poster_path, width)
+    except PosterNotFound:
+        return jsonify({"error": "Poster not found"}), 404
+    except PosterUnavailable:
+        return jsonify({"error": "Poster origin is unavailable"}), 502
+
+    response = send_file(
+        path,
+        mimetype=mimetypes.guess_type(path)[0] or "image/jpeg",
+        conditional=True,
+        etag=f"{digest}-{width or 'original'}",
+        max_age=current_app.config.get("POSTER_MAX_AGE", 2592000),
+    )
+    response.cache_control.public = True
+    return response
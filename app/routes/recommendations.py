@@ -0,0 +1,43 @@
+"""
+Module for recommendations routes.
+
+This module defines the route serving the precomputed "people who saved this also saved"
+recommendations of a motion picture.
+
+Blueprints:
+    recommendations: The blueprint for recommendations routes.
+"""
+
+from flask import Blueprint, request, jsonify, current_app
+from app.instrumentation import query_budget
+from app.services.recommendations import get_recommendations
+from .utils import token_required
+
+recommendations = Blueprint("recommendations", __name__)
+
+
+@recommendations.route(
+    "/api/recommendations/<int:motion_picture_id>", methods=["GET"]
+)
+@query_budget(2)
+@token_required
+def get_motion_picture_recommendations(current_user, motion_picture_id):
+    """
+    Get the motion pictures most often saved together with a motion picture.
+
+    Recommendations are precomputed by ``flask build-recommendations``.
+
+    Args:
+        current_user (User): The current authenticated user.
+        motion_picture_id (int): The ID of the motion picture.
+
+    Returns:
+        tuple: A JSON response with the recommended motion pictures and a status code.
+    """
+    limit = min(max(request.args.get("limit", 10, type=int), 1), 50)
+    results = get_recommendations(
+        motion_picture_id,
+        limit,
+        ttl=current_app.config.get("RECOMMENDATIONS_CACHE_TTL", 3600),
+    )
+    return jsonify(results), 200
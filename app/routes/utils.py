@@ -1,18 +1,24 @@
 """
-Module for token authentication.
+Module for token authentication and idempotent retries.
 
 This module provides a decorator function to ensure routes are accessed only by authenticated users.
 
 Functions:
     token_required: A decorator to validate JWT tokens and authorize users.
+    idempotent: A decorator to replay the response of a retried request.
 """
 
-from flask import request, jsonify
+from flask import current_app, g, request, jsonify
 from functools import wraps
+import hashlib
 import jwt
+from app.instrumentation import span
 from app.models import User
 from config import Config
 
+# How long a request holds its idempotency key while it runs.
+IDEMPOTENCY_LOCK_TTL = 60
+
 
 def token_required(f):
     """
@@ -20,6 +26,7 @@ def token_required(f):
 
     This decorator ensures that the route can only be accessed by users with a valid JWT token.
     It extracts the token from the request headers, decodes it, and fetches the current user.
+    Sub-requests of a batch reuse the user the batch already authenticated.
 
     Args:
         f (function): The route function to be decorated.
@@ -30,6 +37,10 @@ def token_required(f):
 
     @wraps(f)
     def decorated(*args, **kwargs):
+        batch_user = g.get("batch_user")
+        if batch_user is not None:
+            return f(batch_user, *args, **kwargs)
+
         token = None
         if "Authorization" in request.headers:
             auth_header = request.headers["Authorization"]
@@ -40,11 +51,92 @@ def token_required(f):
             return jsonify({"message": "Unauthorized"}), 401
 
         try:
-            data = jwt.decode(token, Config.SECRET_KEY, algorithms=["HS256"])
-            current_user = User.query.filter_by(id=data["public_id"]).first()
+            with span("auth.decode_token"):
+                data = jwt.decode(token, Config.SECRET_KEY, algorithms=["HS256"])
+            with span("auth.load_user"):
+                current_user = User.query.filter_by(id=data["public_id"]).first()
         except Exception as e:
             return jsonify({"message": "Unauthorized"}), 401
 
         return f(current_user, *args, **kwargs)
 
     return decorated
+
+
+def idempotent(f):
+    """
+    Decorator to replay the stored response of a retried request.
+
+    A client that sends an ``Idempotency-Key`` header gets the response of the first
+    request with that key back on every retry, without the route running again. The
+    responses are kept in the idempotency store shared by the workers for
+    ``IDEMPOTENCY_TTL`` seconds, per user. Reusing a key for a different request is
+    rejected with ``422``, and a retry sent while the first request still runs gets
+    ``409``. Server errors are not stored, so those requests can be retried. Apply it
+    below ``token_required``.
+
+    Args:
+        f (function): The route function to be decorated.
+
+    Returns:
+        function: The decorated function that replays stored responses.
+    """
+
+    @wraps(f)
+    def decorated(current_user, *args, **kwargs):
+        idempotency_key = request.headers.get("Idempotency-Key")
+        if not idempotency_key:
+            return f(current_user, *args, **kwargs)
+        if len(idempotency_key) > 255:
+            return jsonify({"error": "Idempotency-Key is too long"}), 400
+
+        key = f"idempotency:{current_user.id}:{idempotency_key}"
+        fingerprint = hashlib.sha256(
+            request.method.encode() + request.path.encode() + request.get_data()
+        ).hexdigest()
+
+        store = current_app.extensions["idempotency_store"]
+        stored = store.get(key, name="idempotency")
+        while stored is None:
+            if store.backend.add(
+                key, {"fingerprint": fingerprint}, ttl=IDEMPOTENCY_LOCK_TTL
+            ):
+                try:
+                    response = current_app.make_response(
+                        f(current_user, *args, **kwargs)
+                    )
+                except Exception:
+                    store.delete(key)
+                    raise
+                if response.status_code >= 500:
+                    store.delete(key)
+                else:
+                    store.set(
+                        key,
+                        {
+                            "fingerprint": fingerprint,
+                            "status": response.status_code,
+                            "mimetype": response.mimetype,
+                            "body": response.get_data(as_text=True),
+                        },
+                        ttl=current_app.config.get("IDEMPOTENCY_TTL", 86400),
+                    )
+                return response
+            # Another request holds the key, unless it expired or was released
+            # since, in which case the key is claimed again.
+            stored = store.backend.get(key)
+
+        if stored.get("fingerprint") != fingerprint:
+            return (
+                jsonify({"error": "Idempotency-Key was used for another request"}),
+                422,
+            )
+        if "status" not in stored:
+            return jsonify({"error": "A request with this key is in progress"}), 409
+        response = current_app.response_class(
+            stored["body"], status=stored["status"], mimetype=stored["mimetype"]
+        )
+        response.headers["Idempotent-Replayed"] = "true"
+        return response
+
+    return decorated
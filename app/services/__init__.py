@@ -0,0 +1,12 @@
+from .tmdb import TMDBClient, TMDBError, TMDBUnavailable, tmdb_client
+from .circuit_breaker import CircuitBreaker, CircuitOpenError
+from .prewarm import Prewarmer, init_prewarm
+from .rate_limiter import RateLimiter, RateLimitExceeded
+from .search_index import CatalogSearchIndex, catalog_index, init_search_index
+from .leaderboard import init_leaderboard
+from .account_stats import init_account_stats
+from .sync import init_sync
+from .write_behind import WatchedQueue, WriteBehind, init_write_behind
+from .metadata_refresh import MetadataRefresher
+from .posters import PosterCache, PosterNotFound, PosterUnavailable, poster_cache
+from .watchlist_cache import WatchlistCache, watchlist_cache
@@ -0,0 +1,159 @@
+"""
+Module for per-account watchlist statistics.
+
+This module keeps the ``account_stats`` counters of every account current as watchlist
+rows are inserted, updated and deleted, so the statistics of a watchlist cost one
+primary-key read however long it is. The counters are written in the same flush as the
+watchlist change, so they commit or roll back with it; the movie and series counters
+read the type of the motion picture with a subquery of the same statement. A repair job
+recomputes them from the watchlists in case they ever drift.
+
+Functions:
+    get_account_stats: Return the watchlist statistics of an account.
+    rebuild_account_stats: Recompute the counters from the watchlists.
+    init_account_stats: Registers the hooks that maintain the counters.
+"""
+
+from sqlalchemy import case, event, func, inspect, select
+
+from app import db
+
+MOVIE = "movie"
+
+
+def get_account_stats(account_id):
+    """
+    Return the watchlist statistics of an account.
+
+    Args:
+        account_id (int): The ID of the account.
+
+    Returns:
+        dict: The ``total``, ``watched``, ``unwatched``, ``movies`` and ``series``
+        counts.
+    """
+    from app.models import AccountStats
+
+    stats = db.session.get(AccountStats, account_id)
+    if stats is None:
+        stats = AccountStats(
+            account_id=account_id, total=0, watched=0, movies=0, series=0
+        )
+    return stats.to_dict()
+
+
+def rebuild_account_stats(account_id=None):
+    """
+    Recompute the counters from the watchlists.
+
+    Args:
+        account_id (int): The account to repair; defaults to every account.
+
+    Returns:
+        int: The number of accounts with counters.
+    """
+    from app.models import AccountStats, MotionPictures, WatchList
+
+    is_movie = MotionPictures.type == MOVIE
+    query = (
+        db.session.query(
+            WatchList.account_id,
+            func.count(),
+            func.sum(case((WatchList.watched, 1), else_=0)),
+            func.sum(case((is_movie, 1), else_=0)),
+            func.sum(case((is_movie, 0), else_=1)),
+        )
+        .join(MotionPictures, MotionPictures.id == WatchList.motion_picture_id)
+        .group_by(WatchList.account_id)
+    )
+    stale = db.session.query(AccountStats)
+    if account_id is not None:
+        query = query.filter(WatchList.account_id == account_id)
+        stale = stale.filter(AccountStats.account_id == account_id)
+    rows = query.all()
+
+    try:
+        stale.delete()
+        if rows:
+            db.session.execute(
+                AccountStats.__table__.insert(),
+                [
+                    {
+                        "account_id": id,
+                        "total": total,
+                        "watched": watched or 0,
+                        "movies": movies or 0,
+                        "series": series or 0,
+                    }
+                    for id, total, watched, movies, series in rows
+                ],
+            )
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return len(rows)
+
+
+def init_account_stats(app):
+    """
+    Register the hooks that keep the counters current with watchlist writes.
+
+    The counters are updated by the flush that writes the watchlist row, on the same
+    connection, so they are part of the same transaction.
+
+    Args:
+        app (Flask): The Flask application.
+    """
+    from app.models import AccountStats, MotionPictures, WatchList
+    from .counters import increment
+
+    stats = AccountStats.__table__
+
+    def is_movie(motion_picture_id):
+        return (
+            select(case((MotionPictures.type == MOVIE, 1), else_=0))
+            .where(MotionPictures.id == motion_picture_id)
+            .scalar_subquery()
+        )
+
+    def after_insert(mapper, connection, target):
+        movie = is_movie(target.motion_picture_id)
+        increment(
+            connection,
+            stats,
+            {"account_id": target.account_id},
+            total=1,
+            watched=1 if target.watched else 0,
+            movies=movie,
+            series=1 - movie,
+        )
+
+    def after_update(mapper, connection, target):
+        history = inspect(target).attrs.watched.history
+        if not history.added or not history.deleted:
+            return
+        if bool(history.added[0]) == bool(history.deleted[0]):
+            return
+        increment(
+            connection,
+            stats,
+            {"account_id": target.account_id},
+            watched=1 if history.added[0] else -1,
+        )
+
+    def after_delete(mapper, connection, target):
+        movie = is_movie(target.motion_picture_id)
+        increment(
+            connection,
+            stats,
+            {"account_id": target.account_id},
+            total=-1,
+            watched=-1 if target.watched else 0,
+            movies=-movie,
+            series=movie - 1,
+        )
+
+    event.listen(WatchList, "after_insert", after_insert)
+    event.listen(WatchList, "after_update", after_update)
+    event.listen(WatchList, "after_delete", after_delete)
@@ -0,0 +1,193 @@
+"""
+Module for the circuit breaker used around upstream calls.
+
+A circuit breaker stops sending requests to an upstream that keeps failing or responding
+slowly, so callers fail fast instead of tying up workers. It trips open when the failure
+rate over a window of recent calls crosses a threshold; slow calls count as failures.
+After a cool-down it lets a few probe calls through (half-open) and closes again once
+they succeed.
+
+Classes:
+    CircuitOpenError: Raised when a call is rejected by an open circuit.
+    CircuitBreaker: Tracks upstream health and decides which calls may proceed.
+"""
+
+import threading
+import time
+from collections import deque
+
+from app.instrumentation.metrics import registry
+
+BREAKER_STATE = registry.gauge(
+    "watchwave_circuit_breaker_state",
+    "Circuit breaker state: 0 closed, 1 open, 2 half-open.",
+    ("name",),
+)
+
+
+class CircuitOpenError(Exception):
+    """
+    Raised when a call is rejected because the circuit is open.
+    """
+
+
+class CircuitBreaker:
+    """
+    Tracks upstream health and decides which calls may proceed.
+
+    Attributes:
+        name (str): The name reported in the metrics.
+        failure_rate_threshold (float): The failure rate that trips the circuit.
+        slow_call_threshold (float): Calls slower than this many seconds count as failures.
+        window_size (int): The number of recent calls considered.
+        minimum_calls (int): The number of calls needed before the circuit can trip.
+        reset_timeout (float): The number of seconds the circuit stays open.
+        half_open_max_calls (int): The number of successful probes needed to close.
+        state (str): The current state: closed, open or half_open.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    _state_values = {CLOSED: 0, OPEN: 1, HALF_OPEN: 2}
+
+    def __init__(
+        self,
+        name,
+        failure_rate_threshold=0.5,
+        slow_call_threshold=2.0,
+        window_size=20,
+        minimum_calls=5,
+        reset_timeout=30.0,
+        half_open_max_calls=1,
+    ):
+        """
+        Initialize a new CircuitBreaker instance.
+
+        Args:
+            name (str): The name reported in the metrics.
+            failure_rate_threshold (float): The failure rate that trips the circuit.
+            slow_call_threshold (float): The latency in seconds above which a call fails.
+            window_size (int): The number of recent calls considered.
+            minimum_calls (int): The number of calls needed before the circuit can trip.
+            reset_timeout (float): The number of seconds the circuit stays open.
+            half_open_max_calls (int): The number of successful probes needed to close.
+        """
+        self.name = name
+        self.failure_rate_threshold = failure_rate_threshold
+        self.slow_call_threshold = slow_call_threshold
+        self.window_size = window_size
+        self.minimum_calls = minimum_calls
+        self.reset_timeout = reset_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self._lock = threading.Lock()
+        self._outcomes = deque(maxlen=window_size)
+        self._opened_at = 0.0
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+        self._set_state(self.CLOSED)
+
+    def _set_state(self, state):
+        self.state = state
+        BREAKER_STATE.set(self._state_values[state], name=self.name)
+
+    def _open(self):
+        self._opened_at = time.monotonic()
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+        self._set_state(self.OPEN)
+
+    def _close(self):
+        self._outcomes.clear()
+        self._set_state(self.CLOSED)
+
+    def rejects_calls(self):
+        """
+        Return whether a call would be rejected now, without taking a probe slot.
+
+        Lets callers skip work that only makes sense for an allowed call, such as
+        waiting for a rate limit token.
+
+        Returns:
+            bool: True if the circuit is open, or half-open with every probe in flight.
+        """
+        with self._lock:
+            if self.state == self.OPEN:
+                return time.monotonic() - self._opened_at < self.reset_timeout
+            if self.state == self.HALF_OPEN:
+                return self._probes_in_flight >= self.half_open_max_calls
+            return False
+
+    def allow_request(self):
+        """
+        Return whether a call may proceed, moving from open to half-open when due.
+
+        Returns:
+            bool: True if the call may proceed.
+        """
+        with self._lock:
+            if self.state == self.OPEN:
+                if time.monotonic() - self._opened_at < self.reset_timeout:
+                    return False
+                self._set_state(self.HALF_OPEN)
+            if self.state == self.HALF_OPEN:
+                if self._probes_in_flight >= self.half_open_max_calls:
+                    return False
+                self._probes_in_flight += 1
+            return True
+
+    def record(self, failed):
+        """
+        Record the outcome of a call that was allowed to proceed.
+
+        Args:
+            failed (bool): Whether the call failed or was too slow.
+        """
+        with self._lock:
+            if self.state == self.HALF_OPEN:
+                self._probes_in_flight = max(self._probes_in_flight - 1, 0)
+                if failed:
+                    self._open()
+                    return
+                self._probe_successes += 1
+                if self._probe_successes >= self.half_open_max_calls:
+                    self._close()
+                return
+
+            if self.state == self.OPEN:
+                return
+
+            self._outcomes.append(failed)
+            calls = len(self._outcomes)
+            if calls >= self.minimum_calls:
+                failures = sum(self._outcomes)
+                if failures / calls >= self.failure_rate_threshold:
+                    self._open()
+
+    def call(self, f, is_failure=None):
+        """
+        Run ``f`` through the circuit breaker.
+
+        Args:
+            f (callable): The upstream call.
+            is_failure (callable): Decides whether an exception raised by ``f`` counts as
+                an upstream failure. Every exception counts if omitted.
+
+        Returns:
+            object: The result of ``f``.
+
+        Raises:
+            CircuitOpenError: If the circuit is open.
+        """
+        if not self.allow_request():
+            raise CircuitOpenError(f"Circuit {self.name} is open")
+
+        start = time.monotonic()
+        try:
+            result = f()
+        except Exception as e:
+            self.record(is_failure is None or is_failure(e))
+            raise
+        self.record(time.monotonic() - start > self.slow_call_threshold)
+        return result
@@ -0,0 +1,102 @@
+"""
+Module for denormalized counters.
+
+This module applies increments to counter rows with a single statement, so counters can
+be kept up to date inside the transaction that changes the rows they count. Increments
+are an ``INSERT ... ON CONFLICT DO UPDATE`` on PostgreSQL and SQLite; decrements, whose
+row always exists already, are a plain ``UPDATE``. A delta can also be a SQL expression,
+such as a scalar subquery, which is evaluated by the same statement.
+
+Functions:
+    increment: Add deltas to the counters of a row, creating the row if needed.
+    next_value: Increment a sequence counter and return its new value.
+"""
+
+from sqlalchemy import select, update
+from sqlalchemy.dialects import postgresql, sqlite
+
+_UPSERTS = {
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert,
+}
+
+
+def increment(connection, table, keys, **deltas):
+    """
+    Add deltas to the counters of a row, creating the row if needed.
+
+    Args:
+        connection (Connection): The connection of the current transaction.
+        table (Table): The counters table.
+        keys (dict): The primary key values of the row.
+        **deltas (int): The amount to add to each counter column, or a SQL expression.
+    """
+    deltas = {
+        column: delta
+        for column, delta in deltas.items()
+        if not isinstance(delta, int) or delta
+    }
+    if not deltas:
+        return
+    # Only increments may have to create the row.
+    create = all(delta > 0 for delta in deltas.values() if isinstance(delta, int))
+
+    defaults = {c.name: 0 for c in table.c if c.name not in keys}
+    upsert = _UPSERTS.get(connection.dialect.name)
+
+    if upsert is not None and create:
+        statement = upsert(table).values({**defaults, **keys, **deltas})
+        connection.execute(
+            statement.on_conflict_do_update(
+                index_elements=list(keys),
+                set_={
+                    column: table.c[column] + statement.excluded[column]
+                    for column in deltas
+                },
+            )
+        )
+        return
+
+    result = connection.execute(
+        update(table)
+        .where(*(table.c[column] == value for column, value in keys.items()))
+        .values({column: table.c[column] + delta for column, delta in deltas.items()})
+    )
+    if not result.rowcount and create:
+        connection.execute(table.insert().values({**defaults, **keys, **deltas}))
+
+
+def next_value(connection, table, keys, column):
+    """
+    Increment a sequence counter and return its new value.
+
+    The row stays locked until the transaction ends, so the numbers of one row are
+    committed in the order they are issued.
+
+    Args:
+        connection (Connection): The connection of the current transaction.
+        table (Table): The table holding the counter.
+        keys (dict): The primary key values of the row.
+        column (str): The counter column.
+
+    Returns:
+        int: The new value of the counter.
+    """
+    defaults = {c.name: 0 for c in table.c if c.name not in keys}
+    upsert = _UPSERTS.get(connection.dialect.name)
+    if upsert is not None:
+        return connection.execute(
+            upsert(table)
+            .values({**defaults, **keys, column: 1})
+            .on_conflict_do_update(
+                index_elements=list(keys), set_={column: table.c[column] + 1}
+            )
+            .returning(table.c[column])
+        ).scalar_one()
+
+    increment(connection, table, keys, **{column: 1})
+    return connection.execute(
+        select(table.c[column]).where(
+            *(table.c[key] == value for key, value in keys.items())
+        )
+    ).scalar_one()
@@ -0,0 +1,180 @@
+"""
+Module for the persistent HTTP cache of TMDB responses.
+
+This module stores TMDB response bodies on local disk together with their ``ETag``,
+``Last-Modified`` and ``Cache-Control`` metadata. A response is served without a network
+call while it is fresh according to ``Cache-Control``; once it is stale it is revalidated
+with a conditional GET, so an unchanged response costs a ``304 Not Modified`` instead of
+the full payload. The store survives restarts, so a new worker starts warm.
+
+Classes:
+    HTTPCache: A disk-backed cache of HTTP responses with revalidation metadata.
+"""
+
+import time
+
+from app.cache.backends import SQLiteCache
+
+
+class HTTPCache:
+    """
+    A disk-backed cache of HTTP responses with revalidation metadata.
+
+    Attributes:
+        store (SQLiteCache): The on-disk store of the cached responses.
+        default_max_age (float): The freshness lifetime of responses without a
+            ``max-age`` directive; 0 revalidates them on every use.
+        retention (float): How long a response is kept for revalidation, in seconds.
+    """
+
+    def __init__(self, path, default_max_age=0, retention=604800):
+        """
+        Initialize a new HTTPCache instance.
+
+        Args:
+            path (str): The path of the SQLite database file.
+            default_max_age (float): The freshness lifetime of responses without a
+                ``max-age`` directive.
+            retention (float): How long a response is kept for revalidation, in seconds.
+        """
+        self.store = SQLiteCache(path)
+        self.default_max_age = default_max_age
+        self.retention = retention
+
+    @staticmethod
+    def parse_cache_control(value):
+        """
+        Parse a ``Cache-Control`` header.
+
+        Args:
+            value (str): The header value.
+
+        Returns:
+            dict: The directives, with ``None`` for directives without a value.
+        """
+        directives = {}
+        for part in (value or "").split(","):
+            name, _, argument = part.strip().partition("=")
+            if name:
+                directives[name.lower()] = argument.strip('"') or None
+        return directives
+
+    @staticmethod
+    def key(url, params=None):
+        """
+        Return the cache key of a request.
+
+        Args:
+            url (str): The request URL.
+            params (dict): The query parameters.
+
+        Returns:
+            str: The cache key.
+        """
+        if params:
+            url += "?" + "&".join(f"{k}={v}" for k, v in sorted(params.items()))
+        return "http:" + url
+
+    def lookup(self, url, params=None):
+        """
+        Return the cached entry of a request.
+
+        Args:
+            url (str): The request URL.
+            params (dict): The query parameters.
+
+        Returns:
+            dict: The entry with ``body``, ``etag``, ``last_modified`` and
+            ``fresh_until``, or None.
+        """
+        return self.store.get(self.key(url, params))
+
+    @staticmethod
+    def is_fresh(entry):
+        """
+        Return whether an entry can be served without revalidation.
+
+        Args:
+            entry (dict): A cached entry.
+
+        Returns:
+            bool: True if the entry is fresh.
+        """
+        return entry["fresh_until"] > time.time()
+
+    @staticmethod
+    def conditional_headers(entry):
+        """
+        Return the headers that revalidate an entry.
+
+        Args:
+            entry (dict): A cached entry, or None.
+
+        Returns:
+            dict: The ``If-None-Match`` and ``If-Modified-Since`` headers available.
+        """
+        headers = {}
+        if entry is None:
+            return headers
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def _fresh_until(self, headers):
+        directives = self.parse_cache_control(headers.get("Cache-Control"))
+        if "no-cache" in directives:
+            return time.time()
+        try:
+            max_age = float(directives.get("max-age"))
+        except (TypeError, ValueError):
+            max_age = self.default_max_age
+        try:
+            max_age -= float(headers.get("Age", 0))
+        except (TypeError, ValueError):
+            pass
+        return time.time() + max(max_age, 0)
+
+    def save(self, url, params, headers, body):
+        """
+        Store a ``200`` response unless it forbids storing.
+
+        Args:
+            url (str): The request URL.
+            params (dict): The query parameters.
+            headers (Mapping): The response headers.
+            body (object): The decoded response body.
+        """
+        directives = self.parse_cache_control(headers.get("Cache-Control"))
+        if "no-store" in directives:
+            return
+        entry = {
+            "body": body,
+            "etag": headers.get("ETag"),
+            "last_modified": headers.get("Last-Modified"),
+            "fresh_until": self._fresh_until(headers),
+        }
+        self.store.set(self.key(url, params), entry, ttl=self.retention)
+
+    def revalidated(self, url, params, entry, headers):
+        """
+        Refresh an entry after a ``304 Not Modified`` response and return its body.
+
+        Args:
+            url (str): The request URL.
+            params (dict): The query parameters.
+            entry (dict): The cached entry that was revalidated.
+            headers (Mapping): The ``304`` response headers.
+
+        Returns:
+            object: The cached response body.
+        """
+        entry = {
+            **entry,
+            "etag": headers.get("ETag") or entry.get("etag"),
+            "last_modified": headers.get("Last-Modified") or entry.get("last_modified"),
+            "fresh_until": self._fresh_until(headers),
+        }
+        self.store.set(self.key(url, params), entry, ttl=self.retention)
+        return entry["body"]
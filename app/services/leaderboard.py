@@ -0,0 +1,299 @@
+"""
+Module for the "most saved on WatchWave" leaderboard.
+
+This module keeps per-title save and watched counters current as watchlist rows are
+inserted, updated and deleted, and serves the top titles from them. The counters are
+written in the same flush as the watchlist change, so they commit or roll back with it:
+``title_stats`` holds the all-time counts and ``title_activity`` the counts per hour.
+
+The all-time leaderboard is an indexed ``ORDER BY ... LIMIT`` on ``title_stats``. The
+recent windows read only the hourly buckets inside the window and weigh each bucket by
+an exponential decay of its age, so fresh activity ranks above older activity of the
+same size. Every leaderboard is computed at most once per ``LEADERBOARD_CACHE_TTL``
+seconds and then served from the application cache, so a request costs O(K).
+
+Functions:
+    bucket_of: Return the hourly bucket of a timestamp.
+    decayed_scores: Aggregate hourly buckets into decayed scores.
+    top_titles: Return the top motion pictures of a leaderboard.
+    rebuild_title_stats: Recompute the all-time counters from the watchlists.
+    prune_activity: Delete the hourly buckets older than the longest window.
+    init_leaderboard: Registers the hooks that maintain the counters.
+"""
+
+import heapq
+from datetime import datetime, timedelta
+
+from sqlalchemy import case, event, func, inspect
+
+from app import db
+from app.cache import cache
+
+# Window name: (length, half-life of the decay).
+WINDOWS = {
+    "24h": (timedelta(hours=24), timedelta(hours=6)),
+    "7d": (timedelta(days=7), timedelta(days=1)),
+}
+ALL_TIME = "all"
+COUNTERS = ("saves", "watched")
+
+
+def bucket_of(timestamp):
+    """
+    Return the hourly bucket of a timestamp.
+
+    Args:
+        timestamp (datetime): The timestamp.
+
+    Returns:
+        datetime: The start of the hour.
+    """
+    return timestamp.replace(minute=0, second=0, microsecond=0)
+
+
+def decayed_scores(rows, half_life, now):
+    """
+    Aggregate hourly buckets into decayed scores.
+
+    Args:
+        rows (iterable): ``(motion_picture_id, bucket, count)`` tuples.
+        half_life (timedelta): The age at which a bucket counts half.
+        now (datetime): The current time.
+
+    Returns:
+        dict: The decayed score of each motion picture.
+    """
+    scores = {}
+    for motion_picture_id, bucket, count in rows:
+        # Measure the age from the middle of the hour.
+        age = (now - bucket - timedelta(minutes=30)) / half_life
+        weight = 0.5 ** max(age, 0)
+        scores[motion_picture_id] = scores.get(motion_picture_id, 0) + count * weight
+    return scores
+
+
+def _load_top_titles(window, counter, size):
+    from app.models import MotionPictures, TitleActivity, TitleStats
+
+    if window == ALL_TIME:
+        column = getattr(TitleStats, counter)
+        rows = (
+            db.session.query(MotionPictures, TitleStats.saves, TitleStats.watched)
+            .join(TitleStats, TitleStats.motion_picture_id == MotionPictures.id)
+            .filter(column > 0)
+            .order_by(column.desc(), MotionPictures.id)
+            .limit(size)
+        )
+        return [
+            {**picture.to_dict(), "saves": saves, "watched": watched, "score": None}
+            for picture, saves, watched in rows
+        ]
+
+    length, half_life = WINDOWS[window]
+    now = datetime.now()
+    rows = db.session.query(
+        TitleActivity.motion_picture_id,
+        TitleActivity.bucket,
+        TitleActivity.saves,
+        TitleActivity.watched,
+    ).filter(TitleActivity.bucket >= bucket_of(now - length))
+
+    totals = {}
+    activity = []
+    for motion_picture_id, bucket, saves, watched in rows:
+        total = totals.setdefault(motion_picture_id, {"saves": 0, "watched": 0})
+        total["saves"] += saves
+        total["watched"] += watched
+        activity.append(
+            (motion_picture_id, bucket, saves if counter == "saves" else watched)
+        )
+
+    scores = decayed_scores(activity, half_life, now)
+    top = heapq.nlargest(
+        size,
+        ((score, -id) for id, score in scores.items() if score > 0),
+    )
+    if not top:
+        return []
+
+    pictures = {
+        picture.id: picture
+        for picture in MotionPictures.query.filter(
+            MotionPictures.id.in_([-id for _, id in top])
+        )
+    }
+    return [
+        {
+            **pictures[-id].to_dict(),
+            **totals[-id],
+            "score": round(score, 4),
+        }
+        for score, id in top
+        if -id in pictures
+    ]
+
+
+def top_titles(window=ALL_TIME, counter="saves", limit=20, size=100, ttl=60):
+    """
+    Return the top motion pictures of a leaderboard.
+
+    Args:
+        window (str): ``all``, ``24h`` or ``7d``.
+        counter (str): Rank by ``saves`` or by ``watched``.
+        limit (int): The number of motion pictures to return, at most ``size``.
+        size (int): The number of motion pictures kept in the cached leaderboard.
+        ttl (float): The number of seconds a computed leaderboard is served.
+
+    Returns:
+        list: The motion pictures as dictionaries with their ``saves`` and ``watched``
+        counts in the window and, for the recent windows, their decayed ``score``.
+    """
+    if window != ALL_TIME and window not in WINDOWS:
+        raise ValueError(f"Unknown window: {window}")
+    if counter not in COUNTERS:
+        raise ValueError(f"Unknown counter: {counter}")
+
+    leaderboard = cache.get_or_set(
+        f"leaderboard:{window}:{counter}:{size}",
+        lambda: _load_top_titles(window, counter, size),
+        ttl=ttl,
+        name="leaderboard",
+    )
+    return leaderboard[:limit]
+
+
+def rebuild_title_stats():
+    """
+    Recompute the all-time counters from the watchlists.
+
+    Returns:
+        int: The number of motion pictures with counters.
+    """
+    from app.models import TitleStats, WatchList
+
+    rows = (
+        db.session.query(
+            WatchList.motion_picture_id,
+            func.count(),
+            func.sum(case((WatchList.watched, 1), else_=0)),
+        )
+        .group_by(WatchList.motion_picture_id)
+        .all()
+    )
+    try:
+        db.session.query(TitleStats).delete()
+        if rows:
+            db.session.execute(
+                TitleStats.__table__.insert(),
+                [
+                    {"motion_picture_id": id, "saves": saves, "watched": watched or 0}
+                    for id, saves, watched in rows
+                ],
+            )
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return len(rows)
+
+
+def prune_activity(now=None):
+    """
+    Delete the hourly buckets older than the longest window.
+
+    Args:
+        now (datetime): The current time; defaults to now.
+
+    Returns:
+        int: The number of buckets deleted.
+    """
+    from app.models import TitleActivity
+
+    cutoff = bucket_of((now or datetime.now()) - max(w for w, _ in WINDOWS.values()))
+    deleted = TitleActivity.query.filter(TitleActivity.bucket < cutoff).delete()
+    db.session.commit()
+    return deleted
+
+
+def init_leaderboard(app):
+    """
+    Register the hooks that keep the counters current with watchlist writes.
+
+    The counters are updated by the flush that writes the watchlist row, on the same
+    connection, so they are part of the same transaction.
+
+    Args:
+        app (Flask): The Flask application.
+    """
+    from app.models import TitleActivity, TitleStats, WatchList
+    from .counters import increment
+
+    stats = TitleStats.__table__
+    activity = TitleActivity.__table__
+    horizon = max(length for length, _ in WINDOWS.values())
+
+    def record(connection, motion_picture_id, at, saves=0, watched=0):
+        increment(
+            connection,
+            stats,
+            {"motion_picture_id": motion_picture_id},
+            saves=saves,
+            watched=watched,
+        )
+        if at >= bucket_of(datetime.now() - horizon):
+            increment(
+                connection,
+                activity,
+                {"motion_picture_id": motion_picture_id, "bucket": bucket_of(at)},
+                saves=saves,
+                watched=watched,
+            )
+
+    def after_insert(mapper, connection, target):
+        record(
+            connection,
+            target.motion_picture_id,
+            datetime.now(),
+            saves=1,
+            watched=1 if target.watched else 0,
+        )
+
+    def after_update(mapper, connection, target):
+        history = inspect(target).attrs.watched.history
+        if not history.added or not history.deleted:
+            return
+        if bool(history.added[0]) == bool(history.deleted[0]):
+            return
+        record(
+            connection,
+            target.motion_picture_id,
+            datetime.now(),
+            watched=1 if history.added[0] else -1,
+        )
+
+    def after_delete(mapper, connection, target):
+        increment(
+            connection,
+            stats,
+            {"motion_picture_id": target.motion_picture_id},
+            saves=-1,
+            watched=-1 if target.watched else 0,
+        )
+        # Take the save back from the hour it was counted in, if still in a window.
+        created_at = target.__dict__.get("created_at")
+        if isinstance(created_at, datetime) and created_at >= bucket_of(
+            datetime.now() - horizon
+        ):
+            increment(
+                connection,
+                activity,
+                {
+                    "motion_picture_id": target.motion_picture_id,
+                    "bucket": bucket_of(created_at),
+                },
+                saves=-1,
+            )
+
+    event.listen(WatchList, "after_insert", after_insert)
+    event.listen(WatchList, "after_update", after_update)
+    event.listen(WatchList, "after_delete", after_delete)
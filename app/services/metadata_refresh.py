@@ -0,0 +1,278 @@
+"""
+Module for refreshing the stored motion picture metadata from TMDB.
+
+``MotionPictures`` rows copy their title, poster and overview from the client when they
+are added. This module refreshes them in a batch job outside the request cycle: stale
+rows are selected in chunks by primary key, their TMDB details are fetched concurrently
+by a bounded pool of threads at background priority, so the rate limiter keeps the job
+within the TMDB budget and behind user requests, and each chunk is written back with one
+bulk UPDATE of the rows that changed plus one UPDATE marking the others as refreshed.
+
+A row is stale when it was never refreshed or was last refreshed more than
+``METADATA_REFRESH_MAX_AGE`` seconds ago. Every chunk is committed on its own, so an
+interrupted run simply resumes with the rows that are still stale. In incremental mode
+only the rows that TMDB lists as changed since the previous incremental run are fetched;
+the start of that run is kept in the ``job_state`` table, so every process and restart
+continues from it.
+
+Classes:
+    MetadataRefresher: Refreshes stored motion picture metadata from TMDB.
+"""
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from sqlalchemy import or_, update
+
+from app import db
+from .circuit_breaker import CircuitOpenError
+from .rate_limiter import RateLimiter
+from .tmdb import TMDBError, tmdb_client
+
+logger = logging.getLogger(__name__)
+
+JOB_NAME = "metadata_refresh"
+# TMDB only serves the change lists of the last 14 days.
+MAX_CHANGES_WINDOW = timedelta(days=14)
+
+
+class MetadataRefresher:
+    """
+    Refreshes stored motion picture metadata from TMDB.
+
+    Attributes:
+        app (Flask): The Flask application.
+        client (TMDBClient): The TMDB client used to fetch details.
+        max_age (float): The number of seconds after which a row is stale.
+        chunk_size (int): The number of rows fetched and written per chunk.
+        workers (int): The number of concurrent TMDB requests.
+    """
+
+    def __init__(self, app, client=tmdb_client):
+        """
+        Initialize a new MetadataRefresher instance.
+
+        Args:
+            app (Flask): The Flask application.
+            client (TMDBClient): The TMDB client used to fetch details.
+        """
+        self.app = app
+        self.client = client
+        self.max_age = app.config.get("METADATA_REFRESH_MAX_AGE", 604800)
+        self.chunk_size = app.config.get("METADATA_REFRESH_CHUNK_SIZE", 100)
+        self.workers = app.config.get("METADATA_REFRESH_WORKERS", 4)
+
+    @staticmethod
+    def details_path(motion_picture):
+        """
+        Return the TMDB details path of a motion picture.
+
+        Args:
+            motion_picture (MotionPictures): The motion picture.
+
+        Returns:
+            str: The API path, e.g. ``movie/603``.
+        """
+        kind = "movie" if motion_picture.type == "movie" else "tv"
+        return f"{kind}/{motion_picture.external_id}"
+
+    @staticmethod
+    def changes(motion_picture, details):
+        """
+        Return the stored fields that differ from the TMDB details.
+
+        Args:
+            motion_picture (MotionPictures): The stored motion picture.
+            details (dict): The TMDB details of the motion picture.
+
+        Returns:
+            dict: The changed fields and their new values.
+        """
+        fresh = {
+            "title": details.get("title") or details.get("name"),
+            "poster_path": details.get("poster_path"),
+            "overview": (details.get("overview") or "")[:255],
+        }
+        # Keep the stored title and poster when TMDB has none.
+        return {
+            field: value
+            for field, value in fresh.items()
+            if (value or field == "overview")
+            and value != getattr(motion_picture, field)
+        }
+
+    def _fetch(self, motion_picture):
+        try:
+            return self.client.get(
+                self.details_path(motion_picture), priority=RateLimiter.BACKGROUND
+            )
+        except TMDBError as e:
+            if e.status_code == 404:
+                return {}
+            raise
+
+    def refresh_chunk(self, motion_pictures, pool):
+        """
+        Fetch the details of a chunk of rows and write the changes back.
+
+        Args:
+            motion_pictures (list): The MotionPictures rows of the chunk.
+            pool (ThreadPoolExecutor): The pool fetching the details.
+
+        Returns:
+            dict: The number of rows ``updated``, ``unchanged`` and ``failed``.
+
+        Raises:
+            CircuitOpenError: If TMDB is failing; the chunk is not written.
+        """
+        from app.models import MotionPictures
+
+        futures = [
+            (motion_picture, pool.submit(self._fetch, motion_picture))
+            for motion_picture in motion_pictures
+        ]
+        now = datetime.now()
+        updates, unchanged, failed = [], [], 0
+        for motion_picture, future in futures:
+            try:
+                details = future.result()
+            except CircuitOpenError:
+                for _, pending in futures:
+                    pending.cancel()
+                raise
+            except Exception:
+                logger.warning(
+                    "Failed to refresh %s",
+                    self.details_path(motion_picture),
+                    exc_info=True,
+                )
+                failed += 1
+                continue
+
+            changed = self.changes(motion_picture, details) if details else {}
+            if changed:
+                updates.append(
+                    {
+                        "id": motion_picture.id,
+                        **changed,
+                        "updated_at": now,
+                        "refreshed_at": now,
+                    }
+                )
+            else:
+                unchanged.append(motion_picture.id)
+
+        try:
+            if updates:
+                db.session.execute(update(MotionPictures), updates)
+            if unchanged:
+                MotionPictures.query.filter(MotionPictures.id.in_(unchanged)).update(
+                    {"refreshed_at": now}, synchronize_session=False
+                )
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        return {"updated": len(updates), "unchanged": len(unchanged), "failed": failed}
+
+    def changed_external_ids(self, since):
+        """
+        Return the TMDB IDs of the movies and series changed since a time.
+
+        Args:
+            since (datetime): The start of the change window.
+
+        Returns:
+            dict: The changed TMDB IDs of ``movie`` and ``tv``.
+        """
+        changed = {}
+        for kind in ("movie", "tv"):
+            ids, page, total_pages = set(), 1, 1
+            while page <= total_pages:
+                payload = self.client.get(
+                    f"{kind}/changes",
+                    {"start_date": since.date().isoformat(), "page": page},
+                    priority=RateLimiter.BACKGROUND,
+                )
+                ids.update(result["id"] for result in payload.get("results", ()))
+                total_pages = payload.get("total_pages", 1)
+                page += 1
+            changed[kind] = ids
+        return changed
+
+    def run(self, incremental=False):
+        """
+        Refresh the stale rows, or in incremental mode the rows changed on TMDB.
+
+        Must be called within an application context.
+
+        Args:
+            incremental (bool): Only refresh the rows TMDB lists as changed since the
+                previous incremental run.
+
+        Returns:
+            dict: The number of rows ``selected``, ``updated``, ``unchanged`` and
+            ``failed``.
+        """
+        from app.models import JobState, MotionPictures
+
+        started_at = datetime.now()
+        query = MotionPictures.query.order_by(MotionPictures.id)
+        if incremental:
+            state = db.session.get(JobState, JOB_NAME)
+            since = (
+                state.cursor
+                if state is not None and state.cursor is not None
+                else started_at - timedelta(seconds=self.max_age)
+            )
+            since = max(since, started_at - MAX_CHANGES_WINDOW)
+            changed = self.changed_external_ids(since)
+            query = query.filter(
+                or_(
+                    (MotionPictures.type == "movie")
+                    & MotionPictures.external_id.in_(changed["movie"]),
+                    (MotionPictures.type != "movie")
+                    & MotionPictures.external_id.in_(changed["tv"]),
+                )
+            )
+        else:
+            cutoff = started_at - timedelta(seconds=self.max_age)
+            query = query.filter(
+                or_(
+                    MotionPictures.refreshed_at.is_(None),
+                    MotionPictures.refreshed_at < cutoff,
+                )
+            )
+
+        totals = {"selected": 0, "updated": 0, "unchanged": 0, "failed": 0}
+        last_id = 0
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            while True:
+                chunk = (
+                    query.filter(MotionPictures.id > last_id)
+                    .limit(self.chunk_size)
+                    .all()
+                )
+                if not chunk:
+                    break
+                last_id = chunk[-1].id
+                totals["selected"] += len(chunk)
+                try:
+                    counts = self.refresh_chunk(chunk, pool)
+                except CircuitOpenError:
+                    logger.warning("TMDB is failing, stopping the metadata refresh")
+                    totals["failed"] += len(chunk)
+                    return totals
+                for name, count in counts.items():
+                    totals[name] += count
+
+        # Rows that failed are retried by the next incremental run.
+        if incremental and not totals["failed"]:
+            try:
+                db.session.merge(JobState(name=JOB_NAME, cursor=started_at))
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                raise
+        return totals
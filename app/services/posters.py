@@ -0,0 +1,282 @@
+"""
+Module for the local poster image cache.
+
+This module keeps TMDB poster images on local disk so they are downloaded once and
+served by us. Originals are stored under the SHA-256 digest of their bytes, so the same
+image is stored once whatever its path, and an index maps each ``poster_path`` to its
+digest. Resized variants are created once per allowed width next to their original.
+
+Every served file has its modification time bumped, so the files least recently served
+are the first deleted when the cache grows beyond ``POSTER_CACHE_MAX_BYTES``.
+
+The origin is TMDB's image server by default. It can also be the ``file://`` URL of a
+local directory laid out like the ``poster_path`` values, which is what the tests use.
+
+Classes:
+    PosterNotFound: Raised when the origin has no image for a poster path.
+    PosterUnavailable: Raised when the origin cannot be reached.
+    PosterCache: The content-addressed disk cache of posters and their variants.
+"""
+
+import hashlib
+import io
+import logging
+import os
+import tempfile
+import threading
+from urllib.parse import urlparse
+
+import requests
+from PIL import Image
+
+from app.cache.backends import SQLiteCache
+from app.instrumentation.metrics import CACHE_REQUESTS
+from app.instrumentation.tracing import span
+
+logger = logging.getLogger(__name__)
+
+
+class PosterNotFound(Exception):
+    """
+    Raised when the origin has no image for a poster path.
+    """
+
+
+class PosterUnavailable(Exception):
+    """
+    Raised when the origin cannot be reached.
+    """
+
+
+class PosterCache:
+    """
+    The content-addressed disk cache of posters and their resized variants.
+
+    Attributes:
+        directory (str): The directory holding the cached files.
+        max_bytes (int): The size the cached files are kept under.
+        origin (str): The base URL the original images are fetched from.
+        widths (tuple): The widths variants can be created at.
+        timeout (tuple): The connect and read timeouts of origin requests.
+    """
+
+    origin = "https://image.tmdb.org/t/p/original"
+
+    def __init__(self, directory=None, max_bytes=512 * 1024 * 1024, origin=None):
+        """
+        Initialize a new PosterCache instance.
+
+        Args:
+            directory (str): The directory holding the cached files.
+            max_bytes (int): The size the cached files are kept under.
+            origin (str): Overrides the base URL of the original images.
+        """
+        self.directory = directory or os.path.join(
+            tempfile.gettempdir(), "watchwave-posters"
+        )
+        self.max_bytes = max_bytes
+        if origin:
+            self.origin = origin
+        self.widths = (92, 154, 185, 342, 500, 780)
+        self.timeout = (3.05, 10)
+        self.session = requests.Session()
+        self._index = None
+        self._locks = [threading.Lock() for _ in range(64)]
+        self._size = None
+        self._size_lock = threading.Lock()
+
+    def init_app(self, app):
+        """
+        Configure the directory, size bound, origin and widths from the app config.
+
+        Args:
+            app (Flask): The Flask application.
+        """
+        config = app.config
+        self.directory = config.get("POSTER_CACHE_DIR") or self.directory
+        self.max_bytes = config.get("POSTER_CACHE_MAX_BYTES", self.max_bytes)
+        self.origin = config.get("POSTER_ORIGIN_URL") or PosterCache.origin
+        self.widths = tuple(config.get("POSTER_WIDTHS", self.widths))
+        self._index = None
+        self._size = None
+
+    @property
+    def index(self):
+        """
+        SQLiteCache: The map from poster paths to the digests of their originals.
+        """
+        if self._index is None:
+            os.makedirs(self.directory, exist_ok=True)
+            self._index = SQLiteCache(os.path.join(self.directory, "index.sqlite3"))
+        return self._index
+
+    def _file(self, name):
+        return os.path.join(self.directory, name[:2], name)
+
+    def _write(self, path, data):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, temporary = tempfile.mkstemp(dir=os.path.dirname(path))
+        with os.fdopen(fd, "wb") as file:
+            file.write(data)
+        # Readers see either no file or the whole file.
+        os.replace(temporary, path)
+        with self._size_lock:
+            if self._size is not None:
+                self._size += len(data)
+
+    def fetch_original(self, poster_path):
+        """
+        Download the original image of a poster path from the origin.
+
+        Args:
+            poster_path (str): The TMDB poster path, e.g. ``/abc.jpg``.
+
+        Returns:
+            bytes: The image.
+
+        Raises:
+            PosterNotFound: If the origin has no such image.
+            PosterUnavailable: If the origin cannot be reached.
+        """
+        origin = urlparse(self.origin)
+        if origin.scheme == "file":
+            root = os.path.realpath(origin.path)
+            path = os.path.realpath(os.path.join(root, poster_path.lstrip("/")))
+            if os.path.commonpath((root, path)) != root:
+                raise PosterNotFound(poster_path)
+            try:
+                with open(path, "rb") as file:
+                    return file.read()
+            except FileNotFoundError:
+                raise PosterNotFound(poster_path)
+
+        with span("poster.fetch", **{"http.method": "GET", "poster.path": poster_path}):
+            try:
+                response = self.session.get(
+                    self.origin.rstrip("/") + poster_path, timeout=self.timeout
+                )
+            except requests.RequestException as e:
+                raise PosterUnavailable(poster_path) from e
+        if response.status_code == 404:
+            raise PosterNotFound(poster_path)
+        if response.status_code >= 400:
+            raise PosterUnavailable(poster_path)
+        return response.content
+
+    @staticmethod
+    def resize(data, width):
+        """
+        Scale an image down to a width, keeping its aspect ratio.
+
+        Args:
+            data (bytes): The original image.
+            width (int): The target width.
+
+        Returns:
+            bytes: The resized image, or the original if it is not wider.
+        """
+        with Image.open(io.BytesIO(data)) as image:
+            if image.width <= width:
+                return data
+            format = image.format
+            height = round(image.height * width / image.width)
+            resized = image.resize((width, height), Image.Resampling.LANCZOS)
+            output = io.BytesIO()
+            if format == "JPEG":
+                resized.save(output, format, quality=85, optimize=True)
+            else:
+                resized.save(output, format)
+            return output.getvalue()
+
+    def get(self, poster_path, width=None):
+        """
+        Return the cached file of a poster, fetching and resizing it on a miss.
+
+        Args:
+            poster_path (str): The TMDB poster path.
+            width (int): One of ``widths``, or None for the original.
+
+        Returns:
+            tuple: The path of the file and the digest of the original.
+
+        Raises:
+            ValueError: If the width is not allowed.
+            PosterNotFound: If the origin has no such image.
+            PosterUnavailable: If the origin cannot be reached.
+        """
+        if width is not None and width not in self.widths:
+            raise ValueError(f"Unsupported width: {width}")
+
+        extension = os.path.splitext(poster_path)[1].lower() or ".jpg"
+        lock = self._locks[hash(poster_path) % len(self._locks)]
+        with lock:
+            result = "hit"
+            digest = self.index.get("poster:" + poster_path)
+            original = digest and self._file(digest + extension)
+            if not digest or not os.path.exists(original):
+                result = "miss"
+                data = self.fetch_original(poster_path)
+                digest = hashlib.sha256(data).hexdigest()
+                original = self._file(digest + extension)
+                if not os.path.exists(original):
+                    self._write(original, data)
+                self.index.set("poster:" + poster_path, digest)
+
+            target = original
+            if width is not None:
+                target = self._file(f"{digest}-w{width}{extension}")
+                if not os.path.exists(target):
+                    result = "miss"
+                    with open(original, "rb") as file:
+                        self._write(target, self.resize(file.read(), width))
+            os.utime(target)
+
+        CACHE_REQUESTS.inc(cache="posters", result=result)
+        if result == "miss":
+            self.evict()
+        return target, digest
+
+    def _files(self):
+        for root, _, names in os.walk(self.directory):
+            for name in names:
+                if name.startswith("index.sqlite3"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    yield path, os.stat(path)
+                except FileNotFoundError:
+                    continue
+
+    def evict(self):
+        """
+        Delete the least recently served files while the cache is over its size bound.
+
+        The cache is trimmed to 90% of ``max_bytes`` so eviction does not run on every
+        miss.
+
+        Returns:
+            int: The number of files deleted.
+        """
+        with self._size_lock:
+            if self._size is None:
+                self._size = sum(stat.st_size for _, stat in self._files())
+            if self._size <= self.max_bytes:
+                return 0
+
+            files = sorted(self._files(), key=lambda file: file[1].st_mtime)
+            size = sum(stat.st_size for _, stat in files)
+            deleted = 0
+            for path, stat in files:
+                if size <= self.max_bytes * 0.9:
+                    break
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                size -= stat.st_size
+                deleted += 1
+            self._size = size
+            return deleted
+
+
+poster_cache = PosterCache()
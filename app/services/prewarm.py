@@ -0,0 +1,173 @@
+"""
+Module for pre-warming the TMDB cache.
+
+This module refreshes the popular movie and TV lists and the most requested searches
+before their cache entries expire, so user-facing home requests are served from the
+cache instead of paying the TMDB latency.
+
+The refresh runs in a background thread of each worker. A leader lease stored in the
+cache makes sure only one worker refreshes per interval; with the shared ``sqlite`` cache
+backend that is one worker for the whole machine. Each tick is jittered so workers do not
+contend for the lease at the same instant.
+
+The most requested searches are tracked per worker. Requests are balanced across workers,
+so the leader's own counts are a good sample of the overall top queries.
+
+Classes:
+    Prewarmer: Periodically refreshes the cached TMDB responses.
+
+Functions:
+    init_prewarm: Starts the pre-warming thread if enabled.
+"""
+
+import logging
+import os
+import random
+import threading
+
+from app.cache import cache
+from .tmdb import tmdb_client
+
+logger = logging.getLogger(__name__)
+
+LEADER_KEY = "prewarm:leader"
+
+
+class Prewarmer:
+    """
+    Periodically refreshes the cached TMDB responses.
+
+    Attributes:
+        app (Flask): The Flask application.
+        client (TMDBClient): The TMDB client whose responses are refreshed.
+        interval (float): The number of seconds between refreshes.
+        jitter (float): The fraction of the interval added or removed at random.
+        search_limit (int): The number of top searches to refresh.
+    """
+
+    def __init__(self, app, client=tmdb_client):
+        """
+        Initialize a new Prewarmer instance.
+
+        Args:
+            app (Flask): The Flask application.
+            client (TMDBClient): The TMDB client whose responses are refreshed.
+        """
+        self.app = app
+        self.client = client
+        self.interval = app.config.get("PREWARM_INTERVAL", 240)
+        self.jitter = app.config.get("PREWARM_JITTER", 0.1)
+        self.search_limit = app.config.get("PREWARM_SEARCH_LIMIT", 20)
+        self._stop = threading.Event()
+        self._thread = None
+
+    def next_delay(self):
+        """
+        Return the jittered number of seconds until the next refresh.
+
+        Returns:
+            float: The delay in seconds.
+        """
+        return self.interval * (1 + random.uniform(-self.jitter, self.jitter))
+
+    def acquire_leadership(self):
+        """
+        Take or renew the leader lease.
+
+        The lease lasts two intervals, so it survives one missed tick of its holder but
+        moves to another worker if the holder dies.
+
+        Returns:
+            bool: True if this process is the leader.
+        """
+        pid = os.getpid()
+        ttl = self.interval * 2
+        if cache.backend.add(LEADER_KEY, pid, ttl=ttl):
+            return True
+        if cache.backend.get(LEADER_KEY) == pid:
+            cache.backend.set(LEADER_KEY, pid, ttl=ttl)
+            return True
+        return False
+
+    def refresh(self):
+        """
+        Refresh the popular lists and the most requested searches.
+
+        Failures are logged and do not stop the remaining refreshes.
+
+        Returns:
+            int: The number of responses refreshed.
+        """
+        config = self.app.config
+        requests = [
+            ("movie/popular", None, config.get("TMDB_POPULAR_TTL")),
+            ("tv/popular", None, config.get("TMDB_POPULAR_TTL")),
+        ]
+        for query in self.client.top_searches(self.search_limit):
+            requests.append(
+                ("search/multi", {"query": query}, config.get("TMDB_SEARCH_TTL"))
+            )
+
+        refreshed = 0
+        for path, params, ttl in requests:
+            try:
+                self.client.refresh(path, params, ttl)
+                refreshed += 1
+            except Exception:
+                logger.exception("Failed to pre-warm %s %s", path, params or "")
+        return refreshed
+
+    def run_once(self):
+        """
+        Refresh the cache if this process is the leader.
+
+        Returns:
+            bool: True if this process refreshed the cache.
+        """
+        with self.app.app_context():
+            if not self.acquire_leadership():
+                return False
+            self.refresh()
+            return True
+
+    def _run(self):
+        while not self._stop.wait(self.next_delay()):
+            try:
+                self.run_once()
+            except Exception:
+                logger.exception("Pre-warming failed")
+
+    def start(self):
+        """
+        Start the background refresh thread.
+        """
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="prewarm", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stop the background refresh thread.
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+
+def init_prewarm(app):
+    """
+    Start the pre-warming thread if the ``PREWARM_ENABLED`` config option is set.
+
+    Args:
+        app (Flask): The Flask application.
+
+    Returns:
+        Prewarmer: The prewarmer, started or not.
+    """
+    prewarmer = Prewarmer(app)
+    app.extensions["prewarmer"] = prewarmer
+    if app.config.get("PREWARM_ENABLED"):
+        prewarmer.start()
+    return prewarmer
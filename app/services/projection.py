@@ -0,0 +1,91 @@
+"""
+Module for trimming response items to the fields a client asks for.
+
+List routes accept a ``fields`` query parameter: a comma-separated list of field names
+and named presets, e.g. ``fields=compact`` or ``fields=compact,overview``. Every item of
+the list keeps only those fields; fields an item does not have are skipped. The page
+fields around a TMDB result list, like ``page`` and ``total_results``, are kept.
+
+Projections are applied before serialization, and the TMDB client caches projected
+responses under their own key, so a compact response is stored and served compact.
+
+Functions:
+    parse_fields: Parse the ``fields`` query parameter.
+    project: Trim the items of a response to the requested fields.
+"""
+
+import re
+
+PRESETS = {
+    "compact": (
+        "id",
+        "media_type",
+        "type",
+        "title",
+        "name",
+        "external_id",
+        "poster_path",
+        "release_date",
+        "first_air_date",
+        "vote_average",
+        "source",
+    ),
+}
+PRESETS["card"] = PRESETS["compact"] + ("overview",)
+
+MAX_FIELDS = 32
+_FIELD = re.compile(r"^[a-z_]{1,64}$")
+
+
+def parse_fields(value):
+    """
+    Parse the ``fields`` query parameter.
+
+    Args:
+        value (str): Comma-separated field names and preset names, or None.
+
+    Returns:
+        tuple: The sorted field names, or None to keep every field.
+
+    Raises:
+        ValueError: If a name is not a valid field name or there are too many.
+    """
+    if not value:
+        return None
+    fields = set()
+    for name in value.split(","):
+        name = name.strip()
+        if not _FIELD.match(name):
+            raise ValueError(f"Invalid field: {name!r}")
+        fields.update(PRESETS.get(name, (name,)))
+    if len(fields) > MAX_FIELDS:
+        raise ValueError(f"At most {MAX_FIELDS} fields")
+    return tuple(sorted(fields))
+
+
+def project(payload, fields):
+    """
+    Trim the items of a response to the requested fields.
+
+    Args:
+        payload (dict | list): A TMDB response with a ``results`` list, or a list of
+            items.
+        fields (tuple): The field names to keep, or None to keep every field.
+
+    Returns:
+        dict | list: The trimmed response; the input is not modified.
+    """
+    if not fields:
+        return payload
+    if isinstance(payload, list):
+        return [_project_item(item, fields) for item in payload]
+    if isinstance(payload.get("results"), list):
+        return {
+            **payload,
+            "results": [_project_item(item, fields) for item in payload["results"]],
+        }
+    return _project_item(payload, fields)
+
+
+def _project_item(item, fields):
+    return {field: item[field] for field in fields if field in item}
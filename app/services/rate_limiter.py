@@ -0,0 +1,184 @@
+"""
+Module for the client-side rate limiter used before upstream calls.
+
+The limiter is a token bucket shared by every TMDB call site of a worker. Callers that find
+the bucket empty wait in a priority queue, so interactive requests such as searches are
+served before background refreshes. Each priority has a bounded wait: a caller whose
+projected wait is already too long is rejected immediately rather than queued, which sheds
+load early instead of piling up blocked workers. Speculative prefetches have the lowest
+priority and by default only take a token that is free right away.
+
+Classes:
+    RateLimitExceeded: Raised when a caller would wait longer than allowed.
+    RateLimiter: A token bucket with a prioritized wait queue.
+"""
+
+import heapq
+import itertools
+import threading
+import time
+
+from app.instrumentation.metrics import registry
+
+QUEUE_DEPTH = registry.gauge(
+    "watchwave_rate_limiter_queue_depth",
+    "Callers waiting for an upstream rate limit token.",
+    ("name", "priority"),
+)
+SHED = registry.counter(
+    "watchwave_rate_limiter_shed_total",
+    "Calls rejected because their wait would exceed the limit.",
+    ("name", "priority"),
+)
+WAIT_TIME = registry.histogram(
+    "watchwave_rate_limiter_wait_seconds",
+    "Time spent waiting for an upstream rate limit token.",
+    ("name", "priority"),
+)
+
+
+class RateLimitExceeded(Exception):
+    """
+    Raised when a caller would wait longer than its priority allows.
+    """
+
+
+class RateLimiter:
+    """
+    A token bucket with a prioritized wait queue.
+
+    Attributes:
+        name (str): The name reported in the metrics.
+        rate (float): The number of tokens added per second; None disables limiting.
+        burst (int): The maximum number of tokens in the bucket.
+        max_wait (dict): The maximum wait in seconds by priority.
+    """
+
+    INTERACTIVE = 0
+    BACKGROUND = 1
+    PREFETCH = 2
+
+    priority_names = {
+        INTERACTIVE: "interactive",
+        BACKGROUND: "background",
+        PREFETCH: "prefetch",
+    }
+
+    def __init__(self, name, rate=None, burst=1, max_wait=None):
+        """
+        Initialize a new RateLimiter instance.
+
+        Args:
+            name (str): The name reported in the metrics.
+            rate (float): The number of tokens added per second; None disables limiting.
+            burst (int): The maximum number of tokens in the bucket.
+            max_wait (dict): The maximum wait in seconds by priority; missing priorities
+                wait as long as needed.
+        """
+        self.name = name
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self.max_wait = max_wait or {}
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._waiters = []
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+
+    def _refill(self, now):
+        self._tokens = min(
+            self.burst, self._tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
+
+    def _delay_until_token(self, now):
+        pause = max(self._paused_until - now, 0)
+        return max(pause, (1 - self._tokens) / self.rate, 0)
+
+    def _projected_wait(self, priority, now):
+        ahead = sum(1 for waiter in self._waiters if waiter[0] <= priority)
+        pause = max(self._paused_until - now, 0)
+        return pause + max(ahead + 1 - self._tokens, 0) / self.rate
+
+    def _shed(self, label, reason):
+        SHED.inc(name=self.name, priority=label)
+        raise RateLimitExceeded(f"{self.name} rate limit: {reason}")
+
+    def acquire(self, priority=INTERACTIVE):
+        """
+        Take a token, waiting in the priority queue if the bucket is empty.
+
+        Args:
+            priority (int): ``INTERACTIVE``, ``BACKGROUND`` or ``PREFETCH``.
+
+        Raises:
+            RateLimitExceeded: If the wait would exceed the limit of the priority.
+        """
+        if not self.rate:
+            return
+
+        label = self.priority_names.get(priority, str(priority))
+        max_wait = self.max_wait.get(priority)
+        start = time.monotonic()
+        deadline = start + max_wait if max_wait is not None else None
+
+        with self._condition:
+            self._refill(start)
+            if not self._waiters and self._tokens >= 1 and start >= self._paused_until:
+                self._tokens -= 1
+                WAIT_TIME.observe(0, name=self.name, priority=label)
+                return
+
+            if max_wait is not None and self._projected_wait(priority, start) > max_wait:
+                self._shed(label, "projected wait too long")
+
+            entry = (priority, next(self._sequence))
+            heapq.heappush(self._waiters, entry)
+            QUEUE_DEPTH.inc(name=self.name, priority=label)
+            try:
+                while True:
+                    now = time.monotonic()
+                    self._refill(now)
+                    delay = self._delay_until_token(now)
+                    if self._waiters[0] == entry and delay == 0:
+                        self._tokens -= 1
+                        break
+                    if deadline is not None and now >= deadline:
+                        self._shed(label, "timed out waiting")
+                    timeout = delay if self._waiters[0] == entry else None
+                    if deadline is not None:
+                        remaining = deadline - now
+                        timeout = remaining if timeout is None else min(timeout, remaining)
+                    self._condition.wait(timeout)
+            finally:
+                self._waiters.remove(entry)
+                heapq.heapify(self._waiters)
+                QUEUE_DEPTH.dec(name=self.name, priority=label)
+                self._condition.notify_all()
+
+        WAIT_TIME.observe(time.monotonic() - start, name=self.name, priority=label)
+
+    def penalize(self, seconds):
+        """
+        Stop handing out tokens for ``seconds``, e.g. after the upstream answered 429.
+
+        Args:
+            seconds (float): The number of seconds to pause.
+        """
+        with self._condition:
+            now = time.monotonic()
+            self._paused_until = max(self._paused_until, now + seconds)
+            self._tokens = 0.0
+            self._updated = now
+            self._condition.notify_all()
+
+    def queue_depth(self):
+        """
+        Return the number of callers waiting for a token.
+
+        Returns:
+            int: The queue depth.
+        """
+        with self._condition:
+            return len(self._waiters)
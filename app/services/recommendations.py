@@ -0,0 +1,200 @@
+"""
+Module for item-to-item recommendations.
+
+This module builds "people who saved this also saved" recommendations offline. It loads
+the watchlists as a sparse account-by-title matrix, computes the title-by-title
+co-occurrence matrix with one sparse product and, in vectorized batches of rows, keeps the
+top-K neighbours of every title by cosine similarity or raw co-occurrence count. A pair
+of titles only counts as neighbours once enough different accounts saved both, so a
+recommendation never reveals what a single account saved. The neighbours are stored in
+the ``motion_picture_recommendations`` table, so serving them is a primary-key range
+read, cached in the application cache.
+
+Functions:
+    compute_neighbours: Compute the top-K neighbours from (account, title) pairs.
+    build_recommendations: Rebuild the recommendations table from the watchlists.
+    get_recommendations: Return the cached recommendations of a motion picture.
+"""
+
+import numpy as np
+from scipy import sparse
+from sqlalchemy import insert
+
+from app import db
+from app.cache import cache
+from app.models import MotionPictures, Recommendation, WatchList
+
+METRICS = ("cosine", "cooccurrence")
+
+
+def compute_neighbours(
+    account_ids,
+    motion_picture_ids,
+    top_k=20,
+    metric="cosine",
+    batch_size=1024,
+    min_accounts=1,
+):
+    """
+    Compute the top-K neighbours of every title from (account, title) pairs.
+
+    Args:
+        account_ids (array-like): The account of each watchlist entry.
+        motion_picture_ids (array-like): The motion picture of each watchlist entry.
+        top_k (int): The number of neighbours to keep per title.
+        metric (str): ``cosine`` or ``cooccurrence``.
+        batch_size (int): The number of titles whose neighbours are ranked at once.
+        min_accounts (int): The number of accounts that must have saved both titles
+            of a pair for them to be neighbours.
+
+    Returns:
+        tuple: Four arrays of equal length: the motion picture IDs, the ranks, the
+        recommended motion picture IDs and the scores.
+    """
+    if metric not in METRICS:
+        raise ValueError(f"Unknown metric: {metric}")
+
+    empty = (
+        np.empty(0, dtype=np.int64),
+        np.empty(0, dtype=np.int16),
+        np.empty(0, dtype=np.int64),
+        np.empty(0, dtype=np.float32),
+    )
+    if len(account_ids) == 0:
+        return empty
+
+    accounts, account_index = np.unique(np.asarray(account_ids), return_inverse=True)
+    titles, title_index = np.unique(np.asarray(motion_picture_ids), return_inverse=True)
+    saves = sparse.csr_matrix(
+        (np.ones(len(title_index), dtype=np.float32), (account_index, title_index)),
+        shape=(len(accounts), len(titles)),
+    )
+    # Duplicate entries are summed by the constructor; a title counts once per account.
+    saves.data[:] = 1
+
+    cooccurrence = (saves.T @ saves).tocsr()
+    cooccurrence.setdiag(0)
+    cooccurrence.data[cooccurrence.data < min_accounts] = 0
+    cooccurrence.eliminate_zeros()
+
+    if metric == "cosine":
+        norms = np.sqrt(np.asarray(saves.sum(axis=0)).ravel())
+        scaling = sparse.diags(1 / norms)
+        similarity = (scaling @ cooccurrence @ scaling).tocsr()
+    else:
+        similarity = cooccurrence
+
+    sources, ranks, targets, scores = [], [], [], []
+    for start in range(0, similarity.shape[0], batch_size):
+        batch = similarity[start : start + batch_size]
+        counts = np.diff(batch.indptr)
+        rows = np.repeat(np.arange(batch.shape[0]), counts)
+        # Sort every row by descending score, ties broken by title, in one lexsort.
+        order = np.lexsort((batch.indices, -batch.data, rows))
+        rank = np.arange(len(order)) - np.repeat(batch.indptr[:-1], counts)
+        keep = order[rank < top_k]
+
+        sources.append(titles[start + rows[keep]])
+        ranks.append(rank[rank < top_k].astype(np.int16))
+        targets.append(titles[batch.indices[keep]])
+        scores.append(batch.data[keep].astype(np.float32))
+
+    if not sources:
+        return empty
+    return (
+        np.concatenate(sources),
+        np.concatenate(ranks),
+        np.concatenate(targets),
+        np.concatenate(scores),
+    )
+
+
+def build_recommendations(
+    top_k=20, metric="cosine", batch_size=1024, chunk_size=5000, min_accounts=2
+):
+    """
+    Rebuild the recommendations table from the watchlists.
+
+    The table is replaced in a single transaction, so readers see either the previous
+    or the new recommendations.
+
+    Args:
+        top_k (int): The number of neighbours to keep per title.
+        metric (str): ``cosine`` or ``cooccurrence``.
+        batch_size (int): The number of titles whose neighbours are ranked at once.
+        chunk_size (int): The number of rows per INSERT statement.
+        min_accounts (int): The number of accounts that must have saved both titles
+            of a pair; at least 2, so no single account's watchlist is exposed.
+
+    Returns:
+        int: The number of recommendations stored.
+    """
+    pairs = np.array(
+        db.session.query(WatchList.account_id, WatchList.motion_picture_id).all(),
+        dtype=np.int64,
+    ).reshape(-1, 2)
+    sources, ranks, targets, scores = compute_neighbours(
+        pairs[:, 0], pairs[:, 1], top_k, metric, batch_size, max(min_accounts, 2)
+    )
+
+    try:
+        db.session.query(Recommendation).delete()
+        for start in range(0, len(sources), chunk_size):
+            end = start + chunk_size
+            db.session.execute(
+                insert(Recommendation),
+                [
+                    {
+                        "motion_picture_id": int(source),
+                        "rank": int(rank),
+                        "recommended_id": int(target),
+                        "score": float(score),
+                    }
+                    for source, rank, target, score in zip(
+                        sources[start:end],
+                        ranks[start:end],
+                        targets[start:end],
+                        scores[start:end],
+                    )
+                ],
+            )
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    version = cache.backend.get("recommendations:version") or 0
+    cache.backend.set("recommendations:version", version + 1)
+    return len(sources)
+
+
+def get_recommendations(motion_picture_id, limit=10, ttl=3600):
+    """
+    Return the recommendations of a motion picture, best first.
+
+    Results are cached per motion picture. A rebuild bumps the cached version, which
+    invalidates them at once with a shared cache backend; otherwise they expire after
+    ``ttl``.
+
+    Args:
+        motion_picture_id (int): The ID of the motion picture.
+        limit (int): The maximum number of recommendations.
+        ttl (float): The number of seconds the result stays cached.
+
+    Returns:
+        list: The recommended motion pictures as dictionaries, with their ``score``.
+    """
+    version = cache.backend.get("recommendations:version") or 0
+    key = f"recommendations:{version}:{motion_picture_id}:{limit}"
+
+    def load():
+        rows = (
+            db.session.query(Recommendation.score, MotionPictures)
+            .join(MotionPictures, MotionPictures.id == Recommendation.recommended_id)
+            .filter(Recommendation.motion_picture_id == motion_picture_id)
+            .order_by(Recommendation.rank)
+            .limit(limit)
+        )
+        return [{**picture.to_dict(), "score": score} for score, picture in rows]
+
+    return cache.get_or_set(key, load, ttl=ttl, name="recommendations")
@@ -0,0 +1,422 @@
+"""
+Module for the local catalog search index.
+
+This module keeps an in-process index over the ``title`` and ``overview`` of the
+``MotionPictures`` catalog so searches can be answered without calling TMDB. Titles are
+indexed by token prefix for typeahead and by trigram for typo-tolerant matching;
+overviews are indexed by trigram only.
+
+Text is case-folded and stripped of accents, and split on anything that is not a
+letter or digit of any script, so titles in Cyrillic, Greek or CJK are searchable too.
+
+The first search of a worker starts building the index from the database in a
+background thread, sorting the token list once, and is answered without local hits
+until it is ready. Afterwards the index is maintained incrementally: rows committed by
+this worker are applied on commit, and rows written by other workers are picked up by a
+cheap catch-up query at most every ``SEARCH_INDEX_SYNC_INTERVAL`` seconds.
+
+Classes:
+    CatalogSearchIndex: The prefix and trigram index over the catalog.
+
+Functions:
+    normalize: Case-fold text and strip accents and punctuation.
+    trigrams: Return the trigrams of a text.
+    init_search_index: Registers the session hooks that keep the index current.
+"""
+
+import bisect
+import logging
+import re
+import threading
+import time
+import unicodedata
+
+from flask import current_app
+from sqlalchemy import event, or_
+from sqlalchemy.orm import Session, object_session
+
+logger = logging.getLogger(__name__)
+
+# Anything but a letter or digit of any script.
+_NON_ALPHANUMERIC = re.compile(r"[\W_]+")
+
+
+def normalize(text):
+    """
+    Case-fold text and strip accents and punctuation.
+
+    Args:
+        text (str): The text to normalize.
+
+    Returns:
+        str: The normalized text, with single spaces between tokens.
+    """
+    decomposed = unicodedata.normalize("NFKD", (text or "").casefold())
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return _NON_ALPHANUMERIC.sub(" ", stripped).strip()
+
+
+def trigrams(text):
+    """
+    Return the trigrams of a normalized text, with each word padded by spaces.
+
+    Args:
+        text (str): The normalized text.
+
+    Returns:
+        set: The trigrams.
+    """
+    grams = set()
+    for word in text.split():
+        padded = f"  {word} "
+        grams.update(padded[i : i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class CatalogSearchIndex:
+    """
+    The prefix and trigram index over the catalog.
+
+    Attributes:
+        min_similarity (float): The minimum fraction of query trigrams a row must share
+            to match without a prefix match.
+        sync_interval (float): The minimum number of seconds between catch-up queries.
+    """
+
+    def __init__(self, min_similarity=0.4, sync_interval=5.0):
+        """
+        Initialize an empty CatalogSearchIndex instance.
+
+        Args:
+            min_similarity (float): The minimum trigram similarity of a match.
+            sync_interval (float): The minimum number of seconds between catch-ups.
+        """
+        self.min_similarity = min_similarity
+        self.sync_interval = sync_interval
+        self._lock = threading.RLock()
+        self._builder = None
+        self._reset()
+
+    def _reset(self):
+        self._documents = {}
+        self._tokens = []
+        self._title_trigrams = {}
+        self._overview_trigrams = {}
+        self._built = False
+        self._synced_at = 0.0
+        self._max_id = 0
+        self._max_updated_at = None
+
+    def __len__(self):
+        return len(self._documents)
+
+    @property
+    def built(self):
+        """
+        bool: Whether the index has been loaded from the database.
+        """
+        return self._built
+
+    def add(self, document):
+        """
+        Add or replace a catalog row in the index.
+
+        Args:
+            document (dict): The row with ``id``, ``title``, ``overview``,
+                ``external_id``, ``poster_path``, ``type`` and ``updated_at``.
+        """
+        entry = _entry(document)
+        with self._lock:
+            self.remove(document["id"])
+            for token in entry["_tokens"]:
+                bisect.insort(self._tokens, (token, document["id"]))
+            self._store(entry)
+
+    def _store(self, entry):
+        self._documents[entry["id"]] = entry
+        for gram in entry["_title_trigrams"]:
+            self._title_trigrams.setdefault(gram, set()).add(entry["id"])
+        for gram in entry["_overview_trigrams"]:
+            self._overview_trigrams.setdefault(gram, set()).add(entry["id"])
+
+        self._max_id = max(self._max_id, entry["id"])
+        updated_at = entry.get("updated_at")
+        if updated_at is not None and (
+            self._max_updated_at is None or updated_at > self._max_updated_at
+        ):
+            self._max_updated_at = updated_at
+
+    def load(self, documents):
+        """
+        Replace the contents of the index with catalog rows.
+
+        The token list is sorted once instead of inserting every token into it.
+
+        Args:
+            documents (iterable): The rows, as for ``add``.
+        """
+        entries = [_entry(document) for document in documents]
+        tokens = sorted(
+            (token, entry["id"]) for entry in entries for token in entry["_tokens"]
+        )
+        with self._lock:
+            self._reset()
+            self._tokens = tokens
+            for entry in entries:
+                self._store(entry)
+            self._built = True
+            self._synced_at = time.monotonic()
+
+    def build(self):
+        """
+        Load the whole catalog from the database.
+
+        Must be called within an application context.
+        """
+        from app.models import MotionPictures
+
+        query = MotionPictures.query.with_entities(*_columns(MotionPictures))
+        self.load(row._asdict() for row in query)
+
+    def remove(self, document_id):
+        """
+        Remove a catalog row from the index.
+
+        Args:
+            document_id (int): The ID of the row.
+        """
+        with self._lock:
+            entry = self._documents.pop(document_id, None)
+            if entry is None:
+                return
+            for token in entry["_tokens"]:
+                index = bisect.bisect_left(self._tokens, (token, document_id))
+                if index < len(self._tokens) and self._tokens[index] == (
+                    token,
+                    document_id,
+                ):
+                    del self._tokens[index]
+            for postings, grams in (
+                (self._title_trigrams, entry["_title_trigrams"]),
+                (self._overview_trigrams, entry["_overview_trigrams"]),
+            ):
+                for gram in grams:
+                    ids = postings.get(gram)
+                    if ids is not None:
+                        ids.discard(document_id)
+                        if not ids:
+                            del postings[gram]
+
+    def _prefix_matches(self, prefix):
+        index = bisect.bisect_left(self._tokens, (prefix,))
+        ids = set()
+        while index < len(self._tokens) and self._tokens[index][0].startswith(prefix):
+            ids.add(self._tokens[index][1])
+            index += 1
+        return ids
+
+    def search(self, query, limit=20):
+        """
+        Search the catalog.
+
+        Rows whose title tokens start with every query token rank first, followed by
+        rows ranked by the share of query trigrams found in their title and overview.
+
+        Args:
+            query (str): The search query.
+            limit (int): The maximum number of results.
+
+        Returns:
+            list: The matching rows, best first.
+        """
+        normalized = normalize(query)
+        if not normalized:
+            return []
+        query_tokens = normalized.split()
+        query_trigrams = trigrams(normalized)
+
+        with self._lock:
+            scores = {}
+            prefix_ids = None
+            for token in query_tokens:
+                matches = self._prefix_matches(token)
+                prefix_ids = matches if prefix_ids is None else prefix_ids & matches
+            for document_id in prefix_ids or ():
+                scores[document_id] = 2.0
+
+            title_hits = {}
+            overview_hits = {}
+            for gram in query_trigrams:
+                for document_id in self._title_trigrams.get(gram, ()):
+                    title_hits[document_id] = title_hits.get(document_id, 0) + 1
+                for document_id in self._overview_trigrams.get(gram, ()):
+                    overview_hits[document_id] = overview_hits.get(document_id, 0) + 1
+
+            total = len(query_trigrams)
+            for document_id in set(title_hits) | set(overview_hits):
+                title_similarity = title_hits.get(document_id, 0) / total
+                overview_similarity = overview_hits.get(document_id, 0) / total
+                if (
+                    document_id not in scores
+                    and max(title_similarity, overview_similarity) < self.min_similarity
+                ):
+                    continue
+                scores[document_id] = (
+                    scores.get(document_id, 0)
+                    + title_similarity
+                    + 0.5 * overview_similarity
+                )
+
+            ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+            return [
+                {k: v for k, v in self._documents[document_id].items() if k[0] != "_"}
+                for document_id, _ in ranked[:limit]
+            ]
+
+    def ensure_current(self):
+        """
+        Start building the index on first use and catch up with rows written by other
+        workers once it is built.
+
+        The build runs in a background thread, so the calling request does not wait
+        for it. Must be called within an application context.
+        """
+        if not self._built:
+            self._start_build(current_app._get_current_object())
+            return
+        now = time.monotonic()
+        if now - self._synced_at < self.sync_interval:
+            return
+        with self._lock:
+            if now - self._synced_at < self.sync_interval:
+                return
+            from app.models import MotionPictures
+
+            conditions = [MotionPictures.id > self._max_id]
+            if self._max_updated_at is not None:
+                conditions.append(MotionPictures.updated_at >= self._max_updated_at)
+            query = MotionPictures.query.with_entities(
+                *_columns(MotionPictures)
+            ).filter(or_(*conditions))
+            for row in query:
+                self.add(row._asdict())
+            self._synced_at = now
+
+    def _start_build(self, app):
+        with self._lock:
+            if self._builder is not None and self._builder.is_alive():
+                return
+            self._builder = threading.Thread(
+                target=self._build_in_background,
+                args=(app,),
+                name="search-index-build",
+                daemon=True,
+            )
+            self._builder.start()
+
+    def _build_in_background(self, app):
+        try:
+            with app.app_context():
+                self.build()
+        except Exception:
+            logger.exception("Failed to build the catalog search index")
+
+    def wait_until_built(self, timeout=None):
+        """
+        Wait for a running background build.
+
+        Args:
+            timeout (float): The maximum number of seconds to wait.
+
+        Returns:
+            bool: Whether the index is built.
+        """
+        builder = self._builder
+        if builder is not None:
+            builder.join(timeout)
+        return self._built
+
+    def clear(self):
+        """
+        Empty the index so it is rebuilt on next use.
+        """
+        with self._lock:
+            self._reset()
+
+
+catalog_index = CatalogSearchIndex()
+
+
+def _columns(model):
+    return (
+        model.id,
+        model.title,
+        model.overview,
+        model.external_id,
+        model.poster_path,
+        model.type,
+        model.updated_at,
+    )
+
+
+def _entry(document):
+    title = normalize(document["title"])
+    return {
+        **document,
+        "_tokens": sorted(set(title.split())),
+        "_title_trigrams": trigrams(title),
+        "_overview_trigrams": trigrams(normalize(document.get("overview"))),
+    }
+
+
+def _document(target):
+    return {
+        "id": target.id,
+        "title": target.title,
+        "overview": target.overview,
+        "external_id": target.external_id,
+        "poster_path": target.poster_path,
+        "type": target.type,
+        "updated_at": target.__dict__.get("updated_at"),
+    }
+
+
+def init_search_index(app, index=None):
+    """
+    Configure the index and register the hooks that apply committed catalog changes.
+
+    Rows are captured when they are flushed and applied only once their transaction
+    commits, so rolled back rows never reach the index.
+
+    Args:
+        app (Flask): The Flask application.
+        index (CatalogSearchIndex): The index to keep current; defaults to
+            ``catalog_index``.
+    """
+    from app.models import MotionPictures
+
+    index = index or catalog_index
+    index.min_similarity = app.config.get("SEARCH_MIN_SIMILARITY", index.min_similarity)
+    index.sync_interval = app.config.get(
+        "SEARCH_INDEX_SYNC_INTERVAL", index.sync_interval
+    )
+
+    def capture(mapper, connection, target):
+        session = object_session(target)
+        if session is not None:
+            session.info.setdefault("catalog_index_pending", []).append(
+                _document(target)
+            )
+
+    def apply(session):
+        for document in session.info.pop("catalog_index_pending", ()):
+            if index.built:
+                index.add(document)
+
+    def discard(session, previous_transaction=None):
+        session.info.pop("catalog_index_pending", None)
+
+    event.listen(MotionPictures, "after_insert", capture)
+    event.listen(MotionPictures, "after_update", capture)
+    event.listen(Session, "after_commit", apply)
+    event.listen(Session, "after_soft_rollback", discard)
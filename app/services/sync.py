@@ -0,0 +1,197 @@
+"""
+Module for the delta sync of watchlists.
+
+This module lets a client fetch only what changed in a watchlist since its last sync.
+Every insert, update and delete of a watchlist entry takes the next number of the
+account's change sequence in the flush that writes it. Live entries carry the number of
+their last change and deleted entries leave a tombstone with the number of their
+deletion, so the changes after a cursor are two indexed range reads whose size depends
+on the number of changes, not on the size of the watchlist.
+
+Taking a number locks the account's sequence row until the transaction ends, so the
+changes of an account commit in sequence order and a cursor never skips one.
+
+Tombstones are kept for ``SYNC_TOMBSTONE_RETENTION`` seconds. A cursor older than the
+pruned tombstones can no longer be served and the client has to resync from scratch.
+
+Classes:
+    CursorExpired: Raised when a cursor is older than the retained tombstones.
+
+Functions:
+    decode_cursor: Parse a sync cursor.
+    changes_since: Return the watchlist changes of an account after a cursor.
+    prune_tombstones: Delete the tombstones older than the retention.
+    init_sync: Registers the hooks that number the watchlist changes.
+"""
+
+from datetime import datetime, timedelta
+
+from sqlalchemy import event, exists, func, select
+from sqlalchemy.orm import joinedload, object_session
+
+from app import db
+
+
+class CursorExpired(Exception):
+    """
+    Raised when a cursor is older than the retained tombstones.
+    """
+
+
+def decode_cursor(cursor):
+    """
+    Parse a sync cursor.
+
+    Args:
+        cursor (str): The cursor returned by a previous sync, or None.
+
+    Returns:
+        int: The change number of the cursor, or None for a full sync.
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    if cursor is None or cursor == "":
+        return None
+    value = int(cursor)
+    if value < 0:
+        raise ValueError(f"Invalid cursor: {cursor}")
+    return value
+
+
+def changes_since(account_id, since=None, limit=100):
+    """
+    Return the watchlist changes of an account after a cursor.
+
+    Without a cursor every live entry is returned, so the first sync is a full one.
+
+    Args:
+        account_id (int): The ID of the account.
+        since (int): The change number of the cursor, or None.
+        limit (int): The maximum number of changes to return.
+
+    Returns:
+        dict: The ``upserts`` and ``deletes`` in change order, the ``cursor`` to pass
+        to the next sync and whether there are more changes (``has_more``).
+
+    Raises:
+        CursorExpired: If tombstones after the cursor have been pruned.
+    """
+    from app.models import SyncState, WatchList, WatchListTombstone
+
+    if since is not None:
+        state = db.session.get(SyncState, account_id)
+        if state is not None and since < state.pruned_seq:
+            raise CursorExpired(since)
+
+    changes = (
+        WatchList.query.options(joinedload(WatchList.motion_picture))
+        .filter(
+            WatchList.account_id == account_id,
+            WatchList.change_seq > (since or 0),
+        )
+        .order_by(WatchList.change_seq)
+        .limit(limit + 1)
+        .all()
+    )
+    if since is not None:
+        changes += (
+            WatchListTombstone.query.filter(
+                WatchListTombstone.account_id == account_id,
+                WatchListTombstone.change_seq > since,
+            )
+            .order_by(WatchListTombstone.change_seq)
+            .limit(limit + 1)
+            .all()
+        )
+    changes.sort(key=lambda change: change.change_seq)
+    page = changes[:limit]
+
+    return {
+        "upserts": [change.to_dict() for change in page if isinstance(change, WatchList)],
+        "deletes": [
+            change.to_dict() for change in page if not isinstance(change, WatchList)
+        ],
+        "cursor": str(page[-1].change_seq if page else since or 0),
+        "has_more": len(changes) > limit,
+    }
+
+
+def prune_tombstones(retention, now=None):
+    """
+    Delete the tombstones older than the retention.
+
+    The last pruned change number of every account is recorded first, so the cursors
+    that needed the pruned tombstones are rejected instead of silently missing deletes.
+
+    Args:
+        retention (float): How long tombstones are kept, in seconds.
+        now (datetime): The current time; defaults to now.
+
+    Returns:
+        int: The number of tombstones deleted.
+    """
+    from app.models import SyncState, WatchListTombstone
+
+    cutoff = (now or datetime.now()) - timedelta(seconds=retention)
+    expired = (
+        WatchListTombstone.account_id == SyncState.account_id,
+        WatchListTombstone.deleted_at < cutoff,
+    )
+    try:
+        db.session.execute(
+            SyncState.__table__.update()
+            .where(exists().where(*expired))
+            .values(
+                pruned_seq=select(func.max(WatchListTombstone.change_seq))
+                .where(*expired)
+                .scalar_subquery()
+            )
+        )
+        deleted = WatchListTombstone.query.filter(
+            WatchListTombstone.deleted_at < cutoff
+        ).delete()
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return deleted
+
+
+def init_sync(app):
+    """
+    Register the hooks that number the watchlist changes and record tombstones.
+
+    Args:
+        app (Flask): The Flask application.
+    """
+    from app.models import SyncState, WatchList, WatchListTombstone
+    from .counters import next_value
+
+    state = SyncState.__table__
+    tombstones = WatchListTombstone.__table__
+
+    def next_seq(connection, account_id):
+        return next_value(connection, state, {"account_id": account_id}, "change_seq")
+
+    def before_insert(mapper, connection, target):
+        target.change_seq = next_seq(connection, target.account_id)
+
+    def before_update(mapper, connection, target):
+        if object_session(target).is_modified(target, include_collections=False):
+            target.change_seq = next_seq(connection, target.account_id)
+
+    def after_delete(mapper, connection, target):
+        connection.execute(
+            tombstones.insert().values(
+                account_id=target.account_id,
+                change_seq=next_seq(connection, target.account_id),
+                watch_list_id=target.id,
+                motion_picture_id=target.motion_picture_id,
+                deleted_at=datetime.now(),
+            )
+        )
+
+    event.listen(WatchList, "before_insert", before_insert)
+    event.listen(WatchList, "before_update", before_update)
+    event.listen(WatchList, "after_delete", after_delete)
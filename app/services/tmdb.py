@@ -0,0 +1,653 @@
+"""
+Module for the TMDB API client.
+
+This module wraps the HTTP calls made to The Movie Database (TMDB) API. Every call goes
+through one pooled session and records its latency and errors in the application metrics.
+Popular lists and search results are cached in the shared application cache.
+
+Calls are throttled by a prioritized client-side rate limiter, have a timeout and go
+through a circuit breaker. An optional on-disk HTTP cache keeps response bodies with
+their validators, so fresh responses skip the network and stale ones are revalidated
+with conditional requests. While TMDB is failing or slow,
+cached lookups fall back to the last good response, flagged as stale, so upstream trouble
+degrades freshness instead of availability.
+
+Details of many movies and series are fetched at once by ``details_many``, which serves
+the cached ones and fetches the misses concurrently on a bounded thread pool shared by
+all requests of the worker, so a batch costs about as much as its slowest call.
+
+Popular lists and searches are paginated. Serving a page queues a background fetch of
+the next one into the cache, so a client scrolling through a list finds it cached.
+
+Classes:
+    TMDBError: Raised when TMDB responds with an error status.
+    TMDBUnavailable: Raised when TMDB fails and no cached response can be served.
+    TMDBClient: A client for the TMDB API.
+"""
+
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from dotenv import load_dotenv
+from flask import current_app, g, has_request_context
+
+from app.cache import cache
+from app.instrumentation.metrics import (
+    CACHE_REQUESTS,
+    UPSTREAM_ERRORS,
+    UPSTREAM_LATENCY,
+)
+from app.instrumentation.tracing import in_current_trace, span
+from .circuit_breaker import CircuitBreaker, CircuitOpenError
+from .rate_limiter import RateLimiter, RateLimitExceeded
+from .http_cache import HTTPCache
+from .projection import project
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+
+class TMDBError(Exception):
+    """
+    Raised when TMDB responds with an error status.
+
+    Attributes:
+        status_code (int): The HTTP status code of the response.
+        payload (dict): The decoded error response.
+    """
+
+    def __init__(self, status_code, payload):
+        """
+        Initialize a new TMDBError instance.
+
+        Args:
+            status_code (int): The HTTP status code of the response.
+            payload (dict): The decoded error response.
+        """
+        super().__init__(f"TMDB responded with status {status_code}")
+        self.status_code = status_code
+        self.payload = payload
+
+
+class TMDBUnavailable(Exception):
+    """
+    Raised when TMDB fails and no cached response can be served instead.
+    """
+
+
+class TMDBClient:
+    """
+    A client for the TMDB API.
+
+    Attributes:
+        base_url (str): The base URL of the TMDB API.
+        headers (dict): The headers sent with every request.
+        session (requests.Session): The pooled HTTP session.
+        timeout (tuple): The connect and read timeouts in seconds.
+        stale_ttl (float): How long the last good response is kept as a fallback.
+        breaker (CircuitBreaker): The circuit breaker around TMDB calls.
+        limiter (RateLimiter): The rate limiter shared by every TMDB call.
+        http_cache (HTTPCache): The on-disk HTTP cache, or None if disabled.
+        search_counts (Counter): How often each normalized query was searched by this
+            worker, used to pre-warm the most requested searches.
+        prefetch_workers (int): The number of concurrent next-page prefetches; 0
+            disables them.
+    """
+
+    base_url = "https://api.themoviedb.org/3"
+    max_tracked_queries = 10000
+    # TMDB serves at most this many pages of a list.
+    max_page = 500
+
+    def __init__(self, access_token=None, base_url=None):
+        """
+        Initialize a new TMDBClient instance.
+
+        Args:
+            access_token (str): The TMDB API read access token.
+            base_url (str): Overrides the TMDB API base URL.
+        """
+        if base_url:
+            self.base_url = base_url
+        self.headers = {
+            "accept": "application/json",
+            "Authorization": f"Bearer {access_token or os.getenv('MOVIE_DB_ACCESS_TOKEN')}",
+        }
+        self.session = requests.Session()
+        self.timeout = (3.05, 5)
+        self.stale_ttl = 86400
+        self.breaker = CircuitBreaker("tmdb")
+        self.limiter = RateLimiter("tmdb")
+        self.http_cache = None
+        self.search_counts = Counter()
+        self._search_counts_lock = threading.Lock()
+        self.fanout_workers = 8
+        self._pool = None
+        self._pool_lock = threading.Lock()
+        self.prefetch_workers = 2
+        self._prefetch_pool = None
+        self._prefetching = set()
+
+    def init_app(self, app):
+        """
+        Configure the timeouts, stale fallback, circuit breaker, rate limiter and HTTP
+        cache from the app config.
+
+        Args:
+            app (Flask): The Flask application.
+        """
+        config = app.config
+        self.timeout = (
+            config.get("TMDB_CONNECT_TIMEOUT", 3.05),
+            config.get("TMDB_READ_TIMEOUT", 5),
+        )
+        self.stale_ttl = config.get("TMDB_STALE_TTL", 86400)
+        self.breaker = CircuitBreaker(
+            "tmdb",
+            failure_rate_threshold=config.get("TMDB_BREAKER_FAILURE_RATE", 0.5),
+            slow_call_threshold=config.get("TMDB_BREAKER_SLOW_CALL", 2.0),
+            window_size=config.get("TMDB_BREAKER_WINDOW", 20),
+            minimum_calls=config.get("TMDB_BREAKER_MINIMUM_CALLS", 5),
+            reset_timeout=config.get("TMDB_BREAKER_RESET_TIMEOUT", 30),
+        )
+        self.limiter = RateLimiter(
+            "tmdb",
+            rate=config.get("TMDB_RATE_LIMIT"),
+            burst=config.get("TMDB_RATE_BURST", 1),
+            max_wait={
+                RateLimiter.INTERACTIVE: config.get("TMDB_INTERACTIVE_MAX_WAIT"),
+                RateLimiter.BACKGROUND: config.get("TMDB_BACKGROUND_MAX_WAIT"),
+                RateLimiter.PREFETCH: config.get("TMDB_PREFETCH_MAX_WAIT", 0),
+            },
+        )
+        self.http_cache = None
+        if config.get("TMDB_HTTP_CACHE_ENABLED"):
+            self.http_cache = HTTPCache(
+                config.get("TMDB_HTTP_CACHE_PATH")
+                or os.path.join(tempfile.gettempdir(), "watchwave-tmdb-http.sqlite3"),
+                default_max_age=config.get("TMDB_HTTP_CACHE_DEFAULT_MAX_AGE", 0),
+                retention=config.get("TMDB_HTTP_CACHE_RETENTION", 604800),
+            )
+        self.fanout_workers = config.get("TMDB_FANOUT_WORKERS", 8)
+        self.prefetch_workers = config.get("TMDB_PREFETCH_WORKERS", 2)
+
+    @staticmethod
+    def cache_key(path, params=None):
+        """
+        Return the cache key of a TMDB request.
+
+        Args:
+            path (str): The API path.
+            params (dict): The query parameters.
+
+        Returns:
+            str: The cache key.
+        """
+        key = "tmdb:" + path
+        if params:
+            key += "?" + "&".join(f"{k}={v}" for k, v in sorted(params.items()))
+        return key
+
+    @classmethod
+    def list_params(cls, page=1, language=None, region=None):
+        """
+        Return the query parameters of a page of a TMDB list.
+
+        Defaults are left out, so the first page shares its cache entry with the
+        pre-warmed one.
+
+        Args:
+            page (int): The page number, from 1 to ``max_page``.
+            language (str): The ``language`` parameter, e.g. ``en-US``, or None.
+            region (str): The ``region`` parameter, e.g. ``US``, or None.
+
+        Returns:
+            dict: The query parameters.
+        """
+        params = {}
+        if page != 1:
+            params["page"] = page
+        if language:
+            params["language"] = language
+        if region:
+            params["region"] = region
+        return params
+
+    @staticmethod
+    def normalize_query(query):
+        """
+        Normalize a search query so equivalent queries share a cache entry.
+
+        Args:
+            query (str): The search query.
+
+        Returns:
+            str: The lower-cased query with collapsed whitespace.
+        """
+        return " ".join((query or "").lower().split())
+
+    def get(self, path, params=None, priority=RateLimiter.INTERACTIVE):
+        """
+        Send a GET request to the TMDB API.
+
+        Args:
+            path (str): The API path, e.g. ``movie/popular``.
+            params (dict): The query parameters.
+            priority (int): The rate limiter priority of the call.
+
+        Returns:
+            dict: The decoded JSON response.
+
+        Raises:
+            TMDBError: If TMDB responds with an error status.
+            CircuitOpenError: If the circuit breaker is open.
+            requests.RequestException: If the request fails or times out.
+            RateLimitExceeded: If the call would wait too long for the rate limiter.
+        """
+        entry = None
+        if self.http_cache is not None:
+            entry = self.http_cache.lookup(f"{self.base_url}/{path}", params)
+            if entry is not None and self.http_cache.is_fresh(entry):
+                CACHE_REQUESTS.inc(cache="tmdb_http", result="hit")
+                return entry["body"]
+
+        # Fail fast while the circuit is open instead of queueing for a token first.
+        if self.breaker.rejects_calls():
+            raise CircuitOpenError(f"Circuit {self.breaker.name} is open")
+        self.limiter.acquire(priority)
+        return self.breaker.call(
+            lambda: self._request(path, params, entry),
+            is_failure=self.is_upstream_failure,
+        )
+
+    @staticmethod
+    def is_upstream_failure(error):
+        """
+        Return whether an error means TMDB itself is failing.
+
+        Network errors, timeouts, rate limiting and server errors count; other client
+        errors such as an invalid API key do not.
+
+        Args:
+            error (Exception): The error raised by a TMDB call.
+
+        Returns:
+            bool: True if the error is an upstream failure.
+        """
+        if isinstance(error, TMDBError):
+            return error.status_code == 429 or error.status_code >= 500
+        return isinstance(error, (requests.RequestException, CircuitOpenError))
+
+    def _request(self, path, params, entry=None):
+        url = f"{self.base_url}/{path}"
+        headers = self.headers
+        if self.http_cache is not None:
+            headers = {**headers, **self.http_cache.conditional_headers(entry)}
+
+        start = time.perf_counter()
+        with span("tmdb.request", **{"http.method": "GET", "tmdb.path": path}) as attrs:
+            try:
+                response = self.session.get(
+                    url, headers=headers, params=params, timeout=self.timeout
+                )
+            except requests.RequestException as e:
+                UPSTREAM_ERRORS.inc(
+                    upstream="tmdb", endpoint=path, reason=type(e).__name__
+                )
+                raise
+            finally:
+                UPSTREAM_LATENCY.observe(
+                    time.perf_counter() - start, upstream="tmdb", endpoint=path
+                )
+            if attrs is not None:
+                attrs["http.status_code"] = response.status_code
+
+        if response.status_code == 429:
+            try:
+                retry_after = float(response.headers.get("Retry-After", 1))
+            except ValueError:
+                retry_after = 1.0
+            self.limiter.penalize(retry_after)
+
+        if response.status_code >= 400:
+            UPSTREAM_ERRORS.inc(
+                upstream="tmdb", endpoint=path, reason=str(response.status_code)
+            )
+            try:
+                payload = response.json()
+            except ValueError:
+                payload = {"status_message": response.text}
+            raise TMDBError(response.status_code, payload)
+
+        if self.http_cache is None:
+            return response.json()
+        if response.status_code == 304 and entry is not None:
+            CACHE_REQUESTS.inc(cache="tmdb_http", result="revalidated")
+            return self.http_cache.revalidated(url, params, entry, response.headers)
+
+        CACHE_REQUESTS.inc(cache="tmdb_http", result="miss")
+        payload = response.json()
+        self.http_cache.save(url, params, response.headers, payload)
+        return payload
+
+    def cached_get(
+        self,
+        path,
+        params=None,
+        ttl=None,
+        priority=RateLimiter.INTERACTIVE,
+        fields=None,
+    ):
+        """
+        Send a GET request to the TMDB API through the shared cache.
+
+        Only successful responses are cached. Each one is also kept for ``stale_ttl``
+        seconds as a fallback: if TMDB fails or the call is shed by the rate limiter,
+        that copy is returned with ``"stale": true`` and the request is flagged so the
+        response carries a ``Warning`` header.
+
+        With ``fields``, the projected response is cached under its own key as well,
+        so repeated compact requests skip the projection. Stale responses are
+        projected but not cached.
+
+        Args:
+            path (str): The API path.
+            params (dict): The query parameters.
+            ttl (float): The number of seconds the response stays cached.
+            priority (int): The rate limiter priority of the call.
+            fields (tuple): The fields the results are trimmed to, from
+                ``parse_fields``.
+
+        Returns:
+            dict: The decoded JSON response.
+
+        Raises:
+            TMDBError: If TMDB rejects the request, e.g. with an invalid API key.
+            TMDBUnavailable: If TMDB fails and there is no response to fall back to.
+        """
+        if fields:
+            key = self.cache_key(path, params) + "#fields=" + ",".join(fields)
+            projected = cache.get(key, name="tmdb")
+            if projected is None:
+                payload = self.cached_get(path, params, ttl, priority)
+                projected = project(payload, fields)
+                if not payload.get("stale"):
+                    cache.set(key, projected, ttl)
+            return projected
+
+        key = self.cache_key(path, params)
+        try:
+            return cache.get_or_set(
+                key,
+                lambda: self._fetch_and_keep(key, path, params, priority),
+                ttl=ttl,
+                name="tmdb",
+            )
+        except Exception as e:
+            stale = self._stale_fallback(key, e)
+            if has_request_context():
+                g.tmdb_stale = True
+            return stale
+
+    def _stale_fallback(self, key, error):
+        if not self.is_upstream_failure(error) and not isinstance(
+            error, RateLimitExceeded
+        ):
+            raise error
+        stale = cache.backend.get("stale:" + key)
+        if stale is None:
+            raise TMDBUnavailable("TMDB is unavailable") from error
+        CACHE_REQUESTS.inc(cache="tmdb", result="stale")
+        return {**stale, "stale": True}
+
+    def _fetch_and_keep(self, key, path, params, priority):
+        payload = self.get(path, params, priority)
+        cache.backend.set("stale:" + key, payload, self.stale_ttl)
+        return payload
+
+    def refresh(self, path, params=None, ttl=None, priority=RateLimiter.BACKGROUND):
+        """
+        Fetch a TMDB response and store it in the cache, replacing any cached copy.
+
+        Refreshes run at background priority by default, behind interactive calls.
+
+        Args:
+            path (str): The API path.
+            params (dict): The query parameters.
+            ttl (float): The number of seconds the response stays cached.
+            priority (int): The rate limiter priority of the call.
+
+        Returns:
+            dict: The decoded JSON response.
+        """
+        key = self.cache_key(path, params)
+        payload = self._fetch_and_keep(key, path, params, priority)
+        cache.set(key, payload, ttl)
+        return payload
+
+    @property
+    def pool(self):
+        """
+        ThreadPoolExecutor: The pool of concurrent TMDB calls, created on first use.
+        """
+        if self._pool is None:
+            with self._pool_lock:
+                if self._pool is None:
+                    self._pool = ThreadPoolExecutor(
+                        max_workers=self.fanout_workers, thread_name_prefix="tmdb"
+                    )
+        return self._pool
+
+    @property
+    def prefetch_pool(self):
+        """
+        ThreadPoolExecutor: The pool of next-page prefetches, created on first use.
+        """
+        if self._prefetch_pool is None:
+            with self._pool_lock:
+                if self._prefetch_pool is None:
+                    self._prefetch_pool = ThreadPoolExecutor(
+                        max_workers=self.prefetch_workers,
+                        thread_name_prefix="tmdb-prefetch",
+                    )
+        return self._prefetch_pool
+
+    def prefetch_next(self, path, params, payload, ttl=None):
+        """
+        Fetch the page after a served page into the cache, in the background.
+
+        Nothing is fetched after the last page or a stale page. Prefetches run at
+        ``PREFETCH`` priority, so they only use spare rate limit tokens, and a
+        prefetch already running or queued for the same page is not repeated.
+
+        Args:
+            path (str): The API path of the list.
+            params (dict): The query parameters of the served page.
+            payload (dict): The served page.
+            ttl (float): The number of seconds the next page stays cached.
+        """
+        page = (params or {}).get("page", 1)
+        last_page = min(payload.get("total_pages") or 0, self.max_page)
+        if not self.prefetch_workers or payload.get("stale") or page >= last_page:
+            return
+        params = {**(params or {}), "page": page + 1}
+        key = self.cache_key(path, params)
+        with self._pool_lock:
+            if (
+                key in self._prefetching
+                or len(self._prefetching) >= 4 * self.prefetch_workers
+            ):
+                return
+            self._prefetching.add(key)
+        self.prefetch_pool.submit(self._prefetch, key, path, params, ttl)
+
+    def _prefetch(self, key, path, params, ttl):
+        try:
+            cache.get_or_set(
+                key,
+                lambda: self._fetch_and_keep(key, path, params, RateLimiter.PREFETCH),
+                ttl=ttl,
+                name="tmdb_prefetch",
+            )
+        except Exception as e:
+            logger.debug("Prefetch of %s failed: %r", key, e)
+        finally:
+            with self._pool_lock:
+                self._prefetching.discard(key)
+
+    def _fetch_details(self, key, path, ttl):
+        try:
+            payload = self._fetch_and_keep(key, path, None, RateLimiter.INTERACTIVE)
+        except Exception as e:
+            return self._stale_fallback(key, e)
+        cache.set(key, payload, ttl)
+        return payload
+
+    def details_many(self, items, ttl=None):
+        """
+        Fetch the details of many movies and series at once.
+
+        Cached details are served from the cache and the misses are fetched
+        concurrently on the shared pool. Each item succeeds or fails on its own; a
+        failing item falls back to its stale copy like ``cached_get``.
+
+        Args:
+            items (list): ``(kind, external_id)`` pairs, where ``kind`` is ``movie``
+                or ``tv``.
+            ttl (float): The number of seconds fetched details stay cached.
+
+        Returns:
+            list: One result per item, in order: the details, or the
+            ``TMDBError``/``TMDBUnavailable`` raised for the item.
+        """
+        paths = [f"{kind}/{external_id}" for kind, external_id in items]
+        results = {}
+        futures = {}
+        for path in dict.fromkeys(paths):
+            key = self.cache_key(path)
+            cached = cache.get(key, name="tmdb")
+            if cached is not None:
+                results[path] = cached
+            else:
+                futures[path] = self.pool.submit(
+                    in_current_trace(self._fetch_details), key, path, ttl
+                )
+
+        for path, future in futures.items():
+            try:
+                results[path] = future.result()
+            except (TMDBError, TMDBUnavailable) as e:
+                results[path] = e
+
+        if has_request_context() and any(
+            isinstance(result, dict) and result.get("stale")
+            for result in results.values()
+        ):
+            g.tmdb_stale = True
+        return [results[path] for path in paths]
+
+    def record_search(self, query):
+        """
+        Count a search query so the most requested ones can be pre-warmed.
+
+        Args:
+            query (str): The normalized search query.
+        """
+        with self._search_counts_lock:
+            self.search_counts[query] += 1
+            if len(self.search_counts) > self.max_tracked_queries:
+                self.search_counts = Counter(
+                    dict(self.search_counts.most_common(self.max_tracked_queries // 10))
+                )
+
+    def top_searches(self, limit):
+        """
+        Return the most requested search queries of this worker.
+
+        Args:
+            limit (int): The maximum number of queries.
+
+        Returns:
+            list: The normalized queries, most requested first.
+        """
+        with self._search_counts_lock:
+            return [query for query, _ in self.search_counts.most_common(limit)]
+
+    def popular_movies(self, fields=None, page=1, language=None, region=None):
+        """
+        Fetch a page of the popular movies and prefetch the next one.
+
+        Args:
+            fields (tuple): The fields the results are trimmed to, or None.
+            page (int): The page number.
+            language (str): The TMDB ``language`` parameter, or None.
+            region (str): The TMDB ``region`` parameter, or None.
+
+        Returns:
+            dict: The popular movies response.
+        """
+        return self._paged_get(
+            "movie/popular",
+            self.list_params(page, language, region),
+            current_app.config.get("TMDB_POPULAR_TTL"),
+            fields,
+        )
+
+    def popular_series(self, fields=None, page=1, language=None):
+        """
+        Fetch a page of the popular TV series and prefetch the next one.
+
+        Args:
+            fields (tuple): The fields the results are trimmed to, or None.
+            page (int): The page number.
+            language (str): The TMDB ``language`` parameter, or None.
+
+        Returns:
+            dict: The popular TV series response.
+        """
+        return self._paged_get(
+            "tv/popular",
+            self.list_params(page, language),
+            current_app.config.get("TMDB_POPULAR_TTL"),
+            fields,
+        )
+
+    def search(self, query, fields=None, page=1, language=None):
+        """
+        Search for movies and series and prefetch the next page of results.
+
+        Only first pages count towards the most requested searches.
+
+        Args:
+            query (str): The search query.
+            fields (tuple): The fields the results are trimmed to, or None.
+            page (int): The page number.
+            language (str): The TMDB ``language`` parameter, or None.
+
+        Returns:
+            dict: The search results.
+        """
+        query = self.normalize_query(query)
+        if page == 1:
+            self.record_search(query)
+        return self._paged_get(
+            "search/multi",
+            {"query": query, **self.list_params(page, language)},
+            current_app.config.get("TMDB_SEARCH_TTL"),
+            fields,
+        )
+
+    def _paged_get(self, path, params, ttl, fields):
+        payload = self.cached_get(path, params=params or None, ttl=ttl, fields=fields)
+        self.prefetch_next(path, params, payload, ttl)
+        return payload
+
+
+tmdb_client = TMDBClient()
@@ -0,0 +1,178 @@
+"""
+Module for the per-account cache of serialized watchlists.
+
+``GET /api/watchlist`` is the most called route and usually returns what it returned the
+last time. This module keeps the serialized JSON body of each user's watchlist in the
+memory of the worker, so a repeated read returns the stored bytes without querying or
+serializing anything. Each ``fields`` projection of a watchlist is stored separately.
+The cache is bounded by the total size of the stored bodies and evicts the least
+recently read ones first.
+
+Each user's watchlist has a version in the application cache. Adding or removing a
+title replaces it with a new random version, which makes the bodies stored by every
+worker under the old version misses. Toggling the watched status does not change the
+serialized watchlist and leaves the version alone. The versions must be shared by the
+workers of a machine, so the cache is off by default unless ``CACHE_BACKEND=sqlite``;
+with the ``memory`` backend the other workers would keep serving a removed title until
+their copy expires. ``WATCHLIST_CACHE_TTL`` also bounds how long a title refreshed from
+TMDB is served with its old metadata.
+
+Classes:
+    WatchlistCache: The size-bounded LRU cache of serialized watchlists.
+"""
+
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from app.cache import cache
+from app.instrumentation.metrics import CACHE_REQUESTS
+
+logger = logging.getLogger(__name__)
+
+
+class WatchlistCache:
+    """
+    The size-bounded LRU cache of serialized watchlists, keyed by user and projection.
+
+    Attributes:
+        max_bytes (int): The total size of the bodies kept; 0 disables the cache.
+        ttl (float): The number of seconds a body is served for.
+    """
+
+    def __init__(self, max_bytes=64 * 1024 * 1024, ttl=300):
+        """
+        Initialize a new WatchlistCache instance.
+
+        Args:
+            max_bytes (int): The total size of the bodies kept; 0 disables the cache.
+            ttl (float): The number of seconds a body is served for.
+        """
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        """
+        Configure the size bound and expiry from the app config.
+
+        Args:
+            app (Flask): The Flask application.
+        """
+        self.max_bytes = app.config.get("WATCHLIST_CACHE_MAX_BYTES", self.max_bytes)
+        self.ttl = app.config.get("WATCHLIST_CACHE_TTL", self.ttl)
+        if self.max_bytes and app.config.get("CACHE_BACKEND", "memory") == "memory":
+            logger.warning(
+                "The watchlist cache is enabled with the memory cache backend; "
+                "changes only reach the other workers after WATCHLIST_CACHE_TTL"
+            )
+        self.clear()
+
+    @staticmethod
+    def _version_key(user_id):
+        return f"watchlist:version:{user_id}"
+
+    def version(self, user_id):
+        """
+        Return the current version of a user's watchlist.
+
+        Read it before querying the watchlist, so a body is never stored under a
+        version newer than its data. Versions expire with the bodies stored under
+        them, so they do not fill the application cache.
+
+        Args:
+            user_id (int): The ID of the user.
+
+        Returns:
+            str: The version, or None when the cache is disabled.
+        """
+        if not self.max_bytes:
+            return None
+        key = self._version_key(user_id)
+        version = cache.backend.get(key)
+        if version is None:
+            # Nothing cached under a lost version may be served again.
+            cache.backend.add(key, uuid.uuid4().hex, ttl=self.ttl)
+            version = cache.backend.get(key)
+        return version
+
+    def get(self, user_id, version, fields=None):
+        """
+        Return the stored body of a user's watchlist if it has the given version.
+
+        Args:
+            user_id (int): The ID of the user.
+            version (str): The current version of the watchlist.
+            fields (tuple): The projection of the body, or None.
+
+        Returns:
+            bytes: The serialized watchlist, or None.
+        """
+        if not self.max_bytes:
+            return None
+        key = (user_id, fields)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (
+                entry[0] != version or entry[2] <= time.monotonic()
+            ):
+                self._remove(key)
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+        CACHE_REQUESTS.inc(cache="watchlist", result="miss" if entry is None else "hit")
+        return entry[1] if entry is not None else None
+
+    def set(self, user_id, version, body, fields=None):
+        """
+        Store the serialized watchlist of a user, evicting the least recently read.
+
+        Args:
+            user_id (int): The ID of the user.
+            version (str): The version read before the watchlist was queried.
+            body (bytes): The serialized watchlist.
+            fields (tuple): The projection of the body, or None.
+        """
+        if not self.max_bytes or len(body) > self.max_bytes:
+            return
+        key = (user_id, fields)
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (version, body, time.monotonic() + self.ttl)
+            self._size += len(body)
+            while self._size > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate(self, user_id):
+        """
+        Give a user's watchlist a new version, in every worker sharing the cache.
+
+        Call it after the change is committed. The bodies stored under the old version
+        are dropped when they are next read, or evicted.
+
+        Args:
+            user_id (int): The ID of the user.
+        """
+        if not self.max_bytes:
+            return
+        cache.backend.set(self._version_key(user_id), uuid.uuid4().hex, ttl=self.ttl)
+
+    def clear(self):
+        """
+        Remove every stored body of this worker.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._size -= len(entry[1])
+
+
+watchlist_cache = WatchlistCache()
@@ -0,0 +1,127 @@
+"""
+Module for full-text search within a user's watchlist.
+
+This module searches the titles and overviews of the motion pictures in one account's
+watchlist, using the full-text index of the database: the ``search_vector`` GIN index on
+PostgreSQL and the ``motion_pictures_fts`` FTS5 table on SQLite. Every query token is
+matched as a prefix, so partial words work while typing. Tokens are runs of letters and
+digits of any script, kept with their accents, since the database indexes fold them
+themselves. Results are ranked by relevance and paginated.
+
+Functions:
+    search_watchlist: Search the watchlist of an account.
+"""
+
+import re
+
+from sqlalchemy import text
+
+from app import db
+from app.models import MotionPictureRow, MotionPictures, WatchList
+
+# Runs of letters and digits of any script.
+_TOKEN = re.compile(r"[^\W_]+")
+
+_POSTGRES_QUERY = """
+    FROM watch_list
+    JOIN motion_pictures ON motion_pictures.id = watch_list.motion_picture_id
+    WHERE watch_list.account_id = :account_id
+      AND motion_pictures.search_vector @@ to_tsquery('simple', :query)
+"""
+
+_SQLITE_QUERY = """
+    FROM motion_pictures_fts
+    JOIN watch_list ON watch_list.motion_picture_id = motion_pictures_fts.rowid
+    WHERE watch_list.account_id = :account_id
+      AND motion_pictures_fts MATCH :query
+"""
+
+
+def _postgres_search(account_id, tokens, limit, offset):
+    params = {
+        "account_id": account_id,
+        "query": " & ".join(f"{token}:*" for token in tokens),
+    }
+    total = db.session.execute(
+        text(f"SELECT count(*) {_POSTGRES_QUERY}"), params
+    ).scalar()
+    rows = db.session.execute(
+        text(
+            "SELECT motion_pictures.id "
+            f"{_POSTGRES_QUERY} "
+            "ORDER BY ts_rank(motion_pictures.search_vector, "
+            "to_tsquery('simple', :query)) DESC, motion_pictures.id "
+            "LIMIT :limit OFFSET :offset"
+        ),
+        {**params, "limit": limit, "offset": offset},
+    )
+    return [row[0] for row in rows], total
+
+
+def _sqlite_search(account_id, tokens, limit, offset):
+    params = {
+        "account_id": account_id,
+        "query": " ".join(f'"{token}"*' for token in tokens),
+    }
+    total = db.session.execute(text(f"SELECT count(*) {_SQLITE_QUERY}"), params).scalar()
+    rows = db.session.execute(
+        text(
+            "SELECT motion_pictures_fts.rowid "
+            f"{_SQLITE_QUERY} "
+            "ORDER BY bm25(motion_pictures_fts), motion_pictures_fts.rowid "
+            "LIMIT :limit OFFSET :offset"
+        ),
+        {**params, "limit": limit, "offset": offset},
+    )
+    return [row[0] for row in rows], total
+
+
+def _fallback_search(account_id, tokens, limit, offset):
+    query = (
+        MotionPictures.query.join(
+            WatchList, WatchList.motion_picture_id == MotionPictures.id
+        )
+        .filter(WatchList.account_id == account_id)
+        .with_entities(MotionPictures.id)
+    )
+    for token in tokens:
+        pattern = f"%{token}%"
+        query = query.filter(
+            MotionPictures.title.ilike(pattern) | MotionPictures.overview.ilike(pattern)
+        )
+    total = query.count()
+    rows = query.order_by(MotionPictures.id).limit(limit).offset(offset)
+    return [row[0] for row in rows], total
+
+
+def search_watchlist(account_id, query, page=1, per_page=20):
+    """
+    Search the titles and overviews of the motion pictures in an account's watchlist.
+
+    Args:
+        account_id (int): The ID of the account.
+        query (str): The search query; every token is matched as a prefix.
+        page (int): The 1-based page number.
+        per_page (int): The number of results per page.
+
+    Returns:
+        tuple: The ``MotionPictureRow`` rows of the page, best match first, and the
+        total number of matches.
+    """
+    tokens = _TOKEN.findall((query or "").lower())
+    if not tokens:
+        return [], 0
+
+    search = {
+        "postgresql": _postgres_search,
+        "sqlite": _sqlite_search,
+    }.get(db.engine.dialect.name, _fallback_search)
+    ids, total = search(account_id, tokens, per_page, (page - 1) * per_page)
+    if not ids:
+        return [], total
+
+    rows = db.session.execute(
+        MotionPictureRow.select().where(MotionPictures.id.in_(ids))
+    )
+    motion_pictures = {row.id: MotionPictureRow(*row) for row in rows}
+    return [motion_pictures[id] for id in ids if id in motion_pictures], total
@@ -0,0 +1,402 @@
+"""
+Module for write-behind batching of watched-status toggles.
+
+With ``WRITE_BEHIND_ENABLED`` set, ``PUT /api/update-watchlist/<id>`` does not write to
+the database. The toggle is stored in a small SQLite queue on local disk and the request
+returns at once. Toggles are coalesced per watchlist entry, so when an entry is toggled
+several times before a flush only the last value is applied.
+
+A background thread of each worker applies the queued toggles every
+``WRITE_BEHIND_INTERVAL`` seconds: the entries of a batch are loaded with one query,
+updated together and committed in one transaction. The updates go through the ORM, so
+the account and title counters and the sync sequence stay correct. Toggles of an entry
+that no longer exists, or that belongs to another account, are dropped.
+
+Reads of an account with queued toggles wait for them to be applied first, so a client
+always reads its own writes. The queue file is shared by the workers of a machine and
+survives restarts; toggles left in it are applied by the next flush. Every worker runs a
+flush thread, so a flush claims its toggles for a lease in one write transaction and the
+other workers skip them; toggles of a flusher that died are taken again once the lease
+has expired.
+
+Classes:
+    WatchedQueue: The durable queue of watched toggles.
+    WriteBehind: Applies the queued toggles in batches in a background thread.
+
+Functions:
+    init_write_behind: Starts the write-behind thread if enabled.
+"""
+
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+from app import db
+
+logger = logging.getLogger(__name__)
+
+
+class WatchedQueue:
+    """
+    The durable queue of watched toggles, keyed by account and watchlist entry.
+
+    Attributes:
+        path (str): The path of the SQLite database file.
+    """
+
+    def __init__(self, path):
+        """
+        Initialize a new WatchedQueue instance.
+
+        Args:
+            path (str): The path of the SQLite database file.
+        """
+        self.path = path
+        self._local = threading.local()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._connect().execute(
+            "CREATE TABLE IF NOT EXISTS watched ("
+            "account_id INTEGER NOT NULL, watch_list_id INTEGER NOT NULL, "
+            "watched INTEGER NOT NULL, updated_at TEXT NOT NULL, "
+            "version INTEGER NOT NULL, claimed_until REAL NOT NULL DEFAULT 0, "
+            "PRIMARY KEY (account_id, watch_list_id))"
+        )
+        columns = {
+            row[1] for row in self._connect().execute("PRAGMA table_info(watched)")
+        }
+        if "claimed_until" not in columns:
+            # Queue files written before toggles were claimed.
+            self._connect().execute(
+                "ALTER TABLE watched ADD COLUMN claimed_until REAL NOT NULL DEFAULT 0"
+            )
+
+    def _connect(self):
+        # Connections are per thread and per process, since gunicorn may fork after
+        # the queue was created.
+        connection = getattr(self._local, "connection", None)
+        if connection is None or self._local.pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            # A toggle acknowledged to the client must survive a crash.
+            connection.execute("PRAGMA synchronous=FULL")
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+
+    def put(self, account_id, watch_list_id, watched, updated_at):
+        """
+        Queue a toggle, replacing any queued toggle of the same entry.
+
+        Args:
+            account_id (int): The ID of the account.
+            watch_list_id (int): The ID of the watchlist entry.
+            watched (bool): The new watched status.
+            updated_at (datetime): The time of the toggle.
+        """
+        self._connect().execute(
+            "INSERT INTO watched "
+            "(account_id, watch_list_id, watched, updated_at, version) "
+            "VALUES (?, ?, ?, ?, 1) "
+            "ON CONFLICT(account_id, watch_list_id) DO UPDATE SET "
+            "watched = excluded.watched, updated_at = excluded.updated_at, "
+            "version = watched.version + 1",
+            (account_id, watch_list_id, int(watched), updated_at.isoformat()),
+        )
+
+    def has_pending(self, account_id):
+        """
+        Return whether an account has queued toggles.
+
+        Args:
+            account_id (int): The ID of the account.
+
+        Returns:
+            bool: True if the account has queued toggles.
+        """
+        row = (
+            self._connect()
+            .execute(
+                "SELECT 1 FROM watched WHERE account_id = ? LIMIT 1", (account_id,)
+            )
+            .fetchone()
+        )
+        return row is not None
+
+    def take(self, limit, lease=60):
+        """
+        Claim the oldest unclaimed queued toggles without removing them.
+
+        The toggles are selected and claimed in one write transaction, so concurrent
+        flushers, in this or another process, never take the same toggles.
+
+        Args:
+            limit (int): The maximum number of toggles to return.
+            lease (float): The number of seconds after which toggles that were not
+                acknowledged can be taken again.
+
+        Returns:
+            list: ``(account_id, watch_list_id, watched, updated_at, version)`` tuples.
+        """
+        connection = self._connect()
+        now = time.time()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            toggles = connection.execute(
+                "SELECT account_id, watch_list_id, watched, updated_at, version "
+                "FROM watched WHERE claimed_until < ? ORDER BY updated_at LIMIT ?",
+                (now, limit),
+            ).fetchall()
+            connection.executemany(
+                "UPDATE watched SET claimed_until = ? "
+                "WHERE account_id = ? AND watch_list_id = ?",
+                [(now + lease, toggle[0], toggle[1]) for toggle in toggles],
+            )
+            connection.execute("COMMIT")
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+        return toggles
+
+    def ack(self, toggles):
+        """
+        Remove applied toggles from the queue.
+
+        A toggle replaced after it was taken has a newer version and is kept, so it is
+        applied by the next flush.
+
+        Args:
+            toggles (list): The tuples returned by ``take``.
+        """
+        connection = self._connect()
+        keys = [(toggle[0], toggle[1], toggle[4]) for toggle in toggles]
+        connection.execute("BEGIN")
+        try:
+            connection.executemany(
+                "DELETE FROM watched "
+                "WHERE account_id = ? AND watch_list_id = ? AND version = ?",
+                keys,
+            )
+            # Release the toggles replaced meanwhile.
+            connection.executemany(
+                "UPDATE watched SET claimed_until = 0 "
+                "WHERE account_id = ? AND watch_list_id = ?",
+                [key[:2] for key in keys],
+            )
+            connection.execute("COMMIT")
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+
+    def release(self, toggles):
+        """
+        Release claimed toggles that could not be applied, so they are taken again.
+
+        Args:
+            toggles (list): The tuples returned by ``take``.
+        """
+        self._connect().executemany(
+            "UPDATE watched SET claimed_until = 0 "
+            "WHERE account_id = ? AND watch_list_id = ?",
+            [(toggle[0], toggle[1]) for toggle in toggles],
+        )
+
+    def __len__(self):
+        return self._connect().execute("SELECT count(*) FROM watched").fetchone()[0]
+
+
+class WriteBehind:
+    """
+    Applies the queued watched toggles in batches in a background thread.
+
+    Attributes:
+        app (Flask): The Flask application.
+        queue (WatchedQueue): The durable queue of toggles.
+        interval (float): The number of seconds between flushes.
+        batch_size (int): The maximum number of toggles applied per transaction.
+        read_timeout (float): How long a read waits for its account's toggles.
+    """
+
+    def __init__(self, app):
+        """
+        Initialize a new WriteBehind instance.
+
+        Args:
+            app (Flask): The Flask application.
+        """
+        self.app = app
+        self._queue = None
+        self.interval = app.config.get("WRITE_BEHIND_INTERVAL", 0.25)
+        self.batch_size = app.config.get("WRITE_BEHIND_BATCH_SIZE", 500)
+        self.read_timeout = 5
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._flushed = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def queue(self):
+        """
+        WatchedQueue: The durable queue of toggles, opened on first use.
+        """
+        if self._queue is None:
+            self._queue = WatchedQueue(
+                self.app.config.get("WRITE_BEHIND_QUEUE_PATH")
+                or os.path.join(tempfile.gettempdir(), "watchwave-write-behind.sqlite3")
+            )
+        return self._queue
+
+    @property
+    def enabled(self):
+        """
+        bool: Whether watched toggles are queued instead of written.
+        """
+        return bool(self.app.config.get("WRITE_BEHIND_ENABLED"))
+
+    def enqueue(self, account_id, watch_list_id, watched):
+        """
+        Queue a watched toggle of an account's watchlist entry.
+
+        Args:
+            account_id (int): The ID of the account.
+            watch_list_id (int): The ID of the watchlist entry.
+            watched (bool): The new watched status.
+        """
+        self.queue.put(account_id, watch_list_id, watched, datetime.now())
+
+    def flush(self):
+        """
+        Apply one batch of queued toggles in one transaction.
+
+        Toggles claimed by a concurrent flush are skipped.
+
+        Returns:
+            int: The number of toggles taken from the queue.
+        """
+        from app.models import WatchList
+
+        with self._flush_lock:
+            toggles = self.queue.take(self.batch_size)
+            if not toggles:
+                return 0
+
+            with self.app.app_context():
+                try:
+                    entries = WatchList.query.filter(
+                        WatchList.id.in_({toggle[1] for toggle in toggles})
+                    ).all()
+                    entries = {(entry.account_id, entry.id): entry for entry in entries}
+                    for account_id, watch_list_id, watched, updated_at, _ in toggles:
+                        entry = entries.get((account_id, watch_list_id))
+                        # Toggles back to the stored value are not written at all.
+                        if entry is None or entry.watched == bool(watched):
+                            continue
+                        entry.watched = bool(watched)
+                        entry.updated_at = datetime.fromisoformat(updated_at)
+                    db.session.commit()
+                except Exception:
+                    db.session.rollback()
+                    self.queue.release(toggles)
+                    raise
+
+            self.queue.ack(toggles)
+            return len(toggles)
+
+    def flush_all(self):
+        """
+        Apply queued toggles until the queue is empty.
+
+        Returns:
+            int: The number of toggles taken from the queue.
+        """
+        total = 0
+        while True:
+            flushed = self.flush()
+            total += flushed
+            if flushed < self.batch_size:
+                return total
+
+    def ensure_applied(self, account_id):
+        """
+        Wait until the queued toggles of an account are applied.
+
+        The toggles are applied by the background thread, so the wait does not count
+        towards the query budget of the waiting request. Without a running thread they
+        are applied in the calling thread.
+
+        Args:
+            account_id (int): The ID of the account.
+        """
+        if not self.queue.has_pending(account_id):
+            return
+        if self._thread is None:
+            self.flush_all()
+            return
+
+        deadline = time.monotonic() + self.read_timeout
+        with self._flushed:
+            while self.queue.has_pending(account_id):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    logger.warning(
+                        "Queued watched toggles of account %s are not applied yet",
+                        account_id,
+                    )
+                    return
+                self._wake.set()
+                self._flushed.wait(remaining)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            try:
+                self.flush_all()
+            except Exception:
+                logger.exception("Failed to apply queued watched toggles")
+            with self._flushed:
+                self._flushed.notify_all()
+
+    def start(self):
+        """
+        Start the background flush thread.
+        """
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="write-behind", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stop the background flush thread. Queued toggles stay in the queue.
+        """
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+
+def init_write_behind(app):
+    """
+    Start the write-behind thread if the ``WRITE_BEHIND_ENABLED`` config option is set.
+
+    Args:
+        app (Flask): The Flask application.
+
+    Returns:
+        WriteBehind: The write-behind flusher, started or not.
+    """
+    write_behind = WriteBehind(app)
+    app.extensions["write_behind"] = write_behind
+    if write_behind.enabled:
+        write_behind.start()
+    return write_behind
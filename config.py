@@ -13,6 +13,135 @@ class Config:
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     SECRET_KEY = os.getenv("SECRET_KEY", "mysecretkey")
 
+    # SQL instrumentation
+    SQL_INSTRUMENTATION = os.getenv("SQL_INSTRUMENTATION", "false").lower() == "true"
+    SQL_QUERY_BUDGET = (
+        int(os.getenv("SQL_QUERY_BUDGET")) if os.getenv("SQL_QUERY_BUDGET") else None
+    )
+    SQL_BUDGET_ACTION = os.getenv("SQL_BUDGET_ACTION", "warn")
+    SQL_N_PLUS_ONE_THRESHOLD = int(os.getenv("SQL_N_PLUS_ONE_THRESHOLD", "3"))
+    SQL_SLOW_QUERY_MS = float(os.getenv("SQL_SLOW_QUERY_MS", "200"))
+
+    # Metrics
+    METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+    METRICS_MULTIPROC_DIR = os.getenv("METRICS_MULTIPROC_DIR")
+    METRICS_FLUSH_INTERVAL = float(os.getenv("METRICS_FLUSH_INTERVAL", "5"))
+    METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+
+    # Tracing
+    TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", "0"))
+    TRACE_EXPORTER = os.getenv("TRACE_EXPORTER")
+    TRACE_FILE_PATH = os.getenv("TRACE_FILE_PATH")
+    TRACE_OTLP_ENDPOINT = os.getenv(
+        "TRACE_OTLP_ENDPOINT", "http://localhost:4318/v1/traces"
+    )
+    TRACE_SERVICE_NAME = os.getenv("TRACE_SERVICE_NAME", "watchwave")
+
+    # Cache
+    CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory")
+    CACHE_PATH = os.getenv("CACHE_PATH")
+    CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "1024"))
+    CACHE_DEFAULT_TTL = float(os.getenv("CACHE_DEFAULT_TTL", "300"))
+    TMDB_POPULAR_TTL = float(os.getenv("TMDB_POPULAR_TTL", "600"))
+    TMDB_SEARCH_TTL = float(os.getenv("TMDB_SEARCH_TTL", "300"))
+    TMDB_DETAILS_TTL = float(os.getenv("TMDB_DETAILS_TTL", "3600"))
+    TMDB_DETAILS_MAX_BATCH = int(os.getenv("TMDB_DETAILS_MAX_BATCH", "50"))
+    TMDB_FANOUT_WORKERS = int(os.getenv("TMDB_FANOUT_WORKERS", "8"))
+    TMDB_PREFETCH_WORKERS = int(os.getenv("TMDB_PREFETCH_WORKERS", "2"))
+
+    # TMDB resilience
+    TMDB_CONNECT_TIMEOUT = float(os.getenv("TMDB_CONNECT_TIMEOUT", "3.05"))
+    TMDB_READ_TIMEOUT = float(os.getenv("TMDB_READ_TIMEOUT", "5"))
+    TMDB_STALE_TTL = float(os.getenv("TMDB_STALE_TTL", "86400"))
+    TMDB_BREAKER_FAILURE_RATE = float(os.getenv("TMDB_BREAKER_FAILURE_RATE", "0.5"))
+    TMDB_BREAKER_SLOW_CALL = float(os.getenv("TMDB_BREAKER_SLOW_CALL", "2"))
+    TMDB_BREAKER_WINDOW = int(os.getenv("TMDB_BREAKER_WINDOW", "20"))
+    TMDB_BREAKER_MINIMUM_CALLS = int(os.getenv("TMDB_BREAKER_MINIMUM_CALLS", "5"))
+    TMDB_BREAKER_RESET_TIMEOUT = float(os.getenv("TMDB_BREAKER_RESET_TIMEOUT", "30"))
+
+    # TMDB rate limiting, per worker
+    TMDB_RATE_LIMIT = (
+        float(os.getenv("TMDB_RATE_LIMIT")) if os.getenv("TMDB_RATE_LIMIT") else None
+    )
+    TMDB_RATE_BURST = int(os.getenv("TMDB_RATE_BURST", "10"))
+    TMDB_INTERACTIVE_MAX_WAIT = float(os.getenv("TMDB_INTERACTIVE_MAX_WAIT", "2"))
+    TMDB_BACKGROUND_MAX_WAIT = float(os.getenv("TMDB_BACKGROUND_MAX_WAIT", "30"))
+    TMDB_PREFETCH_MAX_WAIT = float(os.getenv("TMDB_PREFETCH_MAX_WAIT", "0"))
+
+    # TMDB on-disk HTTP cache
+    TMDB_HTTP_CACHE_ENABLED = (
+        os.getenv("TMDB_HTTP_CACHE_ENABLED", "false").lower() == "true"
+    )
+    TMDB_HTTP_CACHE_PATH = os.getenv("TMDB_HTTP_CACHE_PATH")
+    TMDB_HTTP_CACHE_DEFAULT_MAX_AGE = float(
+        os.getenv("TMDB_HTTP_CACHE_DEFAULT_MAX_AGE", "0")
+    )
+    TMDB_HTTP_CACHE_RETENTION = float(os.getenv("TMDB_HTTP_CACHE_RETENTION", "604800"))
+
+    # Local catalog search
+    SEARCH_LOCAL_ENABLED = os.getenv("SEARCH_LOCAL_ENABLED", "true").lower() == "true"
+    SEARCH_LOCAL_MIN_RESULTS = int(os.getenv("SEARCH_LOCAL_MIN_RESULTS", "5"))
+    SEARCH_MIN_SIMILARITY = float(os.getenv("SEARCH_MIN_SIMILARITY", "0.4"))
+    SEARCH_INDEX_SYNC_INTERVAL = float(os.getenv("SEARCH_INDEX_SYNC_INTERVAL", "5"))
+
+    # Recommendations
+    RECOMMENDATIONS_TOP_K = int(os.getenv("RECOMMENDATIONS_TOP_K", "20"))
+    RECOMMENDATIONS_METRIC = os.getenv("RECOMMENDATIONS_METRIC", "cosine")
+    RECOMMENDATIONS_MIN_ACCOUNTS = int(os.getenv("RECOMMENDATIONS_MIN_ACCOUNTS", "2"))
+    RECOMMENDATIONS_CACHE_TTL = float(os.getenv("RECOMMENDATIONS_CACHE_TTL", "3600"))
+
+    # Poster cache
+    POSTER_CACHE_DIR = os.getenv("POSTER_CACHE_DIR")
+    POSTER_CACHE_MAX_BYTES = int(os.getenv("POSTER_CACHE_MAX_BYTES", "536870912"))
+    POSTER_ORIGIN_URL = os.getenv(
+        "POSTER_ORIGIN_URL", "https://image.tmdb.org/t/p/original"
+    )
+    POSTER_WIDTHS = [
+        int(width)
+        for width in os.getenv("POSTER_WIDTHS", "92,154,185,342,500,780").split(",")
+    ]
+    POSTER_MAX_AGE = int(os.getenv("POSTER_MAX_AGE", "2592000"))
+
+    # Watchlist read cache, off by default with the per-worker memory cache backend
+    WATCHLIST_CACHE_MAX_BYTES = int(
+        os.getenv(
+            "WATCHLIST_CACHE_MAX_BYTES",
+            "0" if CACHE_BACKEND == "memory" else "67108864",
+        )
+    )
+    WATCHLIST_CACHE_TTL = float(os.getenv("WATCHLIST_CACHE_TTL", "300"))
+
+    # Idempotent retries of watchlist writes
+    IDEMPOTENCY_TTL = float(os.getenv("IDEMPOTENCY_TTL", "86400"))
+    IDEMPOTENCY_STORE_PATH = os.getenv("IDEMPOTENCY_STORE_PATH")
+
+    # Batch requests
+    BATCH_MAX_REQUESTS = int(os.getenv("BATCH_MAX_REQUESTS", "20"))
+
+    # Leaderboard
+    LEADERBOARD_SIZE = int(os.getenv("LEADERBOARD_SIZE", "100"))
+    LEADERBOARD_CACHE_TTL = float(os.getenv("LEADERBOARD_CACHE_TTL", "60"))
+
+    # Watchlist delta sync
+    SYNC_TOMBSTONE_RETENTION = float(os.getenv("SYNC_TOMBSTONE_RETENTION", "2592000"))
+
+    # Write-behind watched toggles
+    WRITE_BEHIND_ENABLED = os.getenv("WRITE_BEHIND_ENABLED", "false").lower() == "true"
+    WRITE_BEHIND_INTERVAL = float(os.getenv("WRITE_BEHIND_INTERVAL", "0.25"))
+    WRITE_BEHIND_BATCH_SIZE = int(os.getenv("WRITE_BEHIND_BATCH_SIZE", "500"))
+    WRITE_BEHIND_QUEUE_PATH = os.getenv("WRITE_BEHIND_QUEUE_PATH")
+
+    # Motion picture metadata refresh
+    METADATA_REFRESH_MAX_AGE = float(os.getenv("METADATA_REFRESH_MAX_AGE", "604800"))
+    METADATA_REFRESH_CHUNK_SIZE = int(os.getenv("METADATA_REFRESH_CHUNK_SIZE", "100"))
+    METADATA_REFRESH_WORKERS = int(os.getenv("METADATA_REFRESH_WORKERS", "4"))
+
+    # Cache pre-warming
+    PREWARM_ENABLED = os.getenv("PREWARM_ENABLED", "false").lower() == "true"
+    PREWARM_INTERVAL = float(os.getenv("PREWARM_INTERVAL", "240"))
+    PREWARM_JITTER = float(os.getenv("PREWARM_JITTER", "0.1"))
+    PREWARM_SEARCH_LIMIT = int(os.getenv("PREWARM_SEARCH_LIMIT", "20"))
+
 
 class DevelopmentConfig(Config):
     DEBUG = True
@@ -22,5 +151,7 @@ class DevelopmentConfig(Config):
 
 class TestingConfig(Config):
     TESTING = True
+    SQL_INSTRUMENTATION = True
+    SQL_BUDGET_ACTION = "raise"
     SQLALCHEMY_DATABASE_URI = os.getenv("TEST_DATABASE_URL")
     SQLALCHEMY_TRACK_MODIFICATIONS = False
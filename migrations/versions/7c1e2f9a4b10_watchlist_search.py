@@ -0,0 +1,32 @@
+"""add full-text search vector to motion_pictures
+
+Revision ID: 7c1e2f9a4b10
+Revises: 3615c2aeca7d
+Create Date: 2026-10-19 10:12:41.118305
+
+"""
+
+from alembic import op
+
+from app.models.motion_pictures import POSTGRES_SEARCH_DDL
+
+
+# revision identifiers, used by Alembic.
+revision = "7c1e2f9a4b10"
+down_revision = "3615c2aeca7d"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    for statement in POSTGRES_SEARCH_DDL:
+        op.execute(statement)
+
+
+def downgrade():
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.execute("DROP INDEX IF EXISTS ix_motion_pictures_search_vector")
+    op.execute("ALTER TABLE motion_pictures DROP COLUMN IF EXISTS search_vector")
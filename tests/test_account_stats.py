@@ -0,0 +1,143 @@
+import unittest
+from app import create_app, db
+from app.models import User, Account, AccountStats
+from app.services.account_stats import rebuild_account_stats
+from config import TestingConfig
+from sqlalchemy.sql import func
+from werkzeug.security import generate_password_hash
+
+
+class AccountStatsTestCase(unittest.TestCase):
+    """
+    This class represents the test cases for the watchlist statistics.
+    """
+
+    def setUp(self):
+        """
+        This method sets up the test client and the test database.
+        """
+        self.app = create_app()
+        self.app.config.from_object(TestingConfig)
+        self.client = self.app.test_client
+
+        with self.app.app_context():
+            db.create_all()
+            user = User(
+                username="testuser",
+                email="test@example.com",
+                password_hash=generate_password_hash("testpassword"),
+                created_at=func.now(),
+                updated_at=func.now(),
+            )
+            db.session.add(user)
+            db.session.commit()
+            account = Account(
+                email=user.email,
+                user_id=user.id,
+                created_at=func.now(),
+                updated_at=func.now(),
+            )
+            db.session.add(account)
+            db.session.commit()
+            self.account_id = account.id
+
+        response = self.client().post(
+            "/api/login",
+            json={"email": "test@example.com", "password": "testpassword"},
+        )
+        self.headers = {"Authorization": f"Bearer {response.get_json()['token']}"}
+
+    def tearDown(self):
+        """
+        This method removes the test database and the test client.
+        """
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def add(self, external_id, type):
+        """
+        This method adds a motion picture to the watchlist.
+        """
+        response = self.client().post(
+            "/api/add-to-watchlist",
+            json={
+                "title": f"Title {external_id}",
+                "external_id": external_id,
+                "poster_path": "/poster.jpg",
+                "type": type,
+                "overview": "",
+            },
+            headers=self.headers,
+        )
+        self.assertEqual(response.status_code, 201)
+        return response.get_json()
+
+    def stats(self):
+        """
+        This method returns the watchlist statistics.
+        """
+        response = self.client().get("/api/watchlist/stats", headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        return response.get_json()
+
+    def test_empty_watchlist(self):
+        """
+        This method tests the statistics of an account without a watchlist.
+        """
+        self.assertEqual(
+            self.stats(),
+            {"total": 0, "watched": 0, "unwatched": 0, "movies": 0, "series": 0},
+        )
+
+    def test_stats_follow_watchlist_writes(self):
+        """
+        This method tests that adds, watched toggles and removals update the stats.
+        """
+        movie = self.add(1, "movie")
+        self.add(2, "movie")
+        series = self.add(3, "tv")
+
+        self.client().put(
+            f"/api/update-watchlist/{movie['id']}",
+            json={"watched": True},
+            headers=self.headers,
+        )
+        self.assertEqual(
+            self.stats(),
+            {"total": 3, "watched": 1, "unwatched": 2, "movies": 2, "series": 1},
+        )
+
+        self.client().delete(
+            f"/api/remove-from-watchlist/{movie['motion_picture']['id']}",
+            headers=self.headers,
+        )
+        self.client().delete(
+            f"/api/remove-from-watchlist/{series['motion_picture']['id']}",
+            headers=self.headers,
+        )
+        self.assertEqual(
+            self.stats(),
+            {"total": 1, "watched": 0, "unwatched": 1, "movies": 1, "series": 0},
+        )
+
+    def test_rebuild_repairs_counters(self):
+        """
+        This method tests that the repair job recomputes drifted counters.
+        """
+        self.add(1, "movie")
+        self.add(2, "tv")
+        with self.app.app_context():
+            stats = db.session.get(AccountStats, self.account_id)
+            stats.total, stats.series = 7, 0
+            db.session.commit()
+            self.assertEqual(rebuild_account_stats(self.account_id), 1)
+
+        self.assertEqual(
+            self.stats(),
+            {"total": 2, "watched": 0, "unwatched": 2, "movies": 1, "series": 1},
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
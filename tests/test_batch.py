@@ -0,0 +1,196 @@
+import time
+import unittest
+from unittest import mock
+from app import create_app, db
+from app.cache import cache
+from app.instrumentation import track_queries
+from app.models import User, Account
+from app.services import tmdb_client
+from config import TestingConfig
+from flask import Response
+from sqlalchemy.sql import func
+from werkzeug.security import generate_password_hash
+
+
+class BatchTestCase(unittest.TestCase):
+    """
+    This class represents the test cases for the batch route.
+    """
+
+    def setUp(self):
+        """
+        This method sets up the test client, the test database and a watchlist.
+        """
+        self.app = create_app()
+        self.app.config.from_object(TestingConfig)
+        self.client = self.app.test_client
+        cache.clear()
+
+        with self.app.app_context():
+            db.create_all()
+            user = User(
+                username="testuser",
+                email="test@example.com",
+                password_hash=generate_password_hash("testpassword"),
+                created_at=func.now(),
+                updated_at=func.now(),
+            )
+            db.session.add(user)
+            db.session.commit()
+            account = Account(
+                email=user.email,
+                user_id=user.id,
+                created_at=func.now(),
+                updated_at=func.now(),
+            )
+            db.session.add(account)
+            db.session.commit()
+
+        response = self.client().post(
+            "/api/login",
+            json={"email": "test@example.com", "password": "testpassword"},
+        )
+        self.headers = {"Authorization": f"Bearer {response.get_json()['token']}"}
+
+        response = self.client().post(
+            "/api/add-to-watchlist",
+            json={
+                "title": "Title",
+                "external_id": 1,
+                "poster_path": "/poster.jpg",
+                "type": "movie",
+                "overview": "",
+            },
+            headers=self.headers,
+        )
+        self.entry = response.get_json()
+
+    def tearDown(self):
+        """
+        This method removes the test database and the test client.
+        """
+        cache.clear()
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def batch(self, requests, headers=None):
+        """
+        This method sends a batch and returns its response.
+        """
+        return self.client().post(
+            "/api/batch",
+            json={"requests": requests},
+            headers=self.headers if headers is None else headers,
+        )
+
+    def test_app_start_batch(self):
+        """
+        This method tests that home lists run concurrently and watchlist reads share
+        the batch's authentication.
+        """
+
+        def upstream(url, headers=None, params=None, timeout=None):
+            time.sleep(0.2)
+            response = mock.Mock(status_code=200)
+            response.json.return_value = {"page": 1, "results": [url]}
+            return response
+
+        with mock.patch.object(tmdb_client.session, "get", side_effect=upstream):
+            start = time.perf_counter()
+            response = self.batch(
+                [
+                    {"id": "movies", "path": "/api/home/latest-movies"},
+                    {"id": "series", "path": "/api/home/latest-series"},
+                    {"id": "watchlist", "path": "/api/watchlist"},
+                    {"id": "stats", "path": "/api/watchlist/stats"},
+                ]
+            )
+            elapsed = time.perf_counter() - start
+
+        self.assertEqual(response.status_code, 200)
+        responses = response.get_json()["responses"]
+        self.assertEqual(
+            [(item["id"], item["status"]) for item in responses],
+            [("movies", 200), ("series", 200), ("watchlist", 200), ("stats", 200)],
+        )
+        self.assertIn("movie/popular", responses[0]["body"]["results"][0])
+        self.assertEqual(responses[2]["body"][0]["title"], "Title")
+        self.assertEqual(responses[3]["body"]["total"], 1)
+        self.assertLess(elapsed, 0.38)
+
+    def test_batch_counts_every_statement(self):
+        """
+        This method tests that the batch's query count covers every sub-request.
+        """
+        for size in (1, 2, 4):
+            with track_queries() as stats:
+                response = self.batch([{"path": "/api/watchlist/sync"}] * size)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(
+                int(response.headers["X-DB-Query-Count"]), stats.count, size
+            )
+
+    def test_sub_request_errors_and_writes(self):
+        """
+        This method tests that each sub-request keeps its own status and that writes
+        are visible to later sub-requests.
+        """
+        response = self.batch(
+            [
+                {
+                    "method": "PUT",
+                    "path": f"/api/update-watchlist/{self.entry['id']}",
+                    "body": {"watched": True},
+                },
+                {"method": "PUT", "path": "/api/update-watchlist/999", "body": {}},
+                {"path": "/api/watchlist/stats"},
+                {"path": "/api/leaderboard?window=1y"},
+            ]
+        )
+        responses = response.get_json()["responses"]
+        self.assertEqual(
+            [(item["id"], item["status"]) for item in responses],
+            [(0, 200), (1, 500), (2, 200), (3, 400)],
+        )
+        self.assertTrue(responses[0]["body"]["watched"])
+        self.assertEqual(responses[2]["body"]["watched"], 1)
+
+    def test_invalid_batches(self):
+        """
+        This method tests that malformed batches are rejected as a whole.
+        """
+        self.assertEqual(self.batch([{"path": "/api/unknown"}]).status_code, 400)
+        self.assertEqual(self.batch([{"path": "/api/batch"}]).status_code, 400)
+        self.assertEqual(
+            self.batch([{"path": "/api/watchlist"}], headers={}).status_code, 401
+        )
+        response = self.client().post(
+            "/api/batch", json={"requests": []}, headers=self.headers
+        )
+        self.assertEqual(response.status_code, 400)
+        for path in ("/api/posters/1", "/metrics"):
+            self.assertEqual(self.batch([{"path": path}]).status_code, 400)
+
+    def test_binary_sub_response(self):
+        """
+        This method tests that a sub-response that is not JSON or text fails on its
+        own instead of failing the batch.
+        """
+        endpoint = "main.motion_pictures.get_watchlist_stats"
+
+        def binary(**kwargs):
+            return Response(b"\xff\xd8", mimetype="image/jpeg")
+
+        with mock.patch.dict(self.app.view_functions, {endpoint: binary}):
+            response = self.batch(
+                [{"path": "/api/watchlist/stats"}, {"path": "/api/watchlist"}]
+            )
+
+        self.assertEqual(response.status_code, 200)
+        responses = response.get_json()["responses"]
+        self.assertEqual([item["status"] for item in responses], [500, 200])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,227 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+from app import create_app, db
+from app.cache import Cache, cache
+from app.cache.backends import InProcessCache, SQLiteCache
+from app.models import User, Account
+from app.services import tmdb_client
+from werkzeug.security import generate_password_hash
+from config import TestingConfig
+from sqlalchemy.sql import func
+
+
+class CacheBackendsTestCase(unittest.TestCase):
+    """
+    This class represents the test cases for the cache backends.
+    """
+
+    def setUp(self):
+        """
+        This method creates a temporary directory for the SQLite cache.
+        """
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "cache.sqlite3")
+
+    def tearDown(self):
+        """
+        This method removes the temporary directory.
+        """
+        self.directory.cleanup()
+
+    def test_in_process_lru_eviction(self):
+        """
+        This method tests that the least recently used key is evicted.
+        """
+        backend = InProcessCache(max_entries=2)
+        backend.set("a", 1)
+        backend.set("b", 2)
+        backend.get("a")
+        backend.set("c", 3)
+
+        self.assertEqual(backend.get("a"), 1)
+        self.assertIsNone(backend.get("b"))
+        self.assertEqual(backend.get("c"), 3)
+
+    def test_expiry(self):
+        """
+        This method tests that expired values are not returned.
+        """
+        for backend in (InProcessCache(), SQLiteCache(self.path)):
+            backend.set("key", {"value": 1}, ttl=0.01)
+            time.sleep(0.02)
+            self.assertIsNone(backend.get("key"))
+
+    def test_sqlite_cache_is_shared(self):
+        """
+        This method tests that two SQLite caches on one file see each other's values.
+        """
+        first = SQLiteCache(self.path)
+        second = SQLiteCache(self.path)
+        first.set("tmdb:movie/popular", {"results": [1, 2]}, ttl=60)
+
+        self.assertEqual(second.get("tmdb:movie/popular"), {"results": [1, 2]})
+        self.assertFalse(second.add("tmdb:movie/popular", {}, ttl=60))
+        self.assertTrue(second.add("other", {}, ttl=60))
+
+    def test_get_or_set_runs_creator_once(self):
+        """
+        This method tests that concurrent misses share a single computation.
+        """
+        shared = Cache(SQLiteCache(self.path))
+        calls = []
+
+        def creator():
+            calls.append(1)
+            time.sleep(0.05)
+            return {"results": []}
+
+        threads = [
+            threading.Thread(target=shared.get_or_set, args=("key", creator, 60))
+            for _ in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(calls), 1)
+
+
+class CachedHomeRoutesTestCase(unittest.TestCase):
+    """
+    This class represents the test cases for the cached home routes.
+    """
+
+    def setUp(self):
+        """
+        This method sets up the test client, the test database and a logged in user.
+        """
+        self.app = create_app()
+        self.app.config.from_object(TestingConfig)
+        self.client = self.app.test_client
+        cache.clear()
+
+        with self.app.app_context():
+            db.create_all()
+            user = User(
+                username="testuser",
+                email="testuser@example.com",
+                password_hash=generate_password_hash("testpassword"),
+                created_at=func.now(),
+                updated_at=func.now(),
+            )
+            db.session.add(user)
+            db.session.commit()
+            db.session.add(
+                Account(
+                    email=user.email,
+                    user_id=user.id,
+                    created_at=func.now(),
+                    updated_at=func.now(),
+                )
+            )
+            db.session.commit()
+
+        response = self.client().post(
+            "/api/login",
+            json={"email": "testuser@example.com", "password": "testpassword"},
+        )
+        self.headers = {"Authorization": f"Bearer {response.get_json()['token']}"}
+
+    def tearDown(self):
+        """
+        This method removes the test database and the test client.
+        """
+        cache.clear()
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def test_latest_movies_is_cached(self):
+        """
+        This method tests that repeated requests make a single upstream call.
+        """
+        upstream = mock.Mock(status_code=200)
+        upstream.json.return_value = {"page": 1, "results": []}
+        with mock.patch.object(
+            tmdb_client.session, "get", return_value=upstream
+        ) as get:
+            first = self.client().get("/api/home/latest-movies", headers=self.headers)
+            second = self.client().get("/api/home/latest-movies", headers=self.headers)
+
+        self.assertEqual(first.get_json(), second.get_json())
+        self.assertEqual(get.call_count, 1)
+
+    def test_upstream_errors_are_not_cached(self):
+        """
+        This method tests that TMDB errors are passed through and not cached.
+        """
+        upstream = mock.Mock(status_code=401)
+        upstream.json.return_value = {"status_message": "Invalid API key"}
+        with mock.patch.object(
+            tmdb_client.session, "get", return_value=upstream
+        ) as get:
+            first = self.client().get("/api/home/latest-series", headers=self.headers)
+            self.client().get("/api/home/latest-series", headers=self.headers)
+
+        self.assertEqual(first.status_code, 401)
+        self.assertEqual(get.call_count, 2)
+
+    def test_details_batch_is_concurrent_and_cached(self):
+        """
+        This method tests that batched details are fetched concurrently and cached.
+        """
+
+        def upstream(url, headers=None, params=None, timeout=None):
+            time.sleep(0.2)
+            path = url.split("/3/", 1)[-1]
+            response = mock.Mock(status_code=404 if path == "tv/404" else 200)
+            response.json.return_value = {"id": path}
+            return response
+
+        items = [
+            {"external_id": 603, "type": "movie"},
+            {"external_id": 1399, "type": "tv"},
+            {"external_id": 603, "type": "movie"},
+            {"external_id": 404, "type": "series"},
+        ]
+        with mock.patch.object(tmdb_client.session, "get", side_effect=upstream) as get:
+            start = time.perf_counter()
+            first = self.client().post(
+                "/api/home/details", json=items, headers=self.headers
+            )
+            elapsed = time.perf_counter() - start
+            second = self.client().post(
+                "/api/home/details", json=items[:3], headers=self.headers
+            )
+
+        self.assertLess(elapsed, 0.5)
+        self.assertEqual(
+            [(result["status"], result.get("data")) for result in first.get_json()],
+            [
+                (200, {"id": "movie/603"}),
+                (200, {"id": "tv/1399"}),
+                (200, {"id": "movie/603"}),
+                (404, None),
+            ],
+        )
+        self.assertEqual(second.get_json(), first.get_json()[:3])
+        self.assertEqual(get.call_count, 3)
+
+    def test_details_batch_is_validated(self):
+        """
+        This method tests that malformed or oversized batches are rejected.
+        """
+        for body in ({"external_id": 1}, [{"type": "movie"}], [{}] * 51):
+            response = self.client().post(
+                "/api/home/details", json=body, headers=self.headers
+            )
+            self.assertEqual(response.status_code, 400)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,145 @@
+import time
+import unittest
+from unittest import mock
+import requests
+from app import create_app
+from app.cache import cache
+from app.services import (
+    CircuitBreaker,
+    CircuitOpenError,
+    TMDBClient,
+    TMDBUnavailable,
+)
+from app.services.rate_limiter import RateLimiter
+from config import TestingConfig
+
+
+class CircuitBreakerTestCase(unittest.TestCase):
+    """
+    This class represents the test cases for the circuit breaker.
+    """
+
+    def raise_connection_error(self):
+        """
+        This method simulates a failing upstream call.
+        """
+        raise requests.ConnectionError()
+
+    def test_trips_on_failure_rate_and_recovers(self):
+        """
+        This method tests the closed, open, half-open and closed transitions.
+        """
+        breaker = CircuitBreaker(
+            "test", window_size=4, minimum_calls=4, reset_timeout=0.05
+        )
+        breaker.call(lambda: "ok")
+        breaker.call(lambda: "ok")
+        for _ in range(2):
+            with self.assertRaises(requests.ConnectionError):
+                breaker.call(self.raise_connection_error)
+
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+        with self.assertRaises(CircuitOpenError):
+            breaker.call(lambda: "ok")
+
+        time.sleep(0.06)
+        self.assertEqual(breaker.call(lambda: "probe"), "probe")
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+
+    def test_failed_probe_reopens(self):
+        """
+        This method tests that a failed half-open probe opens the circuit again.
+        """
+        breaker = CircuitBreaker("test", minimum_calls=1, reset_timeout=0.01)
+        with self.assertRaises(requests.ConnectionError):
+            breaker.call(self.raise_connection_error)
+        time.sleep(0.02)
+        with self.assertRaises(requests.ConnectionError):
+            breaker.call(self.raise_connection_error)
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+
+    def test_slow_calls_count_as_failures(self):
+        """
+        This method tests that calls over the latency threshold trip the circuit.
+        """
+        breaker = CircuitBreaker("test", minimum_calls=1, slow_call_threshold=0.01)
+        breaker.call(lambda: time.sleep(0.02))
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+
+    def test_open_circuit_does_not_wait_for_rate_limit(self):
+        """
+        This method tests that a call fails fast while the circuit is open instead of
+        first waiting for a rate limit token.
+        """
+        client = TMDBClient(access_token="token")
+        client.breaker = CircuitBreaker("test", minimum_calls=1, reset_timeout=60)
+        client.limiter = RateLimiter(
+            "test", rate=1, burst=1, max_wait={RateLimiter.INTERACTIVE: 5}
+        )
+        with mock.patch.object(
+            client.session, "get", side_effect=requests.ConnectionError()
+        ):
+            with self.assertRaises(requests.ConnectionError):
+                client.get("movie/popular")
+
+        start = time.monotonic()
+        with self.assertRaises(CircuitOpenError):
+            client.get("movie/popular")
+        self.assertLess(time.monotonic() - start, 0.5)
+        self.assertEqual(client.limiter.queue_depth(), 0)
+
+
+class StaleFallbackTestCase(unittest.TestCase):
+    """
+    This class represents the test cases for serving stale TMDB responses.
+    """
+
+    def setUp(self):
+        """
+        This method sets up the app, an empty cache and a TMDB client.
+        """
+        self.app = create_app()
+        self.app.config.from_object(TestingConfig)
+        self.client = TMDBClient(access_token="token")
+        self.client.init_app(self.app)
+        cache.clear()
+
+    def tearDown(self):
+        """
+        This method clears the cache.
+        """
+        cache.clear()
+
+    def test_serves_stale_payload_when_upstream_fails(self):
+        """
+        This method tests that the last good response is served, flagged as stale.
+        """
+        upstream = mock.Mock(status_code=200)
+        upstream.json.return_value = {"page": 1, "results": [{"id": 1}]}
+        with self.app.app_context():
+            with mock.patch.object(self.client.session, "get", return_value=upstream):
+                self.client.popular_movies()
+            cache.delete(TMDBClient.cache_key("movie/popular"))
+
+            with mock.patch.object(
+                self.client.session, "get", side_effect=requests.Timeout()
+            ):
+                payload = self.client.popular_movies()
+
+        self.assertTrue(payload["stale"])
+        self.assertEqual(payload["results"], [{"id": 1}])
+
+    def test_unavailable_without_cached_payload(self):
+        """
+        This method tests that a failure with nothing cached raises TMDBUnavailable.
+        """
+        with self.app.app_context():
+            with mock.patch.object(
+                self.client.session, "get", side_effect=requests.Timeout()
+            ):
+                with self.assertRaises(TMDBUnavailable):
+                    self.client.popular_series()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+from requests.structures import CaseInsensitiveDict
+from app.services import TMDBClient
+from app.services.http_cache import HTTPCache
+
+
+def make_response(status_code, body=None, headers=None):
+    """
+    Build a mocked TMDB response.
+    """
+    response = mock.Mock(status_code=status_code)
+    response.json.return_value = body
+    response.headers = CaseInsensitiveDict(headers or {})
+    return response
+
+
+class HTTPCacheTestCase(unittest.TestCase):
+    """
+    This class represents the test cases for the on-disk TMDB HTTP cache.
+    """
+
+    def setUp(self):
+        """
+        This method creates a TMDB client with an HTTP cache in a temporary directory.
+        """
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "http.sqlite3")
+        self.client = self.make_client()
+
+    def tearDown(self):
+        """
+        This method removes the temporary directory.
+        """
+        self.directory.cleanup()
+
+    def make_client(self):
+        """
+        This method creates a TMDB client using the shared HTTP cache file.
+        """
+        client = TMDBClient(access_token="token")
+        client.http_cache = HTTPCache(self.path)
+        return client
+
+    def test_parse_cache_control(self):
+        """
+        This method tests the parsing of Cache-Control directives.
+        """
+        self.assertEqual(
+            HTTPCache.parse_cache_control('public, max-age="60", no-cache'),
+            {"public": None, "max-age": "60", "no-cache": None},
+        )
+
+    def test_revalidates_with_etag(self):
+        """
+        This method tests that a stale entry is revalidated with If-None-Match.
+        """
+        first = make_response(200, {"results": [1]}, {"ETag": '"v1"'})
+        not_modified = make_response(304, headers={"Cache-Control": "max-age=0"})
+        with mock.patch.object(
+            self.client.session, "get", side_effect=[first, not_modified]
+        ) as get:
+            self.client.get("movie/popular")
+            payload = self.client.get("movie/popular")
+
+        self.assertEqual(payload, {"results": [1]})
+        self.assertEqual(get.call_args.kwargs["headers"]["If-None-Match"], '"v1"')
+
+    def test_fresh_entry_survives_restart(self):
+        """
+        This method tests that a fresh entry is served without a request, even by a new
+        client on the same cache file.
+        """
+        first = make_response(200, {"results": [1]}, {"Cache-Control": "max-age=300"})
+        with mock.patch.object(self.client.session, "get", return_value=first):
+            self.client.get("tv/popular")
+
+        restarted = self.make_client()
+        with mock.patch.object(restarted.session, "get") as get:
+            payload = restarted.get("tv/popular")
+
+        self.assertEqual(payload, {"results": [1]})
+        get.assert_not_called()
+
+    def test_no_store_is_not_cached(self):
+        """
+        This method tests that responses with no-store are not written to disk.
+        """
+        response = make_response(200, {"results": []}, {"Cache-Control": "no-store"})
+        with mock.patch.object(self.client.session, "get", return_value=response):
+            self.client.get("search/multi", {"query": "dune"})
+
+        self.assertIsNone(
+            self.client.http_cache.lookup(
+                f"{self.client.base_url}/search/multi", {"query": "dune"}
+            )
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,167 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+from app import create_app, db
+from app.cache import cache, init_idempotency_store
+from app.instrumentation import track_queries
+from app.models import User, Account, MotionPictures, WatchList
+from config import TestingConfig
+from sqlalchemy.sql import func
+from werkzeug.security import generate_password_hash
+
+
+class IdempotencyTestCase(unittest.TestCase):
+    """
+    This class represents the test cases for idempotent watchlist writes.
+    """
+
+    def setUp(self):
+        """
+        This method sets up the test client, the test database, a logged in user and
+        an idempotency store in a temporary directory.
+        """
+        self.app = create_app()
+        self.app.config.from_object(TestingConfig)
+        self.client = self.app.test_client
+        cache.clear()
+        self.directory = tempfile.mkdtemp()
+        self.previous = self.app.extensions["idempotency_store"]
+        self.app.config["IDEMPOTENCY_STORE_PATH"] = os.path.join(
+            self.directory, "idempotency.sqlite3"
+        )
+        self.store = init_idempotency_store(self.app)
+
+        with self.app.app_context():
+            db.create_all()
+            user = User(
+                username="testuser",
+                email="test@example.com",
+                password_hash=generate_password_hash("testpassword"),
+                created_at=func.now(),
+                updated_at=func.now(),
+            )
+            db.session.add(user)
+            db.session.commit()
+            account = Account(
+                email=user.email,
+                user_id=user.id,
+                created_at=func.now(),
+                updated_at=func.now(),
+            )
+            db.session.add(account)
+            db.session.commit()
+
+        response = self.client().post(
+            "/api/login",
+            json={"email": "test@example.com", "password": "testpassword"},
+        )
+        self.headers = {"Authorization": f"Bearer {response.get_json()['token']}"}
+        self.item = {
+            "title": "Title",
+            "external_id": 1,
+            "poster_path": "/poster.jpg",
+            "type": "movie",
+            "overview": "",
+        }
+
+    def tearDown(self):
+        """
+        This method removes the test database, the test client and the idempotency
+        store.
+        """
+        cache.clear()
+        self.app.extensions["idempotency_store"] = self.previous
+        self.app.config["IDEMPOTENCY_STORE_PATH"] = None
+        shutil.rmtree(self.directory)
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def add(self, key, item=None):
+        """
+        This method adds a motion picture with an idempotency key.
+        """
+        return self.client().post(
+            "/api/add-to-watchlist",
+            json=item or self.item,
+            headers={**self.headers, "Idempotency-Key": key},
+        )
+
+    def test_retried_add_is_replayed(self):
+        """
+        This method tests that a retried add returns the first response and only
+        runs the authentication query, even once the application cache was cleared.
+        """
+        first = self.add("retry-1")
+        cache.clear()
+        with track_queries() as stats:
+            second = self.add("retry-1")
+
+        self.assertEqual(first.status_code, 201)
+        self.assertEqual(second.status_code, 201)
+        self.assertEqual(second.get_json(), first.get_json())
+        self.assertEqual(second.headers["Idempotent-Replayed"], "true")
+        self.assertEqual(stats.count, 1)
+        with self.app.app_context():
+            self.assertEqual(MotionPictures.query.count(), 1)
+            self.assertEqual(WatchList.query.count(), 1)
+
+    def test_key_reuse_and_errors(self):
+        """
+        This method tests that a key reused for another request is rejected, that a
+        duplicate add conflicts and that server errors are not stored.
+        """
+        self.add("key")
+        other = self.add("key", {**self.item, "external_id": 2})
+        self.assertEqual(other.status_code, 422)
+
+        # Adding a title twice is a conflict; server errors are not stored.
+        self.assertEqual(self.add("").status_code, 409)
+        item = {**self.item, "external_id": 3}
+        with mock.patch(
+            "app.routes.motion_pictures.watchlist_cache.invalidate",
+            side_effect=RuntimeError("cache down"),
+        ):
+            failed = self.add("failed", item)
+        self.assertEqual(failed.status_code, 500)
+        self.assertIsNone(self.store.backend.get("idempotency:1:failed"))
+
+    def test_expired_claim_is_taken_again(self):
+        """
+        This method tests that a request losing the race for its key to a claim that
+        expires before it is read claims the key itself instead of failing with 422.
+        """
+        add = self.store.backend.add
+        calls = []
+
+        def lose_first_race(*args, **kwargs):
+            calls.append(args[0])
+            return len(calls) > 1 and add(*args, **kwargs)
+
+        with mock.patch.object(self.store.backend, "add", side_effect=lose_first_race):
+            response = self.add("expired")
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(self.store.backend.get("idempotency:1:expired")["status"], 201)
+
+    def test_retried_remove_is_replayed(self):
+        """
+        This method tests that a retried removal returns the first response instead
+        of a 404.
+        """
+        entry = self.add("add").get_json()
+        path = f"/api/remove-from-watchlist/{entry['motion_picture']['id']}"
+        headers = {**self.headers, "Idempotency-Key": "remove"}
+
+        first = self.client().delete(path, headers=headers)
+        second = self.client().delete(path, headers=headers)
+        self.assertEqual((first.status_code, second.status_code), (200, 200))
+        third = self.client().delete(path, headers=self.headers)
+        self.assertEqual(third.status_code, 404)
+
+
+if __name__ == "__main__":
+    unittest.main()
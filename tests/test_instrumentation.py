@@ -0,0 +1,119 @@
+import unittest
+from app import create_app, db
+from app.models import User, Account
+from app.instrumentation import track_queries, QueryBudgetExceeded
+from app.instrumentation.sql import fingerprint
+from werkzeug.security import generate_password_hash
+from config import TestingConfig
+from sqlalchemy.sql import func
+
+
+class SQLInstrumentationTestCase(unittest.TestCase):
+    """
+    This class represents the test cases for the SQL instrumentation.
+    """
+
+    def setUp(self):
+        """
+        This method sets up the test client and the test database.
+        """
+        self.app = create_app()
+        self.app.config.from_object(TestingConfig)
+        self.client = self.app.test_client
+
+        with self.app.app_context():
+            db.create_all()
+
+    def tearDown(self):
+        """
+        This method removes the test database and the test client.
+        """
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def create_user(self):
+        """
+        This method creates a user with an account.
+        """
+        with self.app.app_context():
+            user = User(
+                username="testuser",
+                email="testuser@example.com",
+                password_hash=generate_password_hash("testpassword"),
+                created_at=func.now(),
+                updated_at=func.now(),
+            )
+            db.session.add(user)
+            db.session.commit()
+
+            account = Account(
+                email=user.email,
+                user_id=user.id,
+                created_at=func.now(),
+                updated_at=func.now(),
+            )
+            db.session.add(account)
+            db.session.commit()
+
+    def test_fingerprint_normalizes_literals(self):
+        """
+        This method tests that statements differing only in literals share a fingerprint.
+        """
+        first = fingerprint("SELECT * FROM users WHERE id = 1 AND email = 'a@b.c'")
+        second = fingerprint("SELECT *  FROM users WHERE id = 42 AND email = 'x@y.z'")
+        self.assertEqual(first, second)
+        self.assertEqual(
+            fingerprint("SELECT * FROM t WHERE id IN (?, ?, ?)"),
+            fingerprint("SELECT * FROM t WHERE id IN (?)"),
+        )
+
+    def test_track_queries_counts_statements(self):
+        """
+        This method tests that track_queries records repeated statements.
+        """
+        self.create_user()
+        with self.app.app_context():
+            with track_queries() as stats:
+                for _ in range(3):
+                    db.session.expire_all()
+                    User.query.filter_by(email="testuser@example.com").first()
+
+        self.assertEqual(stats.count, 3)
+        self.assertEqual(len(stats.repeated(3)), 1)
+        self.assertGreaterEqual(stats.total_time, 0)
+
+    def test_login_query_budget(self):
+        """
+        This method tests that the login route stays within its query budget.
+        """
+        self.create_user()
+        with track_queries() as stats:
+            response = self.client().post(
+                "/api/login",
+                json={"email": "testuser@example.com", "password": "testpassword"},
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertLessEqual(stats.count, 2)
+        self.assertEqual(response.headers["X-DB-Query-Count"], str(stats.count))
+
+    def test_query_budget_exceeded_raises(self):
+        """
+        This method tests that a route over its query budget fails in testing.
+        """
+        self.create_user()
+        view = self.app.view_functions["main.auth.login"]
+        original_budget = view.query_budget
+        view.query_budget = 1
+        try:
+            with self.assertRaises(QueryBudgetExceeded):
+                self.client().post(
+                    "/api/login",
+                    json={"email": "testuser@example.com", "password": "testpassword"},
+                )
+        finally:
+            view.query_budget = original_budget
+
+
+if __name__ == "__main__":
+    unittest.main()
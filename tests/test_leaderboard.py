@@ -0,0 +1,239 @@
+import unittest
+from datetime import datetime, timedelta
+from app import create_app, db
+from app.cache import cache
+from app.models import (
+    User,
+    Account,
+    MotionPictures,
+    WatchList,
+    TitleStats,
+    TitleActivity,
+)
+from app.services.leaderboard import bucket_of, decayed_scores, rebuild_title_stats
+from config import TestingConfig
+from sqlalchemy.sql import func
+from werkzeug.security import generate_password_hash
+
+
+class DecayedScoresTestCase(unittest.TestCase):
+    """
+    This class represents the test cases for the decay of hourly buckets.
+    """
+
+    def test_recent_activity_ranks_first(self):
+        """
+        This method tests that a recent bucket outweighs a larger old one.
+        """
+        now = datetime(2026, 10, 19, 12, 30)
+        scores = decayed_scores(
+            [(1, bucket_of(now), 2), (2, bucket_of(now - timedelta(hours=20)), 3)],
+            timedelta(hours=6),
+            now,
+        )
+        self.assertEqual(scores[1], 2)
+        self.assertLess(scores[2], 1)
+
+
+class LeaderboardTestCase(unittest.TestCase):
+    """
+    This class represents the test cases for the leaderboard counters and route.
+    """
+
+    def setUp(self):
+        """
+        This method sets up the test client, the test database and saved titles.
+        """
+        self.app = create_app()
+        self.app.config.from_object(TestingConfig)
+        self.client = self.app.test_client
+        cache.clear()
+
+        with self.app.app_context():
+            db.create_all()
+            self.accounts = []
+            for name in ("first", "second"):
+                user = User(
+                    username=name,
+                    email=f"{name}@example.com",
+                    password_hash=generate_password_hash("testpassword"),
+                    created_at=func.now(),
+                    updated_at=func.now(),
+                )
+                db.session.add(user)
+                db.session.commit()
+                account = Account(
+                    email=user.email,
+                    user_id=user.id,
+                    created_at=func.now(),
+                    updated_at=func.now(),
+                )
+                db.session.add(account)
+                db.session.commit()
+                self.accounts.append(account.id)
+
+            self.pictures = []
+            for external_id, title in ((1, "Alien"), (2, "Heat")):
+                picture = MotionPictures(
+                    title=title,
+                    external_id=external_id,
+                    poster_path="/poster.jpg",
+                    type="movie",
+                    overview="",
+                    created_at=func.now(),
+                    updated_at=func.now(),
+                )
+                db.session.add(picture)
+                db.session.commit()
+                self.pictures.append(picture.id)
+
+            self.entries = []
+            for account_id, picture_id in (
+                (self.accounts[0], self.pictures[0]),
+                (self.accounts[1], self.pictures[0]),
+                (self.accounts[0], self.pictures[1]),
+            ):
+                entry = WatchList(
+                    account_id=account_id,
+                    motion_picture_id=picture_id,
+                    watched=False,
+                    created_at=datetime.now(),
+                    updated_at=datetime.now(),
+                )
+                db.session.add(entry)
+                db.session.commit()
+                self.entries.append(entry.id)
+
+        response = self.client().post(
+            "/api/login",
+            json={"email": "first@example.com", "password": "testpassword"},
+        )
+        self.headers = {"Authorization": f"Bearer {response.get_json()['token']}"}
+
+    def tearDown(self):
+        """
+        This method removes the test database and the test client.
+        """
+        cache.clear()
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def counters(self, motion_picture_id):
+        """
+        This method returns the all-time and hourly counters of a title.
+        """
+        with self.app.app_context():
+            stats = db.session.get(TitleStats, motion_picture_id)
+            activity = TitleActivity.query.filter_by(
+                motion_picture_id=motion_picture_id
+            ).all()
+            saves = sum(row.saves for row in activity)
+            watched = sum(row.watched for row in activity)
+            return (stats.saves, stats.watched), (saves, watched)
+
+    def test_counters_follow_watchlist_writes(self):
+        """
+        This method tests that saves, watched toggles and removals update the counters.
+        """
+        self.assertEqual(self.counters(self.pictures[0]), ((2, 0), (2, 0)))
+
+        response = self.client().put(
+            f"/api/update-watchlist/{self.entries[0]}",
+            json={"watched": True},
+            headers=self.headers,
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.counters(self.pictures[0]), ((2, 1), (2, 1)))
+
+        response = self.client().delete(
+            f"/api/remove-from-watchlist/{self.pictures[0]}", headers=self.headers
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.counters(self.pictures[0]), ((1, 0), (1, 1)))
+
+    def test_rolled_back_writes_are_not_counted(self):
+        """
+        This method tests that the counters roll back with the watchlist write.
+        """
+        with self.app.app_context():
+            db.session.add(
+                WatchList(
+                    account_id=self.accounts[1],
+                    motion_picture_id=self.pictures[1],
+                    watched=True,
+                    created_at=datetime.now(),
+                    updated_at=datetime.now(),
+                )
+            )
+            db.session.flush()
+            db.session.rollback()
+        self.assertEqual(self.counters(self.pictures[1]), ((1, 0), (1, 0)))
+
+    def test_leaderboard(self):
+        """
+        This method tests the all-time and recent leaderboards.
+        """
+        for window in ("all", "24h", "7d"):
+            response = self.client().get(
+                f"/api/leaderboard?window={window}", headers=self.headers
+            )
+            self.assertEqual(response.status_code, 200)
+            results = response.get_json()
+            self.assertEqual([result["title"] for result in results], ["Alien", "Heat"])
+            self.assertEqual(results[0]["saves"], 2)
+
+        response = self.client().get("/api/leaderboard?window=1y", headers=self.headers)
+        self.assertEqual(response.status_code, 400)
+
+    def test_saves_through_the_api_share_counters(self):
+        """
+        This method tests that accounts saving the same title through the API share
+        its counters, so it ranks first once it has the most saves.
+        """
+        second = self.client().post(
+            "/api/login",
+            json={"email": "second@example.com", "password": "testpassword"},
+        )
+        headers = [
+            self.headers,
+            {"Authorization": f"Bearer {second.get_json()['token']}"},
+        ]
+        for account_headers in headers:
+            response = self.client().post(
+                "/api/add-to-watchlist",
+                json={
+                    "title": "Ronin",
+                    "external_id": 3,
+                    "poster_path": "/poster.jpg",
+                    "type": "movie",
+                    "overview": "",
+                },
+                headers=account_headers,
+            )
+            self.assertEqual(response.status_code, 201)
+        with self.app.app_context():
+            db.session.delete(db.session.get(WatchList, self.entries[1]))
+            db.session.commit()
+        cache.clear()
+
+        response = self.client().get(
+            "/api/leaderboard?window=all", headers=self.headers
+        )
+        results = response.get_json()
+        self.assertEqual(results[0]["title"], "Ronin")
+        self.assertEqual(results[0]["saves"], 2)
+
+    def test_rebuild_repairs_counters(self):
+        """
+        This method tests that the repair job recomputes drifted counters.
+        """
+        with self.app.app_context():
+            db.session.get(TitleStats, self.pictures[0]).saves = 10
+            db.session.commit()
+            self.assertEqual(rebuild_title_stats(), 2)
+        self.assertEqual(self.counters(self.pictures[0])[0], (2, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
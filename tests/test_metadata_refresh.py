@@ -0,0 +1,146 @@
+import unittest
+from datetime import date
+from unittest import mock
+from app import create_app, db
+from app.cache import cache
+from app.models import JobState, MotionPictures
+from app.services import MetadataRefresher, TMDBClient
+from config import TestingConfig
+from sqlalchemy.sql import func
+
+DETAILS = {
+    "movie/10": {"title": "New title", "poster_path": "/new.jpg", "overview": "New"},
+    "tv/20": {"name": "Series", "poster_path": "/series.jpg", "overview": "Plot"},
+    "movie/30": {"title": "Same", "poster_path": "/same.jpg", "overview": ""},
+    "movie/changes": {"results": [{"id": 10}], "total_pages": 1},
+    "tv/changes": {"results": [], "total_pages": 1},
+}
+
+
+def upstream(url, headers=None, params=None, timeout=None):
+    """
+    Return a mocked TMDB response for a URL.
+    """
+    path = url.split("/3/", 1)[-1]
+    response = mock.Mock(status_code=200 if path in DETAILS else 404)
+    response.json.return_value = DETAILS.get(path, {"status_message": "Not found"})
+    if path == "movie/changes" and params["start_date"] == date.today().isoformat():
+        # Nothing changed since a run earlier today.
+        response.json.return_value = {"results": [], "total_pages": 1}
+    return response
+
+
+class MetadataRefreshTestCase(unittest.TestCase):
+    """
+    This class represents the test cases for the metadata refresh job.
+    """
+
+    def setUp(self):
+        """
+        This method sets up the app, the test database and stored motion pictures.
+        """
+        self.app = create_app()
+        self.app.config.from_object(TestingConfig)
+        self.client = TMDBClient(access_token="token")
+        cache.clear()
+
+        with self.app.app_context():
+            db.create_all()
+            for external_id, title, type, poster_path in (
+                (10, "Old title", "movie", "/old.jpg"),
+                (20, "Series", "tv", "/series.jpg"),
+                (30, "Same", "movie", "/same.jpg"),
+            ):
+                db.session.add(
+                    MotionPictures(
+                        title=title,
+                        external_id=external_id,
+                        poster_path=poster_path,
+                        type=type,
+                        overview="",
+                        created_at=func.now(),
+                        updated_at=func.now(),
+                    )
+                )
+            db.session.commit()
+
+    def tearDown(self):
+        """
+        This method removes the test database and clears the cache.
+        """
+        cache.clear()
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def stored(self):
+        """
+        This method returns the stored titles, posters and overviews by TMDB ID.
+        """
+        with self.app.app_context():
+            return {
+                picture.external_id: (
+                    picture.title,
+                    picture.poster_path,
+                    picture.overview,
+                )
+                for picture in MotionPictures.query
+            }
+
+    def test_refresh_updates_stale_rows(self):
+        """
+        This method tests that stale rows are refreshed and fresh rows are skipped.
+        """
+        self.app.config["METADATA_REFRESH_CHUNK_SIZE"] = 2
+        refresher = MetadataRefresher(self.app, self.client)
+
+        with mock.patch.object(self.client.session, "get", side_effect=upstream) as get:
+            with self.app.app_context():
+                totals = refresher.run()
+                self.assertEqual(
+                    totals, {"selected": 3, "updated": 2, "unchanged": 1, "failed": 0}
+                )
+                self.assertEqual(refresher.run()["selected"], 0)
+        self.assertEqual(get.call_count, 3)
+
+        stored = self.stored()
+        self.assertEqual(stored[10], ("New title", "/new.jpg", "New"))
+        self.assertEqual(stored[20], ("Series", "/series.jpg", "Plot"))
+        self.assertEqual(stored[30], ("Same", "/same.jpg", ""))
+
+    def test_incremental_refresh_fetches_changed_rows_only(self):
+        """
+        This method tests that incremental mode only fetches rows changed on TMDB.
+        """
+        refresher = MetadataRefresher(self.app, self.client)
+
+        with mock.patch.object(self.client.session, "get", side_effect=upstream) as get:
+            with self.app.app_context():
+                totals = refresher.run(incremental=True)
+
+        self.assertEqual(totals["selected"], 1)
+        self.assertEqual(totals["updated"], 1)
+        paths = [call.args[0].split("/3/", 1)[-1] for call in get.call_args_list]
+        self.assertEqual(sorted(paths), ["movie/10", "movie/changes", "tv/changes"])
+        self.assertEqual(self.stored()[10][0], "New title")
+
+    def test_incremental_refresh_continues_from_stored_cursor(self):
+        """
+        This method tests that a second incremental run, in a new process with an
+        empty cache, only selects the rows changed since the first run.
+        """
+        with mock.patch.object(self.client.session, "get", side_effect=upstream):
+            with self.app.app_context():
+                first = MetadataRefresher(self.app, self.client).run(incremental=True)
+            cache.clear()
+            with self.app.app_context():
+                state = db.session.get(JobState, "metadata_refresh")
+                self.assertIsNotNone(state.cursor)
+                second = MetadataRefresher(self.app, self.client).run(incremental=True)
+
+        self.assertEqual(first["selected"], 1)
+        self.assertEqual(second["selected"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,167 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from unittest import mock
+import requests
+from app import create_app, db
+from app.instrumentation.metrics import (
+    MetricsRegistry,
+    UPSTREAM_ERRORS,
+    merge_snapshots,
+    render_text,
+)
+from app.services import TMDBClient
+from config import TestingConfig
+
+
+class MetricsTestCase(unittest.TestCase):
+    """
+    This class represents the test cases for the application metrics.
+    """
+
+    def setUp(self):
+        """
+        This method sets up the test client and the test database.
+        """
+        self.app = create_app()
+        self.app.config.from_object(TestingConfig)
+        self.client = self.app.test_client
+
+        with self.app.app_context():
+            db.create_all()
+
+    def tearDown(self):
+        """
+        This method removes the test database and the test client.
+        """
+        self.app.config["METRICS_MULTIPROC_DIR"] = None
+        self.app.config["METRICS_TOKEN"] = None
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def test_histogram_rendering(self):
+        """
+        This method tests that histograms render cumulative buckets.
+        """
+        registry = MetricsRegistry()
+        latency = registry.histogram("latency", "Latency.", ("route",), buckets=(0.1, 1))
+        latency.observe(0.05, route="a")
+        latency.observe(0.5, route="a")
+        latency.observe(5, route="a")
+
+        text = render_text(registry.snapshot())
+        self.assertIn('latency_bucket{route="a",le="0.1"} 1', text)
+        self.assertIn('latency_bucket{route="a",le="1"} 2', text)
+        self.assertIn('latency_bucket{route="a",le="+Inf"} 3', text)
+        self.assertIn('latency_count{route="a"} 3', text)
+
+    def test_merge_snapshots(self):
+        """
+        This method tests that snapshots of several workers are summed.
+        """
+        workers = [MetricsRegistry(), MetricsRegistry()]
+        for registry in workers:
+            requests_total = registry.counter("requests_total", "Requests.", ("status",))
+            requests_total.inc(status=200)
+
+        merged = merge_snapshots([registry.snapshot() for registry in workers])
+        self.assertIn('requests_total{status="200"} 2', render_text(merged))
+
+    def test_metrics_endpoint(self):
+        """
+        This method tests that the metrics endpoint reports route latency.
+        """
+        self.client().post("/api/login", json={"email": "x@example.com", "password": "x"})
+        response = self.client().get("/metrics")
+        text = response.get_data(as_text=True)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("watchwave_http_request_duration_seconds_bucket", text)
+        self.assertIn('endpoint="main.auth.login"', text)
+        self.assertIn('watchwave_http_responses_total{blueprint="main.auth",status="401"}', text)
+
+    def test_metrics_endpoint_multiprocess(self):
+        """
+        This method tests that the metrics endpoint merges worker snapshots.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            other_worker = MetricsRegistry()
+            other_worker.counter(
+                "watchwave_http_responses_total", "Responses.", ("blueprint", "status")
+            ).inc(blueprint="other", status=200)
+            with open(f"{directory}/metrics_1.json", "w") as f:
+                json.dump(other_worker.snapshot(), f)
+
+            self.app.config["METRICS_MULTIPROC_DIR"] = directory
+            text = self.client().get("/metrics").get_data(as_text=True)
+
+        self.assertIn(
+            'watchwave_http_responses_total{blueprint="other",status="200"} 1', text
+        )
+
+    def test_dead_worker_snapshots_are_removed(self):
+        """
+        This method tests that the snapshot of an exited worker is no longer merged.
+        """
+        process = subprocess.Popen([sys.executable, "-c", "pass"])
+        process.wait()
+        with tempfile.TemporaryDirectory() as directory:
+            dead_worker = MetricsRegistry()
+            dead_worker.counter(
+                "watchwave_http_responses_total", "Responses.", ("blueprint", "status")
+            ).inc(blueprint="dead", status=200)
+            path = f"{directory}/metrics_{process.pid}.json"
+            with open(path, "w") as f:
+                json.dump(dead_worker.snapshot(), f)
+
+            self.app.config["METRICS_MULTIPROC_DIR"] = directory
+            text = self.client().get("/metrics").get_data(as_text=True)
+            self.assertFalse(os.path.exists(path))
+
+        self.assertNotIn('blueprint="dead"', text)
+
+    def test_metrics_endpoint_access(self):
+        """
+        This method tests that the metrics endpoint requires the token when one is
+        set, and otherwise only answers local requests.
+        """
+        remote = {"REMOTE_ADDR": "203.0.113.7"}
+        self.assertEqual(
+            self.client().get("/metrics", environ_base=remote).status_code, 403
+        )
+
+        self.app.config["METRICS_TOKEN"] = "scrape-token"
+        self.assertEqual(self.client().get("/metrics").status_code, 401)
+        response = self.client().get(
+            "/metrics",
+            headers={"Authorization": "Bearer scrape-token"},
+            environ_base=remote,
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def test_upstream_errors_are_counted(self):
+        """
+        This method tests that failed TMDB calls are counted.
+        """
+        client = TMDBClient(access_token="token")
+        before = UPSTREAM_ERRORS.value(
+            upstream="tmdb", endpoint="movie/popular", reason="ConnectionError"
+        )
+        with mock.patch.object(
+            client.session, "get", side_effect=requests.ConnectionError()
+        ):
+            with self.assertRaises(requests.ConnectionError):
+                client.get("movie/popular")
+
+        after = UPSTREAM_ERRORS.value(
+            upstream="tmdb", endpoint="movie/popular", reason="ConnectionError"
+        )
+        self.assertEqual(after, before + 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
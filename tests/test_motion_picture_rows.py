@@ -0,0 +1,85 @@
+import tracemalloc
+import unittest
+from datetime import datetime
+from app import create_app, db
+from app.models import MotionPictureRow, MotionPictures
+from config import TestingConfig
+
+
+class MotionPictureRowTestCase(unittest.TestCase):
+    """
+    This class represents the test cases for the read-only motion picture rows.
+    """
+
+    def setUp(self):
+        """
+        This method sets up the test database with a few hundred motion pictures.
+        """
+        self.app = create_app()
+        self.app.config.from_object(TestingConfig)
+
+        with self.app.app_context():
+            db.create_all()
+            for external_id in range(300):
+                db.session.add(
+                    MotionPictures(
+                        title=f"Title {external_id}",
+                        external_id=external_id,
+                        poster_path="/poster.jpg",
+                        type="movie",
+                        overview="An overview",
+                        created_at=datetime.now(),
+                        updated_at=datetime.now(),
+                    )
+                )
+            db.session.commit()
+
+    def tearDown(self):
+        """
+        This method removes the test database.
+        """
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def test_rows_serialize_like_models(self):
+        """
+        This method tests that a row serializes exactly like its model instance.
+        """
+        with self.app.app_context():
+            models = MotionPictures.query.order_by(MotionPictures.id).all()
+            rows = db.session.execute(
+                MotionPictureRow.select().order_by(MotionPictures.id)
+            )
+            self.assertEqual(
+                [MotionPictureRow(*row).to_dict() for row in rows],
+                [model.to_dict() for model in models],
+            )
+
+    def test_rows_use_less_memory(self):
+        """
+        This method tests that loading rows allocates less than loading models.
+        """
+
+        def allocated(load):
+            with self.app.app_context():
+                tracemalloc.start()
+                loaded = load()
+                size = tracemalloc.get_traced_memory()[0]
+                tracemalloc.stop()
+                del loaded
+                db.session.remove()
+            return size
+
+        models = allocated(lambda: MotionPictures.query.all())
+        rows = allocated(
+            lambda: [
+                MotionPictureRow(*row)
+                for row in db.session.execute(MotionPictureRow.select())
+            ]
+        )
+        self.assertLess(rows, models / 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
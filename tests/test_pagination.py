@@ -0,0 +1,219 @@
+import time
+import unittest
+from unittest import mock
+from app import create_app, db
+from app.cache import cache
+from app.models import User, Account
+from app.services import catalog_index, tmdb_client
+from app.services.rate_limiter import RateLimiter
+from config import TestingConfig
+from sqlalchemy.sql import func
+from werkzeug.security import generate_password_hash
+
+
+def tmdb_page(url, headers=None, params=None, timeout=None):
+    """
+    Return a fake TMDB response for the requested page of a three page list.
+    """
+    page = (params or {}).get("page", 1)
+    response = mock.Mock(status_code=200)
+    response.json.return_value = {
+        "page": page,
+        "results": [{"id": page, "title": f"Page {page}"}],
+        "total_pages": 3,
+        "total_results": 3,
+    }
+    return response
+
+
+class PaginationTestCase(unittest.TestCase):
+    """
+    This class represents the test cases for paginated TMDB lists and prefetching.
+    """
+
+    def setUp(self):
+        """
+        This method sets up the test client, the test database and a logged in user.
+        """
+        self.app = create_app()
+        self.app.config.from_object(TestingConfig)
+        self.client = self.app.test_client
+        cache.clear()
+
+        with self.app.app_context():
+            db.create_all()
+            user = User(
+                username="testuser",
+                email="test@example.com",
+                password_hash=generate_password_hash("testpassword"),
+                created_at=func.now(),
+                updated_at=func.now(),
+            )
+            db.session.add(user)
+            db.session.commit()
+            db.session.add(
+                Account(
+                    email=user.email,
+                    user_id=user.id,
+                    created_at=func.now(),
+                    updated_at=func.now(),
+                )
+            )
+            db.session.commit()
+
+        response = self.client().post(
+            "/api/login",
+            json={"email": "test@example.com", "password": "testpassword"},
+        )
+        self.headers = {"Authorization": f"Bearer {response.get_json()['token']}"}
+
+    def tearDown(self):
+        """
+        This method removes the test database and the test client.
+        """
+        tmdb_client.init_app(self.app)
+        catalog_index.clear()
+        cache.clear()
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def wait_for_prefetches(self):
+        """
+        This method waits until no prefetch is running.
+        """
+        deadline = time.monotonic() + 5
+        while tmdb_client._prefetching and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    def test_page_is_passed_through_and_next_page_prefetched(self):
+        """
+        This method tests that the page, language and region reach TMDB, that the
+        next page is prefetched and that the last page prefetches nothing.
+        """
+        path = "/api/home/latest-movies"
+        session = mock.patch.object(tmdb_client.session, "get", side_effect=tmdb_page)
+        with session as get:
+            response = self.client().get(
+                f"{path}?page=2&language=de-DE&region=DE", headers=self.headers
+            )
+            self.wait_for_prefetches()
+            self.assertEqual(response.get_json()["page"], 2)
+            self.assertEqual(
+                [call.kwargs["params"] for call in get.call_args_list],
+                [
+                    {"page": 2, "language": "de-DE", "region": "DE"},
+                    {"page": 3, "language": "de-DE", "region": "DE"},
+                ],
+            )
+
+            last = self.client().get(
+                f"{path}?page=3&language=de-DE&region=DE", headers=self.headers
+            )
+            self.wait_for_prefetches()
+            self.assertEqual(last.get_json()["results"], [{"id": 3, "title": "Page 3"}])
+            self.assertEqual(get.call_count, 2)
+
+            other = self.client().get(f"{path}?page=3", headers=self.headers)
+            self.assertEqual(other.get_json()["page"], 3)
+            self.assertEqual(get.call_count, 3)
+
+    def test_search_pages(self):
+        """
+        This method tests that later search pages come from TMDB and are prefetched.
+        """
+        self.app.config["SEARCH_LOCAL_ENABLED"] = False
+        searches = tmdb_client.search_counts["matrix"]
+        session = mock.patch.object(tmdb_client.session, "get", side_effect=tmdb_page)
+        with session as get:
+            first = self.client().get(
+                "/api/home/search?query=Matrix", headers=self.headers
+            )
+            self.wait_for_prefetches()
+            second = self.client().get(
+                "/api/home/search?query=matrix&page=2", headers=self.headers
+            )
+            self.wait_for_prefetches()
+
+        self.assertEqual(first.get_json()["total_pages"], 3)
+        self.assertEqual(second.get_json()["page"], 2)
+        self.assertEqual(
+            [call.kwargs["params"] for call in get.call_args_list],
+            [
+                {"query": "matrix"},
+                {"query": "matrix", "page": 2},
+                {"query": "matrix", "page": 3},
+            ],
+        )
+        self.assertEqual(tmdb_client.search_counts["matrix"], searches + 1)
+
+    def test_local_search_keeps_tmdb_pages(self):
+        """
+        This method tests that enough local hits are served alone, with TMDB's page
+        count so clients can go on to page 2, which is prefetched.
+        """
+        self.app.config["SEARCH_LOCAL_MIN_RESULTS"] = 1
+        response = self.client().post(
+            "/api/add-to-watchlist",
+            json={
+                "title": "The Matrix",
+                "external_id": 603,
+                "poster_path": "/poster.jpg",
+                "type": "movie",
+                "overview": "",
+            },
+            headers=self.headers,
+        )
+        self.assertEqual(response.status_code, 201)
+        with self.app.app_context():
+            catalog_index.build()
+
+        session = mock.patch.object(tmdb_client.session, "get", side_effect=tmdb_page)
+        with session as get:
+            response = self.client().get(
+                "/api/home/search?query=matrix", headers=self.headers
+            )
+            self.wait_for_prefetches()
+
+        payload = response.get_json()
+        self.assertEqual([result["source"] for result in payload["results"]], ["local"])
+        self.assertEqual(payload["total_pages"], 3)
+        self.assertEqual(
+            [call.kwargs["params"] for call in get.call_args_list],
+            [{"query": "matrix"}, {"query": "matrix", "page": 2}],
+        )
+
+    def test_prefetch_only_uses_spare_tokens(self):
+        """
+        This method tests that a prefetch is shed instead of waiting for a token.
+        """
+        tmdb_client.limiter = RateLimiter(
+            "tmdb",
+            rate=0.01,
+            burst=1,
+            max_wait={RateLimiter.INTERACTIVE: 2, RateLimiter.PREFETCH: 0},
+        )
+        session = mock.patch.object(tmdb_client.session, "get", side_effect=tmdb_page)
+        with session as get:
+            response = self.client().get(
+                "/api/home/latest-series", headers=self.headers
+            )
+            self.wait_for_prefetches()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(get.call_count, 1)
+        self.assertIsNone(cache.backend.get("tmdb:tv/popular?page=2"))
+
+    def test_invalid_page_parameters(self):
+        """
+        This method tests that invalid page, language and region values are rejected.
+        """
+        for query in ("page=0", "page=501", "page=two", "language=x", "region=usa"):
+            response = self.client().get(
+                f"/api/home/latest-movies?{query}", headers=self.headers
+            )
+            self.assertEqual(response.status_code, 400, query)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,158 @@
+import io
+import os
+import tempfile
+import time
+import unittest
+from PIL import Image
+from app import create_app, db
+from app.models import MotionPictures
+from app.services import PosterCache, poster_cache
+from config import TestingConfig
+from sqlalchemy.sql import func
+
+
+def write_image(directory, name, size=(600, 900), color="red"):
+    """
+    Write a JPEG image to a stand-in origin directory.
+    """
+    Image.new("RGB", size, color).save(os.path.join(directory, name), "JPEG")
+
+
+class PosterCacheTestCase(unittest.TestCase):
+    """
+    This class represents the test cases for the poster cache.
+    """
+
+    def setUp(self):
+        """
+        This method creates a stand-in origin and an empty cache directory.
+        """
+        self.origin = tempfile.TemporaryDirectory()
+        self.directory = tempfile.TemporaryDirectory()
+        for name, color in (("a.jpg", "red"), ("b.jpg", "green"), ("c.jpg", "blue")):
+            write_image(self.origin.name, name, color=color)
+
+    def tearDown(self):
+        """
+        This method removes the temporary directories.
+        """
+        self.origin.cleanup()
+        self.directory.cleanup()
+
+    def test_variants_are_created_once(self):
+        """
+        This method tests that a variant is resized once and then served from disk.
+        """
+        cache = PosterCache(self.directory.name, origin=f"file://{self.origin.name}")
+        path, digest = cache.get("/a.jpg", 185)
+        created = os.stat(path).st_mtime_ns
+
+        with Image.open(path) as image:
+            self.assertEqual(image.size, (185, 278))
+        self.assertEqual(cache.get("/a.jpg", 185), (path, digest))
+        self.assertEqual(os.path.basename(path), f"{digest}-w185.jpg")
+        self.assertGreaterEqual(os.stat(path).st_mtime_ns, created)
+
+        with self.assertRaises(ValueError):
+            cache.get("/a.jpg", 100)
+
+    def test_least_recently_served_files_are_evicted(self):
+        """
+        This method tests that eviction keeps the cache under its size bound.
+        """
+        cache = PosterCache(self.directory.name, origin=f"file://{self.origin.name}")
+        first, _ = cache.get("/a.jpg")
+        time.sleep(0.01)
+        second, _ = cache.get("/b.jpg")
+        # Room for a little less than three originals.
+        cache.max_bytes = 3 * os.path.getsize(first) - 1
+        time.sleep(0.01)
+        cache.get("/a.jpg")
+        time.sleep(0.01)
+        third, _ = cache.get("/c.jpg")
+
+        self.assertTrue(os.path.exists(first))
+        self.assertFalse(os.path.exists(second))
+        self.assertTrue(os.path.exists(third))
+
+
+class PosterRouteTestCase(unittest.TestCase):
+    """
+    This class represents the test cases for the poster route.
+    """
+
+    def setUp(self):
+        """
+        This method sets up the app, a stand-in origin and a stored motion picture.
+        """
+        self.origin = tempfile.TemporaryDirectory()
+        self.directory = tempfile.TemporaryDirectory()
+        write_image(self.origin.name, "poster.jpg")
+
+        self.app = create_app()
+        self.app.config.from_object(TestingConfig)
+        self.app.config["POSTER_CACHE_DIR"] = self.directory.name
+        self.app.config["POSTER_ORIGIN_URL"] = f"file://{self.origin.name}"
+        poster_cache.init_app(self.app)
+        self.client = self.app.test_client
+
+        with self.app.app_context():
+            db.create_all()
+            picture = MotionPictures(
+                title="Alien",
+                external_id=348,
+                poster_path="/poster.jpg",
+                type="movie",
+                overview="",
+                created_at=func.now(),
+                updated_at=func.now(),
+            )
+            db.session.add(picture)
+            db.session.commit()
+            self.motion_picture_id = picture.id
+
+    def tearDown(self):
+        """
+        This method removes the test database and the temporary directories.
+        """
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+        self.app.config.from_object(TestingConfig)
+        self.app.config["POSTER_CACHE_DIR"] = None
+        poster_cache.init_app(self.app)
+        self.origin.cleanup()
+        self.directory.cleanup()
+
+    def test_get_poster(self):
+        """
+        This method tests resized, conditional and range poster requests.
+        """
+        url = f"/api/posters/{self.motion_picture_id}?w=342"
+        response = self.client().get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, "image/jpeg")
+        self.assertIn("max-age=2592000", response.headers["Cache-Control"])
+        with Image.open(io.BytesIO(response.data)) as image:
+            self.assertEqual(image.width, 342)
+
+        etag = response.headers["ETag"]
+        response = self.client().get(url, headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 304)
+
+        response = self.client().get(url, headers={"Range": "bytes=0-9"})
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(len(response.data), 10)
+
+    def test_invalid_requests(self):
+        """
+        This method tests unknown motion pictures and unsupported widths.
+        """
+        response = self.client().get(f"/api/posters/{self.motion_picture_id}?w=100")
+        self.assertEqual(response.status_code, 400)
+        response = self.client().get("/api/posters/999")
+        self.assertEqual(response.status_code, 404)
+
+
+if __name__ == "__main__":
+    unittest.main()
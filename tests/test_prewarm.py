@@ -0,0 +1,66 @@
+import unittest
+from unittest import mock
+from app import create_app
+from app.cache import cache
+from app.services import Prewarmer, TMDBClient
+from config import TestingConfig
+
+
+class PrewarmTestCase(unittest.TestCase):
+    """
+    This class represents the test cases for the cache pre-warming.
+    """
+
+    def setUp(self):
+        """
+        This method sets up the app and an empty cache.
+        """
+        self.app = create_app()
+        self.app.config.from_object(TestingConfig)
+        cache.clear()
+
+    def tearDown(self):
+        """
+        This method clears the cache.
+        """
+        cache.clear()
+
+    def test_refresh_warms_popular_lists_and_top_searches(self):
+        """
+        This method tests that a refresh caches the popular lists and top searches.
+        """
+        client = TMDBClient(access_token="token")
+        upstream = mock.Mock(status_code=200)
+        upstream.json.return_value = {"page": 1, "results": []}
+
+        with mock.patch.object(client.session, "get", return_value=upstream) as get:
+            with self.app.app_context():
+                client.search("  The Matrix ")
+                client.search("the matrix")
+                self.assertTrue(Prewarmer(self.app, client).run_once())
+                calls_after_refresh = get.call_count
+
+                client.popular_movies()
+                client.popular_series()
+                client.search("the matrix")
+
+        self.assertEqual(calls_after_refresh, 4)
+        self.assertEqual(get.call_count, calls_after_refresh)
+
+    def test_only_one_worker_leads(self):
+        """
+        This method tests that the leader lease excludes other workers.
+        """
+        leader = Prewarmer(self.app)
+        follower = Prewarmer(self.app)
+
+        with mock.patch("app.services.prewarm.os.getpid", return_value=1):
+            self.assertTrue(leader.acquire_leadership())
+        with mock.patch("app.services.prewarm.os.getpid", return_value=2):
+            self.assertFalse(follower.acquire_leadership())
+        with mock.patch("app.services.prewarm.os.getpid", return_value=1):
+            self.assertTrue(leader.acquire_leadership())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,163 @@
+import unittest
+from unittest import mock
+from app import create_app, db
+from app.cache import cache
+from app.models import User, Account
+from app.services import tmdb_client
+from app.services.projection import PRESETS, parse_fields, project
+from app.services.watchlist_cache import watchlist_cache
+from config import TestingConfig
+from sqlalchemy.sql import func
+from werkzeug.security import generate_password_hash
+
+
+class ProjectionTestCase(unittest.TestCase):
+    """
+    This class represents the test cases for the ``fields`` projection.
+    """
+
+    def setUp(self):
+        """
+        This method sets up the test client, the test database and a logged in user.
+        """
+        self.app = create_app()
+        self.app.config.from_object(TestingConfig)
+        self.client = self.app.test_client
+        cache.clear()
+        watchlist_cache.clear()
+
+        with self.app.app_context():
+            db.create_all()
+            user = User(
+                username="testuser",
+                email="test@example.com",
+                password_hash=generate_password_hash("testpassword"),
+                created_at=func.now(),
+                updated_at=func.now(),
+            )
+            db.session.add(user)
+            db.session.commit()
+            db.session.add(
+                Account(
+                    email=user.email,
+                    user_id=user.id,
+                    created_at=func.now(),
+                    updated_at=func.now(),
+                )
+            )
+            db.session.commit()
+
+        response = self.client().post(
+            "/api/login",
+            json={"email": "test@example.com", "password": "testpassword"},
+        )
+        self.headers = {"Authorization": f"Bearer {response.get_json()['token']}"}
+
+    def tearDown(self):
+        """
+        This method removes the test database and the test client.
+        """
+        cache.clear()
+        watchlist_cache.clear()
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def test_parse_and_project(self):
+        """
+        This method tests that presets expand and items keep only requested fields.
+        """
+        self.assertIsNone(parse_fields(""))
+        self.assertEqual(parse_fields("title,id"), ("id", "title"))
+        self.assertEqual(set(parse_fields("compact,overview")), set(PRESETS["card"]))
+        with self.assertRaises(ValueError):
+            parse_fields("title,../x")
+
+        payload = {"page": 1, "results": [{"id": 1, "title": "A", "genre_ids": []}]}
+        self.assertEqual(
+            project(payload, ("id", "title")),
+            {"page": 1, "results": [{"id": 1, "title": "A"}]},
+        )
+        self.assertEqual(payload["results"][0]["genre_ids"], [])
+
+    def test_home_list_is_projected_and_cached(self):
+        """
+        This method tests that a projected home list is trimmed and cached compact.
+        """
+        upstream = mock.Mock(status_code=200)
+        upstream.json.return_value = {
+            "page": 1,
+            "results": [
+                {
+                    "id": 603,
+                    "title": "The Matrix",
+                    "poster_path": "/m.jpg",
+                    "backdrop_path": "/b.jpg",
+                    "genre_ids": [28],
+                    "original_title": "The Matrix",
+                    "vote_count": 25000,
+                }
+            ],
+        }
+        with mock.patch.object(
+            tmdb_client.session, "get", return_value=upstream
+        ) as get:
+            first = self.client().get(
+                "/api/home/latest-movies?fields=compact", headers=self.headers
+            )
+            second = self.client().get(
+                "/api/home/latest-movies?fields=compact", headers=self.headers
+            )
+            full = self.client().get("/api/home/latest-movies", headers=self.headers)
+
+        self.assertEqual(get.call_count, 1)
+        self.assertEqual(
+            first.get_json()["results"],
+            [{"id": 603, "title": "The Matrix", "poster_path": "/m.jpg"}],
+        )
+        self.assertEqual(second.get_json(), first.get_json())
+        self.assertIn("backdrop_path", full.get_json()["results"][0])
+        self.assertIsNotNone(
+            cache.backend.get(
+                "tmdb:movie/popular#fields=" + ",".join(parse_fields("compact"))
+            )
+        )
+
+    def test_watchlist_projection(self):
+        """
+        This method tests that the watchlist is trimmed and invalid fields rejected.
+        """
+        self.client().post(
+            "/api/add-to-watchlist",
+            json={
+                "title": "Title",
+                "external_id": 1,
+                "poster_path": "/poster.jpg",
+                "type": "movie",
+                "overview": "An overview",
+            },
+            headers=self.headers,
+        )
+        path = "/api/watchlist"
+        compact = self.client().get(f"{path}?fields=compact", headers=self.headers)
+        full = self.client().get(path, headers=self.headers)
+
+        self.assertEqual(
+            compact.get_json(),
+            [
+                {
+                    "id": 1,
+                    "title": "Title",
+                    "external_id": 1,
+                    "poster_path": "/poster.jpg",
+                    "type": "movie",
+                }
+            ],
+        )
+        self.assertIn("uuid", full.get_json()[0])
+        invalid = self.client().get("/api/watchlist?fields=a-b", headers=self.headers)
+        self.assertEqual(invalid.status_code, 400)
+
+
+if __name__ == "__main__":
+    unittest.main()
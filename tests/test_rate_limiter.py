@@ -0,0 +1,75 @@
+import threading
+import time
+import unittest
+from app.services import RateLimiter, RateLimitExceeded
+
+
+class RateLimiterTestCase(unittest.TestCase):
+    """
+    This class represents the test cases for the upstream rate limiter.
+    """
+
+    def test_burst_then_throttle(self):
+        """
+        This method tests that calls beyond the burst wait for new tokens.
+        """
+        limiter = RateLimiter("test", rate=50, burst=2)
+        start = time.monotonic()
+        for _ in range(3):
+            limiter.acquire()
+        self.assertGreaterEqual(time.monotonic() - start, 0.015)
+
+    def test_sheds_when_projected_wait_too_long(self):
+        """
+        This method tests that a caller is rejected early instead of queued.
+        """
+        limiter = RateLimiter(
+            "test", rate=1, burst=1, max_wait={RateLimiter.INTERACTIVE: 0.1}
+        )
+        limiter.acquire()
+        start = time.monotonic()
+        with self.assertRaises(RateLimitExceeded):
+            limiter.acquire()
+        self.assertLess(time.monotonic() - start, 0.05)
+
+    def test_interactive_served_before_background(self):
+        """
+        This method tests that interactive callers jump ahead of background callers.
+        """
+        limiter = RateLimiter("test", rate=10, burst=1)
+        limiter.acquire()
+        order = []
+
+        def take(priority, name):
+            limiter.acquire(priority)
+            order.append(name)
+
+        background = threading.Thread(
+            target=take, args=(RateLimiter.BACKGROUND, "background")
+        )
+        interactive = threading.Thread(
+            target=take, args=(RateLimiter.INTERACTIVE, "interactive")
+        )
+        background.start()
+        time.sleep(0.01)
+        interactive.start()
+        time.sleep(0.01)
+        self.assertEqual(limiter.queue_depth(), 2)
+        background.join()
+        interactive.join()
+
+        self.assertEqual(order, ["interactive", "background"])
+
+    def test_penalize_pauses_tokens(self):
+        """
+        This method tests that a 429 penalty pauses the limiter.
+        """
+        limiter = RateLimiter("test", rate=1000, burst=10)
+        limiter.penalize(0.05)
+        start = time.monotonic()
+        limiter.acquire()
+        self.assertGreaterEqual(time.monotonic() - start, 0.04)
+
+
+if __name__ == "__main__":
+    unittest.main()
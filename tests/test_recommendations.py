@@ -0,0 +1,209 @@
+import unittest
+from app import create_app, db
+from app.cache import cache
+from app.models import User, Account, MotionPictures, WatchList
+from app.services.recommendations import build_recommendations, compute_neighbours
+from config import TestingConfig
+from sqlalchemy.sql import func
+from werkzeug.security import generate_password_hash
+
+
+class ComputeNeighboursTestCase(unittest.TestCase):
+    """
+    This class represents the test cases for computing neighbours.
+    """
+
+    def test_cosine_neighbours(self):
+        """
+        This method tests top-K ranking by cosine similarity.
+        """
+        # Accounts 1 and 2 saved titles 10 and 20; account 3 saved 10 and 30.
+        sources, ranks, targets, scores = compute_neighbours(
+            [1, 1, 2, 2, 3, 3], [10, 20, 10, 20, 10, 30], top_k=2, batch_size=2
+        )
+        neighbours = {
+            (int(s), int(r)): (int(t), round(float(score), 3))
+            for s, r, t, score in zip(sources, ranks, targets, scores)
+        }
+
+        self.assertEqual(neighbours[(10, 0)], (20, round(2 / (3**0.5 * 2**0.5), 3)))
+        self.assertEqual(neighbours[(10, 1)][0], 30)
+        self.assertEqual(neighbours[(20, 0)][0], 10)
+        self.assertNotIn((20, 1), neighbours)
+
+    def test_top_k_and_cooccurrence(self):
+        """
+        This method tests that only K neighbours are kept, by co-occurrence count.
+        """
+        sources, ranks, targets, scores = compute_neighbours(
+            [1, 1, 1, 2, 2], [1, 2, 3, 1, 2], top_k=1, metric="cooccurrence"
+        )
+        self.assertEqual(list(sources), [1, 2, 3])
+        self.assertEqual(list(targets), [2, 1, 1])
+        self.assertEqual(list(scores), [2, 2, 1])
+
+    def test_min_accounts(self):
+        """
+        This method tests that pairs saved by too few accounts are not neighbours.
+        """
+        sources, ranks, targets, scores = compute_neighbours(
+            [1, 1, 1, 2, 2], [1, 2, 3, 1, 2], metric="cooccurrence", min_accounts=2
+        )
+        self.assertEqual(list(sources), [1, 2])
+        self.assertEqual(list(targets), [2, 1])
+
+
+class RecommendationsRouteTestCase(unittest.TestCase):
+    """
+    This class represents the test cases for the recommendations route.
+    """
+
+    def setUp(self):
+        """
+        This method sets up the test client, the test database and saved titles.
+        """
+        self.app = create_app()
+        self.app.config.from_object(TestingConfig)
+        self.client = self.app.test_client
+        cache.clear()
+
+        with self.app.app_context():
+            db.create_all()
+            accounts = []
+            for name in ("first", "second"):
+                user = User(
+                    username=name,
+                    email=f"{name}@example.com",
+                    password_hash=generate_password_hash("testpassword"),
+                    created_at=func.now(),
+                    updated_at=func.now(),
+                )
+                db.session.add(user)
+                db.session.commit()
+                account = Account(
+                    email=user.email,
+                    user_id=user.id,
+                    created_at=func.now(),
+                    updated_at=func.now(),
+                )
+                db.session.add(account)
+                db.session.commit()
+                accounts.append(account.id)
+
+            pictures = []
+            for external_id, title in ((1, "Alien"), (2, "Aliens"), (3, "Heat")):
+                picture = MotionPictures(
+                    title=title,
+                    external_id=external_id,
+                    poster_path="/poster.jpg",
+                    type="movie",
+                    overview="",
+                    created_at=func.now(),
+                    updated_at=func.now(),
+                )
+                db.session.add(picture)
+                db.session.commit()
+                pictures.append(picture.id)
+
+            for account_id, picture_id in (
+                (accounts[0], pictures[0]),
+                (accounts[0], pictures[1]),
+                (accounts[1], pictures[0]),
+                (accounts[1], pictures[1]),
+                (accounts[1], pictures[2]),
+            ):
+                db.session.add(
+                    WatchList(
+                        account_id=account_id,
+                        motion_picture_id=picture_id,
+                        watched=False,
+                        created_at=func.now(),
+                        updated_at=func.now(),
+                    )
+                )
+            db.session.commit()
+            self.pictures = pictures
+            build_recommendations(top_k=5)
+
+        response = self.client().post(
+            "/api/login",
+            json={"email": "first@example.com", "password": "testpassword"},
+        )
+        self.headers = {"Authorization": f"Bearer {response.get_json()['token']}"}
+
+    def tearDown(self):
+        """
+        This method removes the test database and the test client.
+        """
+        cache.clear()
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def test_get_recommendations(self):
+        """
+        This method tests that stored recommendations are served best first, and
+        that a title only one account saved is not recommended.
+        """
+        response = self.client().get(
+            f"/api/recommendations/{self.pictures[0]}", headers=self.headers
+        )
+        titles = [item["title"] for item in response.get_json()]
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(titles, ["Aliens"])
+
+    def test_saves_through_the_api_share_titles(self):
+        """
+        This method tests that two accounts saving overlapping titles share the
+        stored titles, that a series with a movie's TMDB ID is a separate title, and
+        that another account's private title is not revealed.
+        """
+        with self.app.app_context():
+            db.session.query(WatchList).delete()
+            db.session.commit()
+
+        second = self.client().post(
+            "/api/login",
+            json={"email": "second@example.com", "password": "testpassword"},
+        )
+        second_headers = {"Authorization": f"Bearer {second.get_json()['token']}"}
+        saves = (
+            (self.headers, 1, "Alien", "movie"),
+            (self.headers, 2, "Aliens", "movie"),
+            (self.headers, 4, "Private", "movie"),
+            (second_headers, 1, "Alien", "movie"),
+            (second_headers, 2, "Aliens", "movie"),
+            (second_headers, 1, "Alien: Earth", "tv"),
+        )
+        for headers, external_id, title, kind in saves:
+            response = self.client().post(
+                "/api/add-to-watchlist",
+                json={
+                    "title": title,
+                    "external_id": external_id,
+                    "poster_path": "/poster.jpg",
+                    "type": kind,
+                    "overview": "",
+                },
+                headers=headers,
+            )
+            self.assertEqual(response.status_code, 201)
+
+        with self.app.app_context():
+            self.assertEqual(MotionPictures.query.count(), 5)
+            build_recommendations(top_k=5)
+            private = MotionPictures.query.filter_by(external_id=4).one().id
+
+        alien = self.client().get(
+            f"/api/recommendations/{self.pictures[0]}", headers=second_headers
+        )
+        self.assertEqual([item["title"] for item in alien.get_json()], ["Aliens"])
+        leaked = self.client().get(
+            f"/api/recommendations/{private}", headers=second_headers
+        )
+        self.assertEqual(leaked.get_json(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
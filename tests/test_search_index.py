@@ -0,0 +1,200 @@
+import unittest
+from app import create_app, db
+from app.models import User, Account
+from app.services import CatalogSearchIndex, catalog_index
+from werkzeug.security import generate_password_hash
+from config import TestingConfig
+from sqlalchemy.sql import func
+
+
+def document(id, title, overview="", type="movie"):
+    """
+    Build a catalog row as stored in the index.
+    """
+    return {
+        "id": id,
+        "title": title,
+        "overview": overview,
+        "external_id": 1000 + id,
+        "poster_path": f"/{id}.jpg",
+        "type": type,
+        "updated_at": None,
+    }
+
+
+class CatalogSearchIndexTestCase(unittest.TestCase):
+    """
+    This class represents the test cases for the catalog search index.
+    """
+
+    def setUp(self):
+        """
+        This method builds a small index.
+        """
+        self.index = CatalogSearchIndex()
+        self.index.add(document(1, "The Matrix", "A hacker learns the truth."))
+        self.index.add(document(2, "Matrimony", "A wedding comedy."))
+        self.index.add(document(3, "Amélie", "A shy waitress in Paris."))
+
+    def test_prefix_typeahead(self):
+        """
+        This method tests that title prefixes match for typeahead.
+        """
+        titles = [result["title"] for result in self.index.search("matr")]
+        self.assertEqual(set(titles), {"The Matrix", "Matrimony"})
+        self.assertEqual(self.index.search("the mat")[0]["title"], "The Matrix")
+
+    def test_typo_tolerant_and_accent_insensitive(self):
+        """
+        This method tests trigram matching of misspelled and unaccented queries.
+        """
+        self.assertEqual(self.index.search("matrx")[0]["title"], "The Matrix")
+        self.assertEqual(self.index.search("amelie")[0]["title"], "Amélie")
+
+    def test_overview_match(self):
+        """
+        This method tests that overviews are searched.
+        """
+        self.assertEqual(self.index.search("waitress")[0]["id"], 3)
+
+    def test_non_latin_titles(self):
+        """
+        This method tests that titles in other scripts are tokenized and found.
+        """
+        self.index.add(document(4, "Брат"))
+        self.index.add(document(5, "千と千尋の神隠し"))
+        self.index.add(document(6, "Ζορμπάς"))
+        self.assertEqual(self.index.search("брат")[0]["id"], 4)
+        self.assertEqual(self.index.search("千と千尋")[0]["id"], 5)
+        self.assertEqual(self.index.search("ζορμπας")[0]["id"], 6)
+
+    def test_load_matches_incremental_adds(self):
+        """
+        This method tests that loading rows at once builds the same index as adding
+        them one by one.
+        """
+        loaded = CatalogSearchIndex()
+        loaded.load(
+            [
+                document(1, "The Matrix", "A hacker learns the truth."),
+                document(2, "Matrimony", "A wedding comedy."),
+                document(3, "Amélie", "A shy waitress in Paris."),
+            ]
+        )
+        self.assertTrue(loaded.built)
+        self.assertEqual(loaded._tokens, self.index._tokens)
+        for query in ("matr", "matrx", "amelie", "waitress"):
+            self.assertEqual(loaded.search(query), self.index.search(query))
+
+    def test_remove(self):
+        """
+        This method tests that removed rows are no longer returned.
+        """
+        self.index.remove(1)
+        titles = [result["title"] for result in self.index.search("matrix")]
+        self.assertNotIn("The Matrix", titles)
+
+
+class LocalSearchRouteTestCase(unittest.TestCase):
+    """
+    This class represents the test cases for searching the local catalog.
+    """
+
+    def setUp(self):
+        """
+        This method sets up the test client, the test database and a logged in user.
+        """
+        self.app = create_app()
+        self.app.config.from_object(TestingConfig)
+        self.client = self.app.test_client
+        catalog_index.clear()
+
+        with self.app.app_context():
+            db.create_all()
+            user = User(
+                username="testuser",
+                email="testuser@example.com",
+                password_hash=generate_password_hash("testpassword"),
+                created_at=func.now(),
+                updated_at=func.now(),
+            )
+            db.session.add(user)
+            db.session.commit()
+            db.session.add(
+                Account(
+                    email=user.email,
+                    user_id=user.id,
+                    created_at=func.now(),
+                    updated_at=func.now(),
+                )
+            )
+            db.session.commit()
+            catalog_index.build()
+
+        response = self.client().post(
+            "/api/login",
+            json={"email": "testuser@example.com", "password": "testpassword"},
+        )
+        self.headers = {"Authorization": f"Bearer {response.get_json()['token']}"}
+
+    def tearDown(self):
+        """
+        This method removes the test database and the test client.
+        """
+        catalog_index.clear()
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def add_to_watchlist(self, external_id, title):
+        """
+        This method adds a title to the catalog through the watchlist route.
+        """
+        return self.client().post(
+            "/api/add-to-watchlist",
+            headers=self.headers,
+            json={
+                "title": title,
+                "external_id": external_id,
+                "poster_path": "/poster.jpg",
+                "type": "movie",
+                "overview": "An overview.",
+            },
+        )
+
+    def test_search_serves_local_hits(self):
+        """
+        This method tests that catalog rows, including ones committed after the index
+        was built, are found without calling TMDB.
+        """
+        self.add_to_watchlist(603, "The Matrix")
+        first = self.client().get(
+            "/api/home/search?query=matrix&remote=never", headers=self.headers
+        )
+        self.add_to_watchlist(604, "The Matrix Reloaded")
+        second = self.client().get(
+            "/api/home/search?query=matrix%20rel&remote=never", headers=self.headers
+        )
+
+        self.assertEqual(first.get_json()["results"][0]["id"], 603)
+        self.assertEqual(first.get_json()["results"][0]["source"], "local")
+        self.assertEqual(second.get_json()["results"][0]["id"], 604)
+
+    def test_index_is_built_in_the_background(self):
+        """
+        This method tests that the first search does not wait for the index to be
+        built, and that later searches find the catalog rows.
+        """
+        self.add_to_watchlist(603, "The Matrix")
+        catalog_index.clear()
+        path = "/api/home/search?query=matrix&remote=never"
+
+        first = self.client().get(path, headers=self.headers)
+        self.assertEqual(first.status_code, 200)
+        self.assertTrue(catalog_index.wait_until_built(5))
+        second = self.client().get(path, headers=self.headers)
+        self.assertEqual(second.get_json()["results"][0]["id"], 603)
+
+
+if __name__ == "__main__":
+    unittest.main()
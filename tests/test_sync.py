@@ -0,0 +1,151 @@
+import unittest
+from datetime import datetime, timedelta
+from app import create_app, db
+from app.models import User, Account
+from app.services.sync import prune_tombstones
+from config import TestingConfig
+from sqlalchemy.sql import func
+from werkzeug.security import generate_password_hash
+
+
+class WatchlistSyncTestCase(unittest.TestCase):
+    """
+    This class represents the test cases for the watchlist delta sync.
+    """
+
+    def setUp(self):
+        """
+        This method sets up the test client, the test database and a watchlist.
+        """
+        self.app = create_app()
+        self.app.config.from_object(TestingConfig)
+        self.client = self.app.test_client
+
+        with self.app.app_context():
+            db.create_all()
+            user = User(
+                username="testuser",
+                email="test@example.com",
+                password_hash=generate_password_hash("testpassword"),
+                created_at=func.now(),
+                updated_at=func.now(),
+            )
+            db.session.add(user)
+            db.session.commit()
+            account = Account(
+                email=user.email,
+                user_id=user.id,
+                created_at=func.now(),
+                updated_at=func.now(),
+            )
+            db.session.add(account)
+            db.session.commit()
+
+        response = self.client().post(
+            "/api/login",
+            json={"email": "test@example.com", "password": "testpassword"},
+        )
+        self.headers = {"Authorization": f"Bearer {response.get_json()['token']}"}
+
+        self.entries = []
+        for external_id in (1, 2, 3):
+            response = self.client().post(
+                "/api/add-to-watchlist",
+                json={
+                    "title": f"Title {external_id}",
+                    "external_id": external_id,
+                    "poster_path": "/poster.jpg",
+                    "type": "movie",
+                    "overview": "",
+                },
+                headers=self.headers,
+            )
+            self.entries.append(response.get_json())
+
+    def tearDown(self):
+        """
+        This method removes the test database and the test client.
+        """
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def sync(self, cursor=None, limit=100):
+        """
+        This method calls the sync route and returns its response.
+        """
+        query = f"?limit={limit}" + (f"&cursor={cursor}" if cursor else "")
+        return self.client().get(f"/api/watchlist/sync{query}", headers=self.headers)
+
+    def test_full_then_delta_sync(self):
+        """
+        This method tests that a sync returns only the changes since the cursor.
+        """
+        response = self.sync()
+        self.assertEqual(response.status_code, 200)
+        data = response.get_json()
+        self.assertEqual(len(data["upserts"]), 3)
+        self.assertEqual(data["deletes"], [])
+        self.assertFalse(data["has_more"])
+
+        self.client().put(
+            f"/api/update-watchlist/{self.entries[0]['id']}",
+            json={"watched": True},
+            headers=self.headers,
+        )
+        self.client().delete(
+            f"/api/remove-from-watchlist/{self.entries[1]['motion_picture']['id']}",
+            headers=self.headers,
+        )
+
+        delta = self.sync(data["cursor"]).get_json()
+        self.assertEqual(
+            [(entry["id"], entry["watched"]) for entry in delta["upserts"]],
+            [(self.entries[0]["id"], True)],
+        )
+        self.assertEqual(
+            delta["deletes"],
+            [
+                {
+                    "id": self.entries[1]["id"],
+                    "motion_picture_id": self.entries[1]["motion_picture"]["id"],
+                }
+            ],
+        )
+
+        empty = self.sync(delta["cursor"]).get_json()
+        self.assertEqual((empty["upserts"], empty["deletes"]), ([], []))
+        self.assertEqual(empty["cursor"], delta["cursor"])
+
+    def test_sync_pages(self):
+        """
+        This method tests that a sync is paginated in change order.
+        """
+        first = self.sync(limit=2).get_json()
+        self.assertTrue(first["has_more"])
+        second = self.sync(first["cursor"], limit=2).get_json()
+        self.assertFalse(second["has_more"])
+        self.assertEqual(
+            [entry["id"] for entry in first["upserts"] + second["upserts"]],
+            [entry["id"] for entry in self.entries],
+        )
+
+    def test_expired_and_invalid_cursors(self):
+        """
+        This method tests that cursors before pruned tombstones are rejected.
+        """
+        cursor = self.sync().get_json()["cursor"]
+        self.client().delete(
+            f"/api/remove-from-watchlist/{self.entries[2]['motion_picture']['id']}",
+            headers=self.headers,
+        )
+        with self.app.app_context():
+            pruned = prune_tombstones(0, now=datetime.now() + timedelta(seconds=1))
+        self.assertEqual(pruned, 1)
+
+        self.assertEqual(self.sync(cursor).status_code, 410)
+        self.assertEqual(self.sync("abc").status_code, 400)
+
+
+if __name__ == "__main__":
+    unittest.main()
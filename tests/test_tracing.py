@@ -0,0 +1,160 @@
+import json
+import logging
+import os
+import tempfile
+import unittest
+from unittest import mock
+from app import create_app, db
+from app.cache import cache
+from app.instrumentation import current_request_id
+from app.models import User, Account
+from app.services import tmdb_client
+from config import TestingConfig
+from sqlalchemy.sql import func
+from werkzeug.security import generate_password_hash
+
+
+class TracingTestCase(unittest.TestCase):
+    """
+    This class represents the test cases for request tracing.
+    """
+
+    def setUp(self):
+        """
+        This method sets up the test client, the test database, a logged in user and
+        a file trace exporter.
+        """
+        self.app = create_app()
+        self.app.config.from_object(TestingConfig)
+        self.client = self.app.test_client
+        cache.clear()
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "traces.jsonl")
+
+        with self.app.app_context():
+            db.create_all()
+            user = User(
+                username="testuser",
+                email="test@example.com",
+                password_hash=generate_password_hash("testpassword"),
+                created_at=func.now(),
+                updated_at=func.now(),
+            )
+            db.session.add(user)
+            db.session.commit()
+            db.session.add(
+                Account(
+                    email=user.email,
+                    user_id=user.id,
+                    created_at=func.now(),
+                    updated_at=func.now(),
+                )
+            )
+            db.session.commit()
+
+        response = self.client().post(
+            "/api/login",
+            json={"email": "test@example.com", "password": "testpassword"},
+        )
+        self.headers = {"Authorization": f"Bearer {response.get_json()['token']}"}
+        self.app.config.update(TRACE_EXPORTER="file", TRACE_FILE_PATH=self.path)
+
+    def tearDown(self):
+        """
+        This method removes the test database, the test client and the trace file.
+        """
+        self.app.config.update(
+            TRACE_EXPORTER=None, TRACE_FILE_PATH=None, TRACE_SAMPLE_RATE=0.0
+        )
+        cache.clear()
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+        self.directory.cleanup()
+
+    def exported_spans(self):
+        """
+        This method waits for the export and returns the exported spans by name.
+        """
+        exporter = self.app.extensions.get("span_exporter")
+        if exporter is not None:
+            exporter.flush()
+        spans = {}
+        if not os.path.exists(self.path):
+            return spans
+        with open(self.path) as file:
+            for line in file:
+                for resource in json.loads(line)["resourceSpans"]:
+                    for scope in resource["scopeSpans"]:
+                        for span in scope["spans"]:
+                            spans.setdefault(span["name"], []).append(span)
+        return spans
+
+    def test_sampled_request_is_exported(self):
+        """
+        This method tests that a sampled request exports spans for the
+        authentication, the SQL statements and the TMDB call under one root span.
+        """
+        self.app.config["TRACE_SAMPLE_RATE"] = 1.0
+        upstream = mock.Mock(status_code=200)
+        upstream.json.return_value = {"page": 1, "results": []}
+        with mock.patch.object(tmdb_client.session, "get", return_value=upstream):
+            response = self.client().get(
+                "/api/home/latest-movies",
+                headers={**self.headers, "X-Request-ID": "abc-123"},
+            )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers["X-Request-ID"], "abc-123")
+        spans = self.exported_spans()
+        (root,) = spans["GET /api/home/latest-movies"]
+        self.assertEqual(root["parentSpanId"], "")
+        attributes = {a["key"]: a["value"] for a in root["attributes"]}
+        self.assertEqual(attributes["request.id"], {"stringValue": "abc-123"})
+        self.assertEqual(attributes["http.status_code"], {"intValue": "200"})
+
+        (load_user,) = spans["auth.load_user"]
+        self.assertEqual(load_user["parentSpanId"], root["spanId"])
+        self.assertIn("auth.decode_token", spans)
+        (query,) = [
+            s for s in spans["db.query"] if s["parentSpanId"] == load_user["spanId"]
+        ]
+        statement = {a["key"]: a["value"] for a in query["attributes"]}["db.statement"]
+        self.assertNotIn("'1'", statement["stringValue"])
+        (call,) = spans["tmdb.request"]
+        self.assertEqual(call["traceId"], root["traceId"])
+
+    def test_unsampled_request_is_not_exported(self):
+        """
+        This method tests that an unsampled request gets a request ID but no spans,
+        and that a ``traceparent`` header keeps the caller's trace.
+        """
+        response = self.client().get("/api/watchlist", headers=self.headers)
+        self.assertEqual(len(response.headers["X-Request-ID"]), 32)
+        self.assertEqual(self.exported_spans(), {})
+
+        trace_id = "4bf92f3577b34da6a3ce929d0e0e4736"
+        traceparent = f"00-{trace_id}-00f067aa0ba902b7-01"
+        self.client().get(
+            "/api/watchlist", headers={**self.headers, "traceparent": traceparent}
+        )
+        (root,) = self.exported_spans()["GET /api/watchlist"]
+        self.assertEqual(root["traceId"], trace_id)
+        self.assertEqual(root["parentSpanId"], "00f067aa0ba902b7")
+
+    def test_log_records_carry_request_id(self):
+        """
+        This method tests that log records emitted during a request carry its ID.
+        """
+        factory = logging.getLogRecordFactory()
+        record = factory("x", logging.INFO, "", 0, "", (), None)
+        self.assertEqual(record.request_id, "-")
+        with self.app.test_request_context(headers={"X-Request-ID": "req-1"}):
+            self.app.preprocess_request()
+            self.assertEqual(current_request_id(), "req-1")
+            record = factory("x", logging.INFO, "", 0, "", (), None)
+            self.assertEqual(record.request_id, "req-1")
+
+
+if __name__ == "__main__":
+    unittest.main()
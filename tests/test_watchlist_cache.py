@@ -0,0 +1,170 @@
+import time
+import unittest
+from app import create_app, db
+from app.cache import cache
+from app.instrumentation import track_queries
+from app.models import User, Account
+from app.services.watchlist_cache import WatchlistCache, watchlist_cache
+from config import TestingConfig
+from sqlalchemy.sql import func
+from werkzeug.security import generate_password_hash
+
+
+class WatchlistCacheTestCase(unittest.TestCase):
+    """
+    This class represents the test cases for the watchlist read cache.
+    """
+
+    def setUp(self):
+        """
+        This method sets up the test client, the test database, a logged in user and
+        the watchlist cache, which is off by default with the memory cache backend.
+        """
+        self.app = create_app()
+        self.app.config.from_object(TestingConfig)
+        self.client = self.app.test_client
+        cache.clear()
+        watchlist_cache.clear()
+        self.max_bytes = watchlist_cache.max_bytes
+        watchlist_cache.max_bytes = 64 * 1024 * 1024
+
+        with self.app.app_context():
+            db.create_all()
+            user = User(
+                username="testuser",
+                email="test@example.com",
+                password_hash=generate_password_hash("testpassword"),
+                created_at=func.now(),
+                updated_at=func.now(),
+            )
+            db.session.add(user)
+            db.session.commit()
+            account = Account(
+                email=user.email,
+                user_id=user.id,
+                created_at=func.now(),
+                updated_at=func.now(),
+            )
+            db.session.add(account)
+            db.session.commit()
+
+        response = self.client().post(
+            "/api/login",
+            json={"email": "test@example.com", "password": "testpassword"},
+        )
+        self.headers = {"Authorization": f"Bearer {response.get_json()['token']}"}
+
+    def tearDown(self):
+        """
+        This method removes the test database and the test client.
+        """
+        cache.clear()
+        watchlist_cache.clear()
+        watchlist_cache.max_bytes = self.max_bytes
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def add(self, external_id):
+        """
+        This method adds a motion picture to the watchlist.
+        """
+        response = self.client().post(
+            "/api/add-to-watchlist",
+            json={
+                "title": f"Title {external_id}",
+                "external_id": external_id,
+                "poster_path": "/poster.jpg",
+                "type": "movie",
+                "overview": "",
+            },
+            headers=self.headers,
+        )
+        return response.get_json()
+
+    def watchlist(self):
+        """
+        This method returns the watchlist titles and the number of statements run.
+        """
+        with track_queries() as stats:
+            response = self.client().get("/api/watchlist", headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        return [item["title"] for item in response.get_json()], stats.count
+
+    def test_repeated_reads_skip_the_database(self):
+        """
+        This method tests that a repeated read only runs the authentication query.
+        """
+        self.add(1)
+        first, first_count = self.watchlist()
+        second, second_count = self.watchlist()
+
+        self.assertEqual(first, second)
+        self.assertEqual(second_count, 1)
+        self.assertLess(second_count, first_count)
+
+    def test_writes_invalidate(self):
+        """
+        This method tests that adding and removing titles invalidate the cache and
+        toggling the watched status does not.
+        """
+        entry = self.add(1)
+        self.assertEqual(self.watchlist()[0], ["Title 1"])
+
+        self.add(2)
+        self.assertEqual(self.watchlist()[0], ["Title 1", "Title 2"])
+
+        self.client().put(
+            f"/api/update-watchlist/{entry['id']}",
+            json={"watched": True},
+            headers=self.headers,
+        )
+        self.assertEqual(self.watchlist()[1], 1)
+
+        self.client().delete(
+            f"/api/remove-from-watchlist/{entry['motion_picture']['id']}",
+            headers=self.headers,
+        )
+        self.assertEqual(self.watchlist()[0], ["Title 2"])
+
+    def test_lru_eviction_and_shared_versions(self):
+        """
+        This method tests that the cache stays under its size and that an
+        invalidation in one worker is seen by another.
+        """
+        first, second = WatchlistCache(max_bytes=10), WatchlistCache(max_bytes=10)
+        version = first.version(1)
+        first.set(1, version, b"12345")
+        first.set(2, first.version(2), b"12345")
+        self.assertEqual(first.get(1, version), b"12345")
+        first.set(3, first.version(3), b"123")
+        self.assertIsNone(first.get(2, first.version(2)))
+        self.assertEqual(first.get(1, version), b"12345")
+
+        second.set(1, version, b"12345")
+        first.invalidate(1)
+        self.assertIsNone(second.get(1, second.version(1)))
+
+    def test_disabled_cache_stores_no_versions(self):
+        """
+        This method tests that a disabled cache does not keep watchlist versions in
+        the application cache.
+        """
+        watchlist_cache.max_bytes = 0
+        self.add(1)
+        self.assertEqual(self.watchlist()[0], ["Title 1"])
+        self.assertIsNone(cache.backend.get("watchlist:version:1"))
+
+    def test_versions_expire(self):
+        """
+        This method tests that versions expire with the bodies stored under them.
+        """
+        watchlist = WatchlistCache(max_bytes=10, ttl=0.05)
+        version = watchlist.version(1)
+        self.assertEqual(cache.backend.get("watchlist:version:1"), version)
+        time.sleep(0.1)
+        self.assertIsNone(cache.backend.get("watchlist:version:1"))
+
+
+if __name__ == "__main__":
+    unittest.main()
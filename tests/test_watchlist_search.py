@@ -0,0 +1,133 @@
+import unittest
+from app import create_app, db
+from app.models import User, Account
+from config import TestingConfig
+from sqlalchemy.sql import func
+from werkzeug.security import generate_password_hash
+
+
+class WatchlistSearchTestCase(unittest.TestCase):
+    """
+    This class represents the test cases for searching within a watchlist.
+    """
+
+    def setUp(self):
+        """
+        This method sets up the test client, the test database and two users.
+        """
+        self.app = create_app()
+        self.app.config.from_object(TestingConfig)
+        self.client = self.app.test_client
+
+        with self.app.app_context():
+            db.create_all()
+
+        self.headers = self.create_user("first@example.com")
+        self.other_headers = self.create_user("second@example.com")
+
+    def tearDown(self):
+        """
+        This method removes the test database and the test client.
+        """
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def create_user(self, email):
+        """
+        This method creates a user with an account and returns its auth headers.
+        """
+        with self.app.app_context():
+            user = User(
+                username=email,
+                email=email,
+                password_hash=generate_password_hash("testpassword"),
+                created_at=func.now(),
+                updated_at=func.now(),
+            )
+            db.session.add(user)
+            db.session.commit()
+            db.session.add(
+                Account(
+                    email=email,
+                    user_id=user.id,
+                    created_at=func.now(),
+                    updated_at=func.now(),
+                )
+            )
+            db.session.commit()
+
+        response = self.client().post(
+            "/api/login", json={"email": email, "password": "testpassword"}
+        )
+        return {"Authorization": f"Bearer {response.get_json()['token']}"}
+
+    def add(self, headers, external_id, title, overview):
+        """
+        This method adds a motion picture to a watchlist.
+        """
+        response = self.client().post(
+            "/api/add-to-watchlist",
+            headers=headers,
+            json={
+                "title": title,
+                "external_id": external_id,
+                "poster_path": "/poster.jpg",
+                "type": "movie",
+                "overview": overview,
+            },
+        )
+        self.assertEqual(response.status_code, 201)
+
+    def test_search_is_ranked_and_scoped_to_account(self):
+        """
+        This method tests ranking, prefix matching and account scoping.
+        """
+        self.add(self.headers, 1, "Space Odyssey", "Space space space travel.")
+        self.add(self.headers, 2, "Interstellar", "A journey through space.")
+        self.add(self.headers, 3, "Amelie", "A waitress in Paris.")
+        self.add(self.other_headers, 4, "Spaceballs", "A space parody.")
+
+        response = self.client().get("/api/watchlist?q=spac", headers=self.headers)
+        titles = [item["title"] for item in response.get_json()]
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(titles, ["Space Odyssey", "Interstellar"])
+        self.assertEqual(response.headers["X-Total-Count"], "2")
+
+    def test_search_pagination(self):
+        """
+        This method tests that results are paginated.
+        """
+        for external_id in range(1, 4):
+            self.add(self.headers, external_id, f"Alien {external_id}", "Horror.")
+
+        response = self.client().get(
+            "/api/watchlist?q=alien&page=2&per_page=2", headers=self.headers
+        )
+
+        self.assertEqual(len(response.get_json()), 1)
+        self.assertEqual(response.headers["X-Total-Count"], "3")
+        self.assertEqual(response.headers["X-Page"], "2")
+
+    def test_search_non_latin_titles(self):
+        """
+        This method tests that titles and queries in other scripts are matched.
+        """
+        self.add(self.headers, 1, "Брат", "Криминальная драма.")
+        self.add(self.headers, 2, "千と千尋の神隠し", "")
+        self.add(self.headers, 3, "Amélie", "A waitress in Paris.")
+
+        for query, title in (
+            ("бра", "Брат"),
+            ("千と", "千と千尋の神隠し"),
+            ("amél", "Amélie"),
+        ):
+            response = self.client().get(
+                f"/api/watchlist?q={query}", headers=self.headers
+            )
+            self.assertEqual([item["title"] for item in response.get_json()], [title])
+
+
+if __name__ == "__main__":
+    unittest.main()
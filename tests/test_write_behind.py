@@ -0,0 +1,219 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+from app import create_app, db
+from app.models import User, Account, WatchList
+from app.services.write_behind import WriteBehind
+from config import TestingConfig
+from sqlalchemy.sql import func
+from werkzeug.security import generate_password_hash
+
+
+class WriteBehindTestCase(unittest.TestCase):
+    """
+    This class represents the test cases for the write-behind watched toggles.
+    """
+
+    def setUp(self):
+        """
+        This method sets up the test client, the test database, a watchlist and a
+        write-behind queue in a temporary directory.
+        """
+        self.app = create_app()
+        self.app.config.from_object(TestingConfig)
+        self.client = self.app.test_client
+        self.directory = tempfile.mkdtemp()
+        self.app.config["WRITE_BEHIND_ENABLED"] = True
+        self.app.config["WRITE_BEHIND_INTERVAL"] = 60
+        self.app.config["WRITE_BEHIND_QUEUE_PATH"] = os.path.join(
+            self.directory, "queue.sqlite3"
+        )
+        self.previous = self.app.extensions["write_behind"]
+        self.write_behind = WriteBehind(self.app)
+        self.app.extensions["write_behind"] = self.write_behind
+
+        with self.app.app_context():
+            db.create_all()
+            user = User(
+                username="testuser",
+                email="test@example.com",
+                password_hash=generate_password_hash("testpassword"),
+                created_at=func.now(),
+                updated_at=func.now(),
+            )
+            db.session.add(user)
+            db.session.commit()
+            account = Account(
+                email=user.email,
+                user_id=user.id,
+                created_at=func.now(),
+                updated_at=func.now(),
+            )
+            db.session.add(account)
+            db.session.commit()
+            self.account_id = account.id
+
+        response = self.client().post(
+            "/api/login",
+            json={"email": "test@example.com", "password": "testpassword"},
+        )
+        self.headers = {"Authorization": f"Bearer {response.get_json()['token']}"}
+
+        response = self.client().post(
+            "/api/add-to-watchlist",
+            json={
+                "title": "Title",
+                "external_id": 1,
+                "poster_path": "/poster.jpg",
+                "type": "movie",
+                "overview": "",
+            },
+            headers=self.headers,
+        )
+        self.entry_id = response.get_json()["id"]
+
+    def tearDown(self):
+        """
+        This method stops the flusher and removes the queue, the test database and
+        the test client.
+        """
+        self.write_behind.stop()
+        self.app.extensions["write_behind"] = self.previous
+        shutil.rmtree(self.directory)
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def toggle(self, watched):
+        """
+        This method sends a watched toggle and returns its response.
+        """
+        return self.client().put(
+            f"/api/update-watchlist/{self.entry_id}",
+            json={"watched": watched},
+            headers=self.headers,
+        )
+
+    def stored_watched(self):
+        """
+        This method returns the watched status stored in the database.
+        """
+        with self.app.app_context():
+            return db.session.get(WatchList, self.entry_id).watched
+
+    def test_toggles_are_coalesced(self):
+        """
+        This method tests that queued toggles of an entry are applied once, last
+        write wins.
+        """
+        for watched in (True, False, True):
+            response = self.toggle(watched)
+            self.assertEqual(response.status_code, 202)
+            self.assertEqual(
+                response.get_json(),
+                {"id": self.entry_id, "watched": watched, "pending": True},
+            )
+        self.assertEqual(len(self.write_behind.queue), 1)
+        self.assertFalse(self.stored_watched())
+
+        self.assertEqual(self.write_behind.flush_all(), 1)
+        self.assertTrue(self.stored_watched())
+        self.assertEqual(len(self.write_behind.queue), 0)
+
+    def test_reads_see_queued_toggles(self):
+        """
+        This method tests that the stats and sync routes wait for the account's
+        queued toggles.
+        """
+        self.write_behind.start()
+        self.toggle(True)
+
+        stats = self.client().get("/api/watchlist/stats", headers=self.headers)
+        self.assertEqual(stats.get_json()["watched"], 1)
+        sync = self.client().get("/api/watchlist/sync", headers=self.headers)
+        self.assertTrue(sync.get_json()["upserts"][0]["watched"])
+        self.assertEqual(len(self.write_behind.queue), 0)
+
+    def test_toggles_of_other_accounts_are_dropped(self):
+        """
+        This method tests that a toggle queued by another account is not applied.
+        """
+        self.write_behind.enqueue(self.account_id + 1, self.entry_id, True)
+        self.write_behind.enqueue(self.account_id, self.entry_id + 100, True)
+
+        self.assertEqual(self.write_behind.flush_all(), 2)
+        self.assertFalse(self.stored_watched())
+        self.assertEqual(len(self.write_behind.queue), 0)
+
+    def test_toggles_of_unknown_entries_are_refused(self):
+        """
+        This method tests that toggling an entry the account does not own returns
+        404 like the synchronous path, without queueing anything.
+        """
+        response = self.client().put(
+            f"/api/update-watchlist/{self.entry_id + 100}",
+            json={"watched": True},
+            headers=self.headers,
+        )
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(len(self.write_behind.queue), 0)
+
+    def test_disabled_write_behind_opens_no_queue(self):
+        """
+        This method tests that reads do not touch the queue file when write-behind is
+        disabled.
+        """
+        self.app.config["WRITE_BEHIND_ENABLED"] = False
+        self.app.config["WRITE_BEHIND_QUEUE_PATH"] = os.path.join(
+            self.directory, "disabled.sqlite3"
+        )
+        self.write_behind = WriteBehind(self.app)
+        self.app.extensions["write_behind"] = self.write_behind
+
+        for path in ("/api/watchlist/stats", "/api/watchlist/sync"):
+            response = self.client().get(path, headers=self.headers)
+            self.assertEqual(response.status_code, 200)
+        self.assertFalse(os.path.exists(self.app.config["WRITE_BEHIND_QUEUE_PATH"]))
+
+    def test_concurrent_flushers_apply_toggles_once(self):
+        """
+        This method tests that a second worker's flusher skips the toggles claimed by
+        a running flush, so the counters are changed once.
+        """
+        other = WriteBehind(self.app)
+        claimed = []
+        take = self.write_behind.queue.take
+
+        def take_then_flush_other(limit):
+            toggles = take(limit)
+            # The other worker flushes while this flush holds its toggles.
+            claimed.append(other.flush())
+            return toggles
+
+        self.write_behind.queue.take = take_then_flush_other
+        self.toggle(True)
+
+        self.assertEqual(self.write_behind.flush(), 1)
+        self.assertEqual(claimed, [0])
+        self.assertEqual(len(self.write_behind.queue), 0)
+        stats = self.client().get("/api/watchlist/stats", headers=self.headers)
+        self.assertEqual(stats.get_json()["watched"], 1)
+        self.assertEqual(stats.get_json()["unwatched"], 0)
+
+    def test_failed_flush_releases_toggles(self):
+        """
+        This method tests that toggles of a failed flush are taken again.
+        """
+        self.toggle(True)
+        with mock.patch.object(db.session, "commit", side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                self.write_behind.flush()
+
+        self.assertEqual(self.write_behind.flush(), 1)
+        self.assertTrue(self.stored_watched())
+
+
+if __name__ == "__main__":
+    unittest.main()